@@ -1,15 +1,26 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.auth.jwt_handler import decode_jwt_token
+from app.auth.token_cache import token_cache
 
 security = HTTPBearer()
 
 def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    try:
-        payload = decode_jwt_token(credentials.credentials)
-        return payload
-    except:
+    token = credentials.credentials
+    payload = token_cache.get(token)
+    if payload is None:
+        try:
+            payload = decode_jwt_token(token)
+        except:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Invalid or expired token."
+            )
+        token_cache.put(token, payload)
+
+    if token_cache.is_revoked(payload):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail="Invalid or expired token."
+            detail="Session revoked. Please log in again."
         )
+    return payload
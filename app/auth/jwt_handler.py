@@ -3,12 +3,13 @@ from jose import jwt
 from app.core.config import JWT_SECRET
 
 SECRET = JWT_SECRET
+TOKEN_LIFETIME = timedelta(days=1)
 
 def create_jwt_token(user_id: str, role: str):
     payload = {
         "user_id": user_id,
         "role": role,
-        "exp": datetime.utcnow() + timedelta(days=1),
+        "exp": datetime.utcnow() + TOKEN_LIFETIME,
         "iat": datetime.utcnow()
     }
     return jwt.encode(payload, SECRET, algorithm="HS256")
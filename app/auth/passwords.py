@@ -0,0 +1,96 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from passlib.context import CryptContext
+from app.core.config import (
+    BCRYPT_ROUNDS, PASSWORD_HASH_EXECUTOR, PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_CONCURRENCY
+)
+
+# 🔧 Worker-side helpers (module level so they can run in a process pool).
+# Pinning min/max rounds to the configured cost makes passlib report any
+# hash with a different cost as needing an update.
+@lru_cache(maxsize=None)
+def _context(rounds: int) -> CryptContext:
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+def _hash(password: str, rounds: int) -> str:
+    return _context(rounds).hash(password)
+
+def _verify_and_update(password: str, hashed: str, rounds: int):
+    return _context(rounds).verify_and_update(password, hashed)
+
+
+# 🔐 Password hashing service: bcrypt work runs in a bounded worker pool so
+# it never blocks the event loop.
+class PasswordHasher:
+    def __init__(self, executor: str = "thread", workers: int = 4, max_concurrency: int = 8, rounds: int = 12):
+        self.executor_kind = executor
+        self.workers = workers
+        self.rounds = rounds
+        self._executor = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.queue_depth = 0  # calls waiting for a free slot
+        self.in_flight = 0    # calls currently running in the pool
+
+    def _get_executor(self):
+        if self._executor is None:
+            if self.executor_kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def _run(self, fn, *args):
+        self.queue_depth += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queue_depth -= 1
+
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password, self.rounds)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        valid, _ = await self.verify_and_update(password, hashed)
+        return valid
+
+    # Returns (valid, new_hash); new_hash is set when the stored hash was
+    # made with a different cost and should be replaced.
+    async def verify_and_update(self, password: str, hashed: str):
+        return await self._run(_verify_and_update, password, hashed, self.rounds)
+
+    def stats(self):
+        return {
+            "executor": self.executor_kind,
+            "workers": self.workers,
+            "rounds": self.rounds,
+            "queue_depth": self.queue_depth,
+            "in_flight": self.in_flight,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    executor=PASSWORD_HASH_EXECUTOR,
+    workers=PASSWORD_HASH_WORKERS,
+    max_concurrency=PASSWORD_HASH_MAX_CONCURRENCY,
+    rounds=BCRYPT_ROUNDS,
+)
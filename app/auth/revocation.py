@@ -0,0 +1,31 @@
+import time
+from app.db.mongo import db
+from app.auth.jwt_handler import TOKEN_LIFETIME
+from app.auth.token_cache import token_cache
+from app.utils.pubsub import invalidation_bus
+
+CHANNEL = "sessions"
+
+# 🚫 Session revocation: users.tokens_valid_after (epoch seconds) rejects every
+# token whose `iat` is older. The cutoff is checked in memory per request;
+# other workers learn it over the invalidation bus, or at startup.
+async def revoke_sessions(email: str, user_id: str):
+    valid_after = int(time.time())
+    await db.users.update_one({"email": email}, {"$set": {"tokens_valid_after": valid_after}})
+    token_cache.revoke_user(user_id, valid_after)
+    await invalidation_bus.publish(CHANNEL, {"user_id": user_id, "valid_after": valid_after})
+
+# Only revocations newer than the token lifetime can still match a live token
+async def load_revocations():
+    since = int(time.time() - TOKEN_LIFETIME.total_seconds())
+    valid_after = {
+        u["email"]: u["tokens_valid_after"]
+        async for u in db.users.find({"tokens_valid_after": {"$gt": since}}, {"email": 1, "tokens_valid_after": 1})
+    }
+    if valid_after:
+        async for emp in db.employees.find({"email": {"$in": list(valid_after)}}, {"user_id": 1, "email": 1}):
+            token_cache.revoke_user(emp["user_id"], valid_after[emp["email"]])
+    return len(valid_after)
+
+
+invalidation_bus.subscribe(CHANNEL, lambda message: token_cache.revoke_user(message["user_id"], message["valid_after"]))
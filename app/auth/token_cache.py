@@ -0,0 +1,83 @@
+import hashlib
+import time
+from collections import OrderedDict
+from threading import Lock
+from app.core.config import TOKEN_CACHE_SIZE
+from app.utils.normalize import normalize_user_id
+
+# 🎟 Bounded LRU cache of verified JWT payloads, keyed by a digest of the
+# token. Entries expire at the token's own `exp`.
+class TokenCache:
+    def __init__(self, max_size: int = 4096):
+        self.max_size = max_size
+        self._entries = OrderedDict()  # digest -> (expires_at, payload)
+        self._valid_after = {}  # user_id -> epoch seconds; tokens issued earlier are revoked
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _digest(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str):
+        key = self._digest(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, payload = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def put(self, token: str, payload: dict):
+        exp = payload.get("exp")
+        if not isinstance(exp, (int, float)):
+            return
+        key = self._digest(token)
+        with self._lock:
+            self._entries[key] = (exp, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    # 🚫 Revoke every token issued to this user before `valid_after` (epoch
+    # seconds) and drop the cached ones; see app/auth/revocation.py
+    def revoke_user(self, user_id: str, valid_after: float):
+        user_id = normalize_user_id(user_id)
+        with self._lock:
+            self._valid_after[user_id] = max(valid_after, self._valid_after.get(user_id, 0))
+            stale = [k for k, (_, p) in self._entries.items() if normalize_user_id(p.get("user_id")) == user_id]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    # Checked on cache hits and misses alike
+    def is_revoked(self, payload: dict) -> bool:
+        valid_after = self._valid_after.get(normalize_user_id(payload.get("user_id")))
+        return valid_after is not None and payload.get("iat", 0) < valid_after
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._valid_after.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "revoked_users": len(self._valid_after),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+token_cache = TokenCache(max_size=TOKEN_CACHE_SIZE)
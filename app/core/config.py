@@ -2,4 +2,64 @@ from dotenv import load_dotenv
 import os
 load_dotenv()
 MONGO_URI = os.getenv("MONGO_URI")
-JWT_SECRET = os.getenv("JWT_SECRET")
\ No newline at end of file
+JWT_SECRET = os.getenv("JWT_SECRET")
+
+# 🔐 Password hashing (bcrypt runs off the event loop in a worker pool)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")  # thread | process
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+PASSWORD_HASH_MAX_CONCURRENCY = int(os.getenv("PASSWORD_HASH_MAX_CONCURRENCY", "8"))
+
+# 🎟 Verified JWT cache
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "4096"))
+REVOKE_SESSIONS_ON_PASSWORD_RESET = os.getenv("REVOKE_SESSIONS_ON_PASSWORD_RESET", "true").lower() == "true"
+
+# ✉️ Outgoing email (SMTP) and the background outbox sender
+EMAIL_HOST = os.getenv("EMAIL_HOST", "smtp.gmail.com")
+EMAIL_PORT = int(os.getenv("EMAIL_PORT", "587"))
+EMAIL_USE_TLS = os.getenv("EMAIL_USE_TLS", "true").lower() == "true"
+EMAIL_ADDRESS = os.getenv("EMAIL_ADDRESS")
+EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD")
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", "20"))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "5"))
+EMAIL_OUTBOX_POLL_SECONDS = float(os.getenv("EMAIL_OUTBOX_POLL_SECONDS", "5"))
+EMAIL_OUTBOX_BACKOFF_SECONDS = float(os.getenv("EMAIL_OUTBOX_BACKOFF_SECONDS", "30"))
+
+# 📍 Attendance network verification
+# ATTENDANCE_VERIFIER: comma separated backends, any of which may pass (ssid | cidr | kiosk)
+ATTENDANCE_VERIFIER = os.getenv("ATTENDANCE_VERIFIER", "ssid")
+ATTENDANCE_ALLOWED_CIDRS = os.getenv("ATTENDANCE_ALLOWED_CIDRS", "")
+ATTENDANCE_TRUST_FORWARDED = os.getenv("ATTENDANCE_TRUST_FORWARDED", "false").lower() == "true"
+ATTENDANCE_VERIFIER_CACHE_SECONDS = float(os.getenv("ATTENDANCE_VERIFIER_CACHE_SECONDS", "60"))
+AUTHORIZED_SSID = os.getenv("AUTHORIZED_SSID", "COMITIFS")
+KIOSK_TOKEN_SECRET = os.getenv("KIOSK_TOKEN_SECRET") or JWT_SECRET
+
+# 🧊 Attendance tiering: whole months older than the hot window move to the archive
+# (python -m app.utils.attendance_archive); history reads fan out only when needed
+ATTENDANCE_HOT_DAYS = int(os.getenv("ATTENDANCE_HOT_DAYS", "400"))
+ATTENDANCE_ARCHIVE_TIER = os.getenv("ATTENDANCE_ARCHIVE_TIER", "collection")  # collection | file
+ATTENDANCE_ARCHIVE_DIR = os.getenv("ATTENDANCE_ARCHIVE_DIR", "")  # absolute path, required by the file tier
+
+# 🧾 Payslip PDFs
+PAYSLIP_CACHE_DIR = os.getenv("PAYSLIP_CACHE_DIR", ".cache/payslips")
+PAYSLIP_RENDER_WORKERS = int(os.getenv("PAYSLIP_RENDER_WORKERS", str(os.cpu_count() or 2)))
+PAYSLIP_CACHE_MAX_AGE_DAYS = float(os.getenv("PAYSLIP_CACHE_MAX_AGE_DAYS", "30"))  # cached PDFs unused this long are deleted
+
+# 👥 Employee directory cache (+ optional cross-worker invalidation over Mongo)
+EMPLOYEE_CACHE_SIZE = int(os.getenv("EMPLOYEE_CACHE_SIZE", "10000"))
+EMPLOYEE_CACHE_TTL = float(os.getenv("EMPLOYEE_CACHE_TTL", "300"))
+CACHE_PUBSUB_ENABLED = os.getenv("CACHE_PUBSUB_ENABLED", "false").lower() == "true"
+EMPLOYEE_SEARCH_REFRESH_SECONDS = float(os.getenv("EMPLOYEE_SEARCH_REFRESH_SECONDS", "600"))  # full search index rebuild
+DASHBOARD_CACHE_TTL = float(os.getenv("DASHBOARD_CACHE_TTL", "30"))  # HR dashboard recomputed at most this often
+
+# 🍃 MongoDB connection pool (the client is opened in the app lifespan)
+MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "talenttrack")
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "10"))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000"))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "5000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "30000"))
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "zstd,snappy,zlib")  # first one the server supports wins
+MONGO_WARMUP_CONNECTIONS = int(os.getenv("MONGO_WARMUP_CONNECTIONS", str(MONGO_MIN_POOL_SIZE)))
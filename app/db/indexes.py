@@ -0,0 +1,51 @@
+import logging
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure, PyMongoError
+from app.db.mongo import db
+
+logger = logging.getLogger(__name__)
+
+# 📚 Indexes the routes rely on: (collection, keys, options)
+INDEXES = [
+    ("users", [("email", ASCENDING)], {"unique": True}),
+    ("users", [("tokens_valid_after", ASCENDING)], {"sparse": True}),  # revoked sessions
+    ("employees", [("user_id", ASCENDING)], {"unique": True}),
+    ("attendance", [("user_id", ASCENDING), ("date", DESCENDING)], {"unique": True}),  # one record per day
+    ("attendance", [("date", DESCENDING), ("_id", DESCENDING)], {}),
+    ("leaves", [("user_id", ASCENDING), ("status", ASCENDING), ("applied_at", DESCENDING)], {}),
+    ("leaves", [("status", ASCENDING), ("from_date", ASCENDING), ("to_date", ASCENDING)], {}),
+    ("leaves", [("from_date", ASCENDING), ("_id", ASCENDING)], {}),  # date-ordered exports
+    ("payrolls", [("user_id", ASCENDING)], {"unique": True}),
+    ("payslips", [("period", ASCENDING), ("department", ASCENDING)], {}),
+    ("payslips", [("user_id", ASCENDING), ("period", DESCENDING)], {}),
+    ("payslips", [("period", ASCENDING), ("_id", ASCENDING)], {}),  # period-ordered exports
+    ("employees", [("department", ASCENDING)], {}),
+    ("attendance_daily", [("date", ASCENDING), ("department", ASCENDING)], {}),
+    ("attendance_monthly", [("month", ASCENDING), ("department", ASCENDING)], {}),
+    ("email_outbox", [("status", ASCENDING), ("next_attempt_at", ASCENDING)], {}),
+]
+
+# Server codes for "an index on these keys already exists with other options"
+INDEX_CONFLICT_CODES = {85, 86}
+
+# An index became unique: drop the old definition and build the new one
+async def _replace_index(collection, keys, options):
+    info = await db[collection].index_information()
+    for name, spec in info.items():
+        if [(field, int(direction)) for field, direction in spec["key"]] == list(keys):
+            await db[collection].drop_index(name)
+    await db[collection].create_index(keys, **options)
+
+# 🚀 Create missing indexes at startup (no-op when they already exist)
+async def ensure_indexes():
+    for collection, keys, options in INDEXES:
+        try:
+            try:
+                await db[collection].create_index(keys, **options)
+            except OperationFailure as e:
+                if e.code not in INDEX_CONFLICT_CODES:
+                    raise
+                await _replace_index(collection, keys, options)
+        except PyMongoError as e:
+            # Usually duplicate legacy data: run `python -m app.db.migrations` first
+            logger.warning("Could not create index %s on %s: %s", keys, collection, e)
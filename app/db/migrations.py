@@ -0,0 +1,62 @@
+import asyncio
+from app.db.mongo import db
+from app.db.indexes import ensure_indexes
+from app.utils.attendance_rollups import rebuild_rollups
+from app.utils.leave_ledger import rebuild_leave_balances
+
+# 🛠 One-time migration: rewrite user_id / email to their canonical form
+# (see app/utils/normalize.py) so lookups can use equality matches.
+NORMALIZED_FIELDS = {
+    "users": {"email": "$toLower"},
+    "employees": {"user_id": "$toUpper", "email": "$toLower"},
+    "attendance": {"user_id": "$toUpper"},
+    "leaves": {"user_id": "$toUpper"},
+    "payrolls": {"user_id": "$toUpper"},
+}
+
+async def normalize_keys():
+    for collection, fields in NORMALIZED_FIELDS.items():
+        for field, op in fields.items():
+            result = await db[collection].update_many(
+                {field: {"$type": "string"}},
+                [{"$set": {field: {op: {"$trim": {"input": f"${field}"}}}}}]
+            )
+            print(f"{collection}.{field}: {result.modified_count} documents normalized")
+
+# 🧹 Collapse duplicates so the unique indexes can be built; the newest
+# document per key wins (the same rule the bulk attendance upsert uses).
+# collection: (key fields, "newest" field)
+DEDUPE_KEYS = {
+    "attendance": (["user_id", "date"], "timestamp"),
+    "payrolls": (["user_id"], "generated_at"),
+}
+
+async def dedupe_collections():
+    touched_dates = []
+    for collection, (keys, newest) in DEDUPE_KEYS.items():
+        removed = 0
+        pipeline = [
+            {"$sort": {newest: -1, "_id": -1}},
+            {"$group": {"_id": {k: f"${k}" for k in keys}, "ids": {"$push": "$_id"}, "n": {"$sum": 1}}},
+            {"$match": {"n": {"$gt": 1}}},
+        ]
+        async for group in db[collection].aggregate(pipeline, allowDiskUse=True):
+            result = await db[collection].delete_many({"_id": {"$in": group["ids"][1:]}})
+            removed += result.deleted_count
+            if collection == "attendance":
+                touched_dates.append(group["_id"]["date"])
+        print(f"{collection}: {removed} duplicate documents removed")
+
+    # Rollup counters still include the removed records
+    if touched_dates:
+        print(await rebuild_rollups(min(touched_dates), max(touched_dates)))
+
+async def migrate():
+    await normalize_keys()
+    await dedupe_collections()
+    await ensure_indexes()
+    # Normalized user_ids can merge ledgers; recompute them from the leaves
+    print(f"Rebuilt {await rebuild_leave_balances()} leave balance ledgers")
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
@@ -1,4 +1,180 @@
+import asyncio
+import importlib.util
+import logging
+import threading
+import time
 from motor.motor_asyncio import AsyncIOMotorClient
-from app.core.config import MONGO_URI
-client = AsyncIOMotorClient(MONGO_URI)
-db = client["talenttrack"]
+from pymongo import monitoring
+from app.core.config import (
+    MONGO_URI, MONGO_DB_NAME, MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE, MONGO_MAX_IDLE_TIME_MS,
+    MONGO_WAIT_QUEUE_TIMEOUT_MS, MONGO_CONNECT_TIMEOUT_MS, MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    MONGO_SOCKET_TIMEOUT_MS, MONGO_COMPRESSORS, MONGO_WARMUP_CONNECTIONS
+)
+from app.utils.metrics import query_listener
+
+logger = logging.getLogger(__name__)
+
+# Python modules the driver needs for each wire compressor (zlib is built in)
+_COMPRESSOR_MODULES = {"zstd": "zstandard", "snappy": "snappy", "zlib": None}
+
+
+# 📈 Connection pool counters per server, fed by the driver's pool events.
+# Events fire on driver threads, so updates go through a lock.
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pools = {}
+
+    def _pool(self, address):
+        key = "%s:%s" % address
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = self._pools[key] = {
+                "max_size": None, "open": 0, "in_use": 0, "waiting": 0,
+                "checkouts": 0, "checkout_failures": 0, "cleared": 0,
+            }
+        return pool
+
+    def _update(self, address, **deltas):
+        with self._lock:
+            pool = self._pool(address)
+            for name, delta in deltas.items():
+                pool[name] += delta
+
+    def pool_created(self, event):
+        with self._lock:
+            self._pool(event.address)["max_size"] = event.options.get("maxPoolSize", MONGO_MAX_POOL_SIZE)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._update(event.address, cleared=1)
+
+    def pool_closed(self, event):
+        with self._lock:
+            self._pools.pop("%s:%s" % event.address, None)
+
+    def connection_created(self, event):
+        self._update(event.address, open=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._update(event.address, open=-1)
+
+    def connection_check_out_started(self, event):
+        self._update(event.address, waiting=1)
+
+    def connection_check_out_failed(self, event):
+        self._update(event.address, waiting=-1, checkout_failures=1)
+
+    def connection_checked_out(self, event):
+        self._update(event.address, waiting=-1, in_use=1, checkouts=1)
+
+    def connection_checked_in(self, event):
+        self._update(event.address, in_use=-1)
+
+    def stats(self):
+        with self._lock:
+            pools = {address: dict(pool) for address, pool in self._pools.items()}
+        for pool in pools.values():
+            max_size = pool["max_size"] or MONGO_MAX_POOL_SIZE
+            pool["utilization"] = pool["in_use"] / max_size if max_size else 0.0
+        return pools
+
+
+pool_monitor = PoolMonitor()
+
+# Driver event listeners attached to every client we create
+event_listeners = [pool_monitor, query_listener]
+
+
+def _compressors():
+    wanted = [c.strip() for c in MONGO_COMPRESSORS.split(",") if c.strip()]
+    return [
+        c for c in wanted
+        if c in _COMPRESSOR_MODULES
+        and (_COMPRESSOR_MODULES[c] is None or importlib.util.find_spec(_COMPRESSOR_MODULES[c]))
+    ]
+
+
+# 🏭 Build a client with the configured pool size, timeouts and compression
+def create_client(uri: str = None) -> AsyncIOMotorClient:
+    options = dict(
+        maxPoolSize=MONGO_MAX_POOL_SIZE,
+        minPoolSize=MONGO_MIN_POOL_SIZE,
+        maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+        waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+        serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+        event_listeners=list(event_listeners),
+    )
+    compressors = _compressors()
+    if compressors:
+        options["compressors"] = ",".join(compressors)
+    return AsyncIOMotorClient(uri or MONGO_URI, **options)
+
+
+_client = None
+
+# Install the client used by `db` (tests/benchmarks can hand in their own)
+def set_client(client):
+    global _client
+    _client = client
+
+def get_client() -> AsyncIOMotorClient:
+    # Scripts that never run the lifespan still get a client on first use
+    if _client is None:
+        set_client(create_client())
+    return _client
+
+def get_database():
+    return get_client()[MONGO_DB_NAME]
+
+
+# 🔀 Module-level `db` stays importable everywhere; it resolves to the current client
+class _DatabaseProxy:
+    def __getattr__(self, name):
+        return getattr(get_database(), name)
+
+    def __getitem__(self, name):
+        return get_database()[name]
+
+
+db = _DatabaseProxy()
+
+
+# 🔥 Open the client and warm the pool so the first requests skip the TCP/TLS handshakes
+async def connect(warmup: int = MONGO_WARMUP_CONNECTIONS):
+    client = get_client()
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(client.admin.command("ping") for _ in range(max(warmup, 1))))
+    except Exception as e:
+        logger.warning("MongoDB warm-up ping failed: %s", e)
+        return
+    logger.info("MongoDB pool warmed with %d connections in %.1f ms", warmup, (time.perf_counter() - started) * 1000)
+
+def close():
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+
+
+# 🩺 Round-trip time plus pool counters for /health
+async def health():
+    started = time.perf_counter()
+    try:
+        await get_client().admin.command("ping")
+    except Exception as e:
+        return {"ok": False, "error": str(e), "pools": pool_monitor.stats()}
+    return {
+        "ok": True,
+        "ping_ms": round((time.perf_counter() - started) * 1000, 2),
+        "max_pool_size": MONGO_MAX_POOL_SIZE,
+        "pools": pool_monitor.stats(),
+    }
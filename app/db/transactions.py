@@ -0,0 +1,41 @@
+import logging
+from pymongo.errors import ConfigurationError, OperationFailure
+from app.db.mongo import get_client
+
+logger = logging.getLogger(__name__)
+
+# Standalone servers reject transactions with IllegalOperation
+ILLEGAL_OPERATION = 20
+
+# None = not probed yet, then True/False for the connected deployment
+_supported = None
+
+def _transactions_unavailable(error) -> bool:
+    if isinstance(error, OperationFailure):
+        return error.code == ILLEGAL_OPERATION
+    return isinstance(error, (ConfigurationError, NotImplementedError))
+
+
+# 🔒 Run `callback(session)` as one multi-document transaction (retried by the
+# driver on transient errors). Deployments without transactions (standalone
+# mongod) run it once without a session and call `rollback()` if it fails.
+async def run_in_transaction(callback, rollback=None):
+    global _supported
+    if _supported is not False:
+        try:
+            async with await get_client().start_session() as session:
+                result = await session.with_transaction(callback)
+            _supported = True
+            return result
+        except (OperationFailure, ConfigurationError, NotImplementedError) as e:
+            if not _transactions_unavailable(e):
+                raise
+            logger.info("MongoDB transactions unavailable (%s); using compensating writes", e)
+            _supported = False
+
+    try:
+        return await callback(None)
+    except Exception:
+        if rollback is not None:
+            await rollback()
+        raise
@@ -1,9 +1,53 @@
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from app.routes import auth, employee, leave
 from app.routes import payroll,attendance
+from app.routes import dashboard
+from app.db import mongo
+from app.db.indexes import ensure_indexes
+from app.auth.token_cache import token_cache
+from app.auth.revocation import load_revocations
+from app.utils.leave_ledger import ensure_leave_balances
+from app.utils.employee_cache import employee_cache
+from app.utils.dashboard import dashboard_cache
+from app.auth.passwords import password_hasher
+from app.utils.email_outbox import outbox_worker
+from app.utils.payroll_run import cancel_payroll_runs
+from app.utils.pdf_generator import payslip_renderer
+from app.utils.pubsub import invalidation_bus
+from app.core.config import CACHE_PUBSUB_ENABLED
+from app.utils.serializers import FastJSONResponse
+from app.utils.metrics import RequestStats, current_request, record_request, render_metrics
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 🍃 Open the Mongo client and warm its connection pool
+    await mongo.connect()
+    # 📚 Make sure the indexes used by the routes exist
+    await ensure_indexes()
+    # 🚫 Sessions revoked within the last token lifetime
+    await load_revocations()
+    # 📒 Leave ledgers are seeded from the leaves history on first deploy
+    await ensure_leave_balances()
+    # 📬 Background sender for queued emails
+    await outbox_worker.start()
+    # 📡 Cross-worker cache invalidation (multi-worker deployments)
+    if CACHE_PUBSUB_ENABLED:
+        await invalidation_bus.start()
+    yield
+    await invalidation_bus.stop()
+    await cancel_payroll_runs()
+    await outbox_worker.stop()
+    password_hasher.shutdown()
+    payslip_renderer.shutdown()
+    mongo.close()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
 
 app.add_middleware(
@@ -12,15 +56,33 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],                      # Allow all HTTP methods
     allow_headers=["*"],                      # Allow all headers
+    expose_headers=["X-Next-Cursor"],         # Pagination cursor for list endpoints
 )
 
 
+# ⏱ Per-route latency and Mongo query counts (commands are attributed via a contextvar)
+@app.middleware("http")
+async def request_metrics(request: Request, call_next):
+    stats = RequestStats(request.scope)
+    token = current_request.set(stats)
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        record_request(request.method, status, time.perf_counter() - started, stats)
+        current_request.reset(token)
+
+
 # Include routers
 app.include_router(auth.router, prefix="/auth", tags=["Auth"])
 app.include_router(employee.router, prefix="/employees", tags=["Employees"])
 app.include_router(payroll.router, prefix="/payroll", tags=["Payroll"])
 app.include_router(attendance.router, prefix="/attendance", tags=["Attendance"]) 
 app.include_router(leave.router, prefix="/leaves", tags=["Leaves"])
+app.include_router(dashboard.router, prefix="/dashboard", tags=["Dashboard"])
 
 
 # Root endpoint
@@ -28,6 +90,25 @@ app.include_router(leave.router, prefix="/leaves", tags=["Leaves"])
 def home():
     return {"message": "Welcome to TalentTrack HRM"}
 
+# 🩺 Liveness + resource usage (Mongo pool, hashing queue, caches)
+@app.get("/health")
+async def health():
+    db_health = await mongo.health()
+    body = {
+        "status": "ok" if db_health["ok"] else "degraded",
+        "mongo": db_health,
+        "password_hasher": password_hasher.stats(),
+        "token_cache": token_cache.stats(),
+        "employee_cache": employee_cache.stats(),
+        "dashboard_cache": dashboard_cache.stats(),
+    }
+    return JSONResponse(body, status_code=200 if db_health["ok"] else 503)
+
+# 📊 Prometheus scrape endpoint
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 import os
 
 if __name__ == "__main__":
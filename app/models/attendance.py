@@ -1,8 +1,8 @@
 from pydantic import BaseModel, Field
 from typing import Optional
-from datetime import date
+from datetime import date as Date
 
 class AttendanceEntry(BaseModel):
     employee_id: str = Field(..., example="")
     status: str = Field(..., example="")  # e.g., Present, Absent, Leave
-    date: Optional[date] = Field(default_factory=date.today, example="")
\ No newline at end of file
+    date: Optional[Date] = Field(default_factory=Date.today, example="")
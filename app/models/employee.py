@@ -19,3 +19,10 @@ class EmployeeUpdate(BaseModel):
     role: Optional[str]
     joining_date: Optional[str]
     
+
+class EmployeeImport(BaseModel):
+    name: str
+    email: str
+    department: str = ""
+    role: str = ""
+    joining_date: str = ""
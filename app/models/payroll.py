@@ -1,9 +1,30 @@
 # app/models/payroll.py
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import List, Optional
 
 class Payroll(BaseModel):
     employee_id: str
     base_salary: float
     bonus: float = 0.0
     deductions: float = 0.0
+
+# 🧮 What-if payroll scenario (see app/utils/payroll_rules.py)
+class RaiseRule(BaseModel):
+    percent: float                               # e.g. 5 for a 5% raise on base salary
+    departments: Optional[List[str]] = None      # None = every department
+
+class TaxSlab(BaseModel):
+    up_to: Optional[float] = None                # upper bound of the slab, None = no limit
+    rate: float                                  # percent taxed inside the slab
+
+class DeductionPolicy(BaseModel):
+    percent: float = 0.0                         # percent of base salary
+    cap: Optional[float] = None                  # maximum deduction per employee
+
+class PayrollScenario(BaseModel):
+    raises: List[RaiseRule] = []
+    tax_slabs: List[TaxSlab] = []
+    deduction_policy: Optional[DeductionPolicy] = None
+    bonus_cap: Optional[float] = None
+    top_deltas: int = Field(100, ge=0, description="Largest per-employee changes to return (0 = all)")
@@ -1,152 +1,229 @@
-from fastapi import APIRouter, HTTPException, Depends, Form
+from fastapi import APIRouter, HTTPException, Depends, Form, Request, Query
 from datetime import datetime, timedelta
+from pymongo.errors import DuplicateKeyError
 from app.db.mongo import db
 from app.auth.dependencies import get_current_user
-import subprocess
-from typing import Optional
+from app.utils.employee_loader import EmployeeLoader, get_employee_loader
+from app.utils.normalize import normalize_user_id
+from app.utils.employee_cache import employee_cache
+from app.utils.network_verifier import network_verifier
+from app.utils.attendance_ingest import iter_row_chunks, ingest_attendance
+from app.utils.pagination import PageParams, paginate, stream_documents, MAX_PAGE_SIZE
+from app.utils.serializers import FastJSONResponse, parse_fields
+from app.utils.attendance_rollups import apply_rollup_changes, attendance_report
+from app.utils.export import ExportParams, department_user_ids, stream_export, with_employee_columns
+from app.utils.attendance_archive import attendance_archive
 
 router = APIRouter()
-AUTHORIZED_SSID = "COMITIFS"
 
-# 🛠 Get connected Wi-Fi SSID (Windows)
-def get_connected_ssid() -> Optional[str]:
+# Optional YYYY-MM-DD bounds for the history routes
+def parse_range(start: str, end: str):
     try:
-        result = subprocess.check_output(["netsh", "wlan", "show", "interfaces"], shell=True)
-        output = result.decode("utf-8")
-        for line in output.splitlines():
-            if "SSID" in line and "BSSID" not in line:
-                return line.split(":", 1)[1].strip()
-    except Exception:
-        return None
-    return None
+        for value in (start, end):
+            if value:
+                datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="start and end must be YYYY-MM-DD")
+    if start and end and end < start:
+        raise HTTPException(status_code=400, detail="end must be after or equal to start")
+    return start, end
+
+EXPORT_COLUMNS = ("date", "user_id", "employee_name", "department", "status", "timestamp")
 
 # 🧠 Get employee details
 async def get_employee_details(user_id: str):
-    return await db.employees.find_one({"user_id": {"$regex": f"^{user_id}$", "$options": "i"}})
+    return await employee_cache.get_by_user_id(user_id)
+
+# 🧩 Attach employee summary to attendance records (one batched lookup per page)
+async def enrich_attendance(records, loader: EmployeeLoader):
+    await loader.load_many(r.get("user_id") for r in records)
+    for r in records:
+        emp = loader.get(r.get("user_id"))
+        if emp:
+            r["employee"] = {
+                "name": emp["name"],
+                "department": emp["department"],
+                "role": emp["role"]
+            }
+    return records
 
-@router.post("/", summary="Mark attendance (only on authorized Wi-Fi)")
+@router.post("/", summary="Mark attendance (only from an authorized office network)")
 async def mark_attendance(
+    request: Request,
     status: str = Form(..., description="present/absent/late"),
     user=Depends(get_current_user)
 ):
     if user["role"] not in ["admin", "hr", "employee"]:
         raise HTTPException(status_code=403, detail="Unauthorized")
 
-    # ✅ Check if connected to the allowed Wi-Fi
-    ssid = get_connected_ssid()
-    if ssid != AUTHORIZED_SSID:
-        raise HTTPException(status_code=403, detail="You are not connected to authorized Wi-Fi")
+    # ✅ Check the request comes from the office (see ATTENDANCE_VERIFIER)
+    if not network_verifier.check(request):
+        raise HTTPException(status_code=403, detail="You are not connected to an authorized office network")
 
     # 🗓 Use current UTC date
     today = datetime.utcnow().strftime("%Y-%m-%d")
-
-    # ✅ Prevent duplicate present for today
-    if status.lower() == "present":
-        existing = await db.attendance.find_one({
-            "user_id": user["user_id"],
-            "date": today,
-            "status": "present"
-        })
-        if existing:
-            raise HTTPException(status_code=400, detail="Already marked present for today")
+    user_id = normalize_user_id(user["user_id"])
 
     record = {
-        "user_id": user["user_id"],
+        "user_id": user_id,
         "status": status,
         "date": today,
         "timestamp": datetime.utcnow()
     }
 
-    await db.attendance.insert_one(record)
+    # ❌ One record per employee per day, enforced by the unique (user_id, date) index
+    try:
+        await db.attendance.insert_one(record)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Attendance already marked for today")
+
+    await apply_rollup_changes([(user_id, today, None, status)])
     return {"message": "Attendance marked successfully"}
 
-    # ❌ Prevent duplicate marking for the same date
-    check = await db.attendance.find_one({
-        "user_id": user["user_id"],
-        "date": today
-    })
-    if check:
-        raise HTTPException(status_code=400, detail="Attendance already marked for today")
+# 📥 Admin/HR: bulk ingestion for badge readers and kiosks (NDJSON or CSV body)
+@router.post("/bulk", summary="Admin/HR: Bulk upsert attendance (NDJSON or CSV)")
+async def bulk_attendance(
+    request: Request,
+    format: str = Query(None, description="ndjson/csv (defaults to the Content-Type)"),
+    user=Depends(get_current_user)
+):
+    if user["role"] not in ["admin", "hr"]:
+        raise HTTPException(status_code=403, detail="Unauthorized")
 
-    record = {
-        "user_id": user["user_id"],
-        "status": status,
-        "date": today,
-        "timestamp": datetime.utcnow()
-    }
+    fmt = (format or "").lower()
+    if not fmt:
+        fmt = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+    if fmt not in ["ndjson", "csv"]:
+        raise HTTPException(status_code=400, detail="Format must be ndjson or csv")
+
+    # Parsed and written chunk by chunk while the body is still arriving
+    result = await ingest_attendance(iter_row_chunks(request.stream(), fmt))
+    if not result["received"]:
+        raise HTTPException(status_code=400, detail="No attendance rows in request body")
+    return result
+
+# 📊 Admin/HR: attendance report served from the daily/monthly rollups
+@router.get("/report", summary="Admin/HR: Attendance report for a date range")
+async def attendance_range_report(
+    month: str = Query(None, description="YYYY-MM (shortcut for start/end)"),
+    start: str = Query(None, description="YYYY-MM-DD"),
+    end: str = Query(None, description="YYYY-MM-DD"),
+    department: str = Query(None),
+    include_employees: bool = Query(False, description="Add per-employee monthly summaries"),
+    employees_limit: int = Query(500, ge=1, le=MAX_PAGE_SIZE, description="Employee summaries per page"),
+    employees_after: str = Query(None, description="employees_next_cursor from the previous page"),
+    user=Depends(get_current_user)
+):
+    if user["role"] not in ["admin", "hr"]:
+        raise HTTPException(status_code=403, detail="Unauthorized")
 
-    await db.attendance.insert_one(record)
-    return {"message": "Attendance marked successfully"}
+    try:
+        if month:
+            first = datetime.strptime(month, "%Y-%m")
+            start = first.strftime("%Y-%m-%d")
+            end = ((first.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)).strftime("%Y-%m-%d")
+        elif start and end:
+            datetime.strptime(start, "%Y-%m-%d")
+            datetime.strptime(end, "%Y-%m-%d")
+        else:
+            raise ValueError
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Give month=YYYY-MM or start/end as YYYY-MM-DD")
+
+    return await attendance_report(start, end, department, include_employees, employees_limit, employees_after)
+
+# 📦 Admin/HR: full export for a date range (auditors), streamed batch by batch
+@router.get("/export", summary="Admin/HR: Export attendance as CSV/NDJSON (gzip)")
+async def export_attendance(params: ExportParams = Depends(), user=Depends(get_current_user)):
+    if user["role"] not in ["admin", "hr"]:
+        raise HTTPException(status_code=403, detail="Unauthorized")
+
+    params.validate()
+    query = {"date": {"$gte": params.start, "$lte": params.end}}
+    user_ids = None
+    if params.department:
+        user_ids = await department_user_ids(params.department)
+        query["user_id"] = {"$in": user_ids}
+    return stream_export(
+        "attendance", db.attendance, query, [("date", 1)], EXPORT_COLUMNS, params,
+        transform=with_employee_columns,
+        archived=lambda projection: attendance_archive.batches(
+            params.start, params.end, user_ids, newest_first=False, batch_size=params.batch_size, projection=projection
+        )
+    )
 
 # 📜 Employee: view my attendance history
 @router.get("/me", summary="View my attendance history")
-async def view_my_attendance(user=Depends(get_current_user)):
-    records = await db.attendance.find({"user_id": user["user_id"]}).sort("date", -1).to_list(length=200)
-    for r in records:
-        r["_id"] = str(r["_id"])
-    return {"user_id": user["user_id"], "attendance": records}
+async def view_my_attendance(
+    limit: int = Query(200, ge=1, le=MAX_PAGE_SIZE),
+    after: str = Query(None, description="Cursor from the X-Next-Cursor header"),
+    fields: str = Query(None, description="Comma separated fields to return, e.g. date,status"),
+    start: str = Query(None, description="YYYY-MM-DD (older records come from the archive)"),
+    end: str = Query(None, description="YYYY-MM-DD"),
+    user=Depends(get_current_user)
+):
+    start, end = parse_range(start, end)
+    records, next_cursor = await attendance_archive.history(
+        normalize_user_id(user["user_id"]), limit, after, parse_fields(fields), start, end
+    )
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    return FastJSONResponse({"user_id": user["user_id"], "attendance": records}, headers=headers)
 
 # 🧑‍💼 Admin: view all records with employee info
 @router.get("/", summary="Admin/HR: View all attendance records")
-async def view_all_attendance(user=Depends(get_current_user)):
+async def view_all_attendance(
+    page: PageParams = Depends(),
+    user=Depends(get_current_user),
+    loader: EmployeeLoader = Depends(get_employee_loader)
+):
     if user["role"] not in ["admin", "hr"]:
         raise HTTPException(status_code=403, detail="Unauthorized")
 
-    records = await db.attendance.find().sort("date", -1).to_list(length=300)
-    enriched = []
-    for r in records:
-        emp = await get_employee_details(r["user_id"])
-        r["_id"] = str(r["_id"])
-        if emp:
-            r["employee"] = {
-                "name": emp["name"],
-                "department": emp["department"],
-                "role": emp["role"]
-            }
-        enriched.append(r)
-    return enriched
+    return await paginate(
+        db.attendance, {}, [("date", -1)], page,
+        transform=lambda batch: enrich_attendance(batch, loader), default_limit=300,
+        projection=page.projection(required=["user_id"])
+    )
 
 # 📅 Admin: view all employees present today
 @router.get("/present-today", summary="Admin: View today's present employees")
-async def view_present_today(user=Depends(get_current_user)):
+async def view_present_today(
+    page: PageParams = Depends(),
+    user=Depends(get_current_user),
+    loader: EmployeeLoader = Depends(get_employee_loader)
+):
     if user["role"] not in ["admin", "hr"]:
         raise HTTPException(status_code=403, detail="Unauthorized")
 
     today = datetime.utcnow().strftime("%Y-%m-%d")
-    records = await db.attendance.find({"date": today, "status": "present"}).to_list(length=100)
-    enriched = []
-    for r in records:
-        emp = await get_employee_details(r["user_id"])
-        r["_id"] = str(r["_id"])
-        if emp:
-            r["employee"] = {
-                "name": emp["name"],
-                "department": emp["department"],
-                "role": emp["role"]
-            }
-        enriched.append(r)
-    return enriched
+    return await paginate(
+        db.attendance, {"date": today, "status": "present"}, [("_id", 1)], page,
+        transform=lambda batch: enrich_attendance(batch, loader), default_limit=100,
+        projection=page.projection(required=["user_id"])
+    )
 
 # 👤 Admin: view attendance of a specific employee
 @router.get("/{user_id}", summary="Admin: View attendance by employee user_id")
-async def view_employee_attendance(user_id: str, user=Depends(get_current_user)):
+async def view_employee_attendance(
+    user_id: str,
+    page: PageParams = Depends(),
+    start: str = Query(None, description="YYYY-MM-DD (older records come from the archive)"),
+    end: str = Query(None, description="YYYY-MM-DD"),
+    user=Depends(get_current_user),
+    loader: EmployeeLoader = Depends(get_employee_loader)
+):
     if user["role"] not in ["admin", "hr"]:
         raise HTTPException(status_code=403, detail="Unauthorized")
 
-    records = await db.attendance.find({
-        "user_id": {"$regex": f"^{user_id}$", "$options": "i"}
-    }).sort("date", -1).to_list(length=100)
-
-    emp = await get_employee_details(user_id)
-    enriched = []
-    for r in records:
-        r["_id"] = str(r["_id"])
-        if emp:
-            r["employee"] = {
-                "name": emp["name"],
-                "department": emp["department"],
-                "role": emp["role"]
-            }
-        enriched.append(r)
-
-    return enriched
+    start, end = parse_range(start, end)
+    user_id = normalize_user_id(user_id)
+    projection = page.projection(required=["user_id"])
+    if page.stream:
+        batches = attendance_archive.history_batches(
+            user_id, page.batch_size, page.after, page.limit, projection, start, end
+        )
+        return stream_documents(batches, lambda batch: enrich_attendance(batch, loader), page.stream)
+
+    records, next_cursor = await attendance_archive.history(user_id, page.limit or 100, page.after, projection, start, end)
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    return FastJSONResponse(await enrich_attendance(records, loader), headers=headers)
@@ -1,16 +1,18 @@
 from fastapi import APIRouter, HTTPException, Depends, Form, Request
 from fastapi.responses import HTMLResponse
-from passlib.context import CryptContext
 from jose import jwt, JWTError
 from datetime import datetime, timedelta
 
 from app.db.mongo import db
 from app.auth.jwt_handler import create_jwt_token
-from app.utils.send_email import send_reset_email
-from app.core.config import JWT_SECRET
+from app.auth.passwords import password_hasher
+from app.auth.revocation import revoke_sessions
+from app.utils.employee_cache import employee_cache
+from app.utils.email_outbox import enqueue_reset_email
+from app.utils.normalize import normalize_email
+from app.core.config import JWT_SECRET, REVOKE_SESSIONS_ON_PASSWORD_RESET
 
 router = APIRouter()
-password_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 RESET_SECRET = JWT_SECRET
 
@@ -20,11 +22,20 @@ async def login_user(
     email: str = Form(""),
     password: str = Form("")
 ):
+    email = normalize_email(email)
     user = await db.users.find_one({"email": email})
-    if not user or not password_context.verify(password, user["password"]):
+    if not user:
+        raise HTTPException(status_code=400, detail="Invalid credentials")
+
+    valid, new_hash = await password_hasher.verify_and_update(password, user["password"])
+    if not valid:
         raise HTTPException(status_code=400, detail="Invalid credentials")
 
-    employee = await db.employees.find_one({"email": email})
+    # 🔁 Stored hash uses an old bcrypt cost: replace it transparently
+    if new_hash:
+        await db.users.update_one({"_id": user["_id"]}, {"$set": {"password": new_hash}})
+
+    employee = await employee_cache.get_by_email(email)
     if not employee:
         raise HTTPException(status_code=404, detail="Employee details not found")
 
@@ -46,6 +57,7 @@ async def login_user(
 
 @router.post("/request-reset", summary="Request password reset")
 async def request_password_reset(email: str = Form(""), request: Request = None):
+    email = normalize_email(email)
     user = await db.users.find_one({"email": email})
     if not user:
         raise HTTPException(status_code=404, detail="Email not registered")
@@ -56,7 +68,7 @@ async def request_password_reset(email: str = Form(""), request: Request = None)
     }, RESET_SECRET, algorithm="HS256")
 
     reset_link = f"https://talenttrack-om95.onrender.com/auth/reset-password?token={reset_token}"
-    send_reset_email(email, reset_link)
+    await enqueue_reset_email(email, reset_link)
 
     return {"message": "Password reset link sent to your email"}
 
@@ -92,12 +104,18 @@ async def reset_password(
     except JWTError:
         raise HTTPException(status_code=400, detail="Invalid or expired token")
 
-    hashed_pw = password_context.hash(new_password)
+    hashed_pw = await password_hasher.hash(new_password)
     result = await db.users.update_one(
-        {"email": email},
+        {"email": normalize_email(email)},
         {"$set": {"password": hashed_pw}}
     )
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="User not found")
 
+    # 🚫 Log out every existing session of this user
+    if REVOKE_SESSIONS_ON_PASSWORD_RESET:
+        employee = await employee_cache.get_by_email(email)
+        if employee:
+            await revoke_sessions(normalize_email(email), employee["user_id"])
+
     return {"message": "Password reset successful"}
@@ -0,0 +1,13 @@
+from fastapi import APIRouter, HTTPException, Depends
+from app.auth.dependencies import get_current_user
+from app.utils.dashboard import dashboard_cache
+
+router = APIRouter()
+
+# 📊 HR home page: headcount, today's attendance, pending leaves and payroll totals
+@router.get("/", summary="Admin/HR: Dashboard summary (cached for a few seconds)")
+async def get_dashboard(user=Depends(get_current_user)):
+    if user["role"] not in ["admin", "hr"]:
+        raise HTTPException(status_code=403, detail="Unauthorized")
+
+    return await dashboard_cache.get()
@@ -1,16 +1,20 @@
-from fastapi import APIRouter, HTTPException, Depends, Form
+from fastapi import APIRouter, HTTPException, Depends, Form, Request, Query
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 from app.db.mongo import db
+from app.db.transactions import run_in_transaction
 from app.auth.dependencies import get_current_user
 from app.utils.employee_id import get_next_employee_id
-from passlib.hash import bcrypt  # ✅ Correct hashing import
+from app.utils.normalize import normalize_email, normalize_user_id
+from app.utils.pagination import PageParams, paginate
+from app.utils.serializers import FastJSONResponse, parse_fields, project
+from app.utils.employee_cache import employee_cache
+from app.utils.employee_search import employee_search
+from app.auth.passwords import password_hasher
+from app.utils.onboarding import parse_employee_rows, onboard_employees
 
 router = APIRouter()
 
-def serialize_employee(emp):
-    emp["_id"] = str(emp["_id"])
-    return emp
-
 @router.post("/", summary="Create employee (form)")
 async def create_employee(
     name: str = Form("", description="Enter The Name", example="john"),
@@ -23,18 +27,15 @@ async def create_employee(
     if user["role"] not in ["admin", "hr"]:
         raise HTTPException(status_code=403, detail="Unauthorized")
 
-    # 🔍 Check if user already exists
-    existing_user = await db.users.find_one({"email": email})
-    if existing_user:
-        raise HTTPException(
-            status_code=400,
-            detail=f"User with email '{email}' already exists."
-        )
+    email = normalize_email(email)
+
+    # 🔐 Default password is hashed up front (worker pool, no database round trip)
+    default_password = "12345"
+    hashed_password = await password_hasher.hash(default_password)
 
     # 🆔 Generate employee ID
     employee_id = await get_next_employee_id()
 
-    # 👤 Insert into employees collection
     employee_data = {
         "name": name,
         "email": email,
@@ -43,35 +44,89 @@ async def create_employee(
         "joining_date": joining_date,
         "user_id": employee_id
     }
-    await db.employees.insert_one(employee_data)
-
-    # 🔐 Insert into users collection with default password
-    default_password = "12345"
-    hashed_password = bcrypt.hash(default_password)
-
     user_data = {
         "email": email,
         "password": hashed_password,
         "role": role,
         "is_active": True
     }
-    await db.users.insert_one(user_data)
+
+    # 👤 users + employees are written together; the unique users.email index
+    # rejects duplicates (including concurrent requests for the same email)
+    async def insert_records(session):
+        await db.users.insert_one(user_data, session=session)
+        await db.employees.insert_one(employee_data, session=session)
+
+    async def undo_records():
+        for collection, doc in ((db.users, user_data), (db.employees, employee_data)):
+            if "_id" in doc:
+                await collection.delete_one({"_id": doc["_id"]})
+
+    try:
+        await run_in_transaction(insert_records, rollback=undo_records)
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"User with email '{email}' already exists."
+        )
+    await employee_cache.invalidate(employee_id, email)
 
     return {"message": "Employee and user created successfully", "employee_id": employee_id}
 
+# 👥 Bulk onboarding (CSV, JSON array or NDJSON body)
+@router.post("/bulk", summary="Bulk import employees (CSV/JSON)")
+async def bulk_create_employees(
+    request: Request,
+    format: str = Query(None, description="csv/json (defaults to the Content-Type)"),
+    user=Depends(get_current_user)
+):
+    if user["role"] not in ["admin", "hr"]:
+        raise HTTPException(status_code=403, detail="Unauthorized")
+
+    fmt = (format or "").lower()
+    if not fmt:
+        fmt = "csv" if "csv" in request.headers.get("content-type", "") else "json"
+    if fmt not in ["csv", "json"]:
+        raise HTTPException(status_code=400, detail="Format must be csv or json")
+
+    try:
+        rows = parse_employee_rows(await request.body(), fmt)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Could not parse body: {e}")
+    if not rows:
+        raise HTTPException(status_code=400, detail="No employee rows in request body")
+
+    return await onboard_employees(rows)
+
 @router.get("/", summary="List all employees")
-async def list_employees(user=Depends(get_current_user)):
-    employees = await db.employees.find().to_list(length=100)
-    return [serialize_employee(e) for e in employees]
+async def list_employees(page: PageParams = Depends(), user=Depends(get_current_user)):
+    return await paginate(db.employees, {}, [("_id", 1)], page, default_limit=100, projection=page.projection())
+
+# 🔎 Typeahead search over name, email, department, role and user_id (declared before /{user_id})
+@router.get("/search", summary="Search employees (prefix / typeahead)")
+async def search_employees(
+    q: str = Query(..., min_length=1, max_length=100, description="Words or word prefixes, e.g. 'jo eng'"),
+    department: str = Query(None, description="Exact department filter"),
+    role: str = Query(None, description="Exact role filter"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10000),
+    user=Depends(get_current_user)
+):
+    found = await employee_search.search(q, department, role, limit, offset)
+    next_offset = offset + limit if offset + limit < found["total"] else None
+    return {"query": q, "total": found["total"], "next_offset": next_offset, "results": found["results"]}
 
 @router.get("/{user_id}", summary="Get single employee")
-async def get_employee(user_id: str, user=Depends(get_current_user)):
-    employee = await db.employees.find_one({
-        "user_id": {"$regex": f"^{user_id}$", "$options": "i"}  # case-insensitive match
-    })
+async def get_employee(
+    user_id: str,
+    fields: str = Query(None, description="Comma separated fields to return, e.g. name,email"),
+    user=Depends(get_current_user)
+):
+    projection = parse_fields(fields)
+    employee = await employee_cache.get_by_user_id(user_id)
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
-    return serialize_employee(employee)
+    return FastJSONResponse(project(employee, projection))
 
 @router.put("/{user_id}", summary="Update employee (form)")
 async def update_employee(
@@ -100,14 +155,18 @@ async def update_employee(
     if not update_data:
         raise HTTPException(status_code=400, detail="No valid fields to update.")
 
+    if "email" in update_data:
+        update_data["email"] = normalize_email(update_data["email"])
+
     result = await db.employees.update_one(
-        {"user_id": {"$regex": f"^{user_id}$", "$options": "i"}},  # Case-insensitive match
+        {"user_id": normalize_user_id(user_id)},
         {"$set": update_data}
     )
 
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Employee not found")
 
+    await employee_cache.invalidate(normalize_user_id(user_id), update_data.get("email"))
     return {"message": "Employee updated"}
 
 
@@ -116,11 +175,11 @@ async def delete_employee(user_id: str, user=Depends(get_current_user)):
     if user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Only admin can delete employees")
 
-    result = await db.employees.delete_one(
-        {"user_id": {"$regex": f"^{user_id}$", "$options": "i"}}
-    )
+    result = await db.employees.delete_one({"user_id": normalize_user_id(user_id)})
 
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Employee not found")
+
+    await employee_cache.invalidate(normalize_user_id(user_id))
     return {"message": "Employee deleted"}
 
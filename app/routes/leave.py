@@ -1,14 +1,26 @@
-from fastapi import APIRouter, HTTPException, Depends, Form
+from fastapi import APIRouter, HTTPException, Depends, Form, Query
 from datetime import datetime, date
 from bson import ObjectId
 from app.db.mongo import db
 from app.auth.dependencies import get_current_user
+from app.utils.employee_loader import EmployeeLoader, get_employee_loader
+from app.utils.normalize import normalize_user_id
+from app.utils.employee_cache import employee_cache
+from app.utils.pagination import PageParams, paginate, fetch_page, MAX_PAGE_SIZE
+from app.utils.serializers import FastJSONResponse, parse_fields
+from app.utils.leave_ledger import (
+    MAX_ANNUAL_LEAVES, get_taken_days, consume_leave_days, release_leave_days
+)
+from app.utils.leave_calendar import CALENDAR_MAX_MONTHS, calendar_cache, default_window, months_between
+from app.utils.export import ExportParams, department_user_ids, stream_export, with_employee_columns
 from enum import Enum
-from collections import defaultdict
 
 router = APIRouter()
 
-MAX_ANNUAL_LEAVES = 20
+EXPORT_COLUMNS = (
+    "user_id", "employee_name", "department", "type", "from_date", "to_date",
+    "days_requested", "status", "reason", "applied_at", "processed_at",
+)
 
 class LeaveType(str, Enum):
     leave = "leave"
@@ -19,7 +31,6 @@ def parse_date(date_str: str) -> date:
     return datetime.strptime(date_str, "%Y-%m-%d").date()
 
 def serialize_leave(leave, employee=None):
-    leave["_id"] = str(leave["_id"])
     if employee:
         leave["employee"] = {
             "user_id": employee.get("user_id"),
@@ -31,6 +42,11 @@ def serialize_leave(leave, employee=None):
         }
     return leave
 
+# 🧩 Serialize a batch of leaves with one employee lookup for the batch
+async def serialize_leaves(leaves, loader: EmployeeLoader):
+    await loader.load_many(l.get("user_id") for l in leaves)
+    return [serialize_leave(l, loader.get(l.get("user_id"))) for l in leaves]
+
 # 🚀 Apply for leave
 @router.post("/", summary="Apply for leave (form)")
 async def apply_leave(
@@ -40,11 +56,9 @@ async def apply_leave(
     reason: str = Form(...),
     user=Depends(get_current_user)
 ):
-    user_id = user["user_id"]
+    user_id = normalize_user_id(user["user_id"])
 
-    employee = await db.employees.find_one({
-        "user_id": {"$regex": f"^{user_id}$", "$options": "i"}
-    })
+    employee = await employee_cache.get_by_user_id(user_id)
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
 
@@ -57,26 +71,7 @@ async def apply_leave(
     days_requested = (to_dt - from_dt).days + 1
 
     # Approved leaves so far this year
-    current_year = datetime.utcnow().year
-    start_of_year = datetime(current_year, 1, 1)
-
-    leave_stats = await db.leaves.aggregate([
-        {
-            "$match": {
-                "user_id": {"$regex": f"^{user_id}$", "$options": "i"},
-                "status": "approved",
-                "applied_at": {"$gte": start_of_year}
-            }
-        },
-        {
-            "$group": {
-                "_id": None,
-                "total_days": {"$sum": "$days_requested"}
-            }
-        }
-    ]).to_list(1)
-
-    taken_days = leave_stats[0]["total_days"] if leave_stats else 0
+    taken_days = await get_taken_days(employee["user_id"], datetime.utcnow().year)
     if taken_days + days_requested > MAX_ANNUAL_LEAVES:
         remaining = MAX_ANNUAL_LEAVES - taken_days
         raise HTTPException(status_code=400, detail=f"Leave quota exceeded. You have {remaining} days left.")
@@ -102,54 +97,43 @@ async def apply_leave(
 
 # 🧾 All leaves with employee details
 @router.get("/", summary="View all leave requests")
-async def view_all_leaves(user=Depends(get_current_user)):
+async def view_all_leaves(
+    page: PageParams = Depends(),
+    user=Depends(get_current_user),
+    loader: EmployeeLoader = Depends(get_employee_loader)
+):
     if user["role"] not in ["admin", "hr"]:
         raise HTTPException(status_code=403, detail="Unauthorized")
 
-    leaves = await db.leaves.find().to_list(200)
-    results = []
-    for leave in leaves:
-        emp = await db.employees.find_one({
-            "user_id": {"$regex": f"^{leave['user_id']}$", "$options": "i"}
-        })
-        results.append(serialize_leave(leave, emp))
-    return results
+    return await paginate(
+        db.leaves, {}, [("_id", 1)], page,
+        transform=lambda batch: serialize_leaves(batch, loader), default_limit=200,
+        projection=page.projection(required=["user_id"])
+    )
 
 # 👤 My leaves
 @router.get("/me", summary="View my leaves and available quota")
-async def view_my_leaves(user=Depends(get_current_user)):
-    user_id = user["user_id"]
-
-    leaves = await db.leaves.find({
-        "user_id": {"$regex": f"^{user_id}$", "$options": "i"}
-    }).to_list(100)
-
-    current_year = datetime.utcnow().year
-    start_of_year = datetime(current_year, 1, 1)
+async def view_my_leaves(
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    after: str = Query(None, description="Cursor from the X-Next-Cursor header"),
+    fields: str = Query(None, description="Comma separated fields to return, e.g. type,status"),
+    user=Depends(get_current_user)
+):
+    user_id = normalize_user_id(user["user_id"])
 
-    taken = await db.leaves.aggregate([
-        {
-            "$match": {
-                "user_id": {"$regex": f"^{user_id}$", "$options": "i"},
-                "status": "approved",
-                "applied_at": {"$gte": start_of_year}
-            }
-        },
-        {
-            "$group": {"_id": None, "total": {"$sum": "$days_requested"}}
-        }
-    ]).to_list(1)
+    leaves, next_cursor = await fetch_page(
+        db.leaves, {"user_id": user_id}, [("_id", 1)], limit, after, projection=parse_fields(fields)
+    )
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
 
-    used = taken[0]["total"] if taken else 0
-    emp = await db.employees.find_one({
-        "user_id": {"$regex": f"^{user_id}$", "$options": "i"}
-    })
+    used = await get_taken_days(user_id, datetime.utcnow().year)
+    emp = await employee_cache.get_by_user_id(user_id)
 
-    return {
+    return FastJSONResponse({
         "available_leaves": MAX_ANNUAL_LEAVES - used,
         "used_leaves": used,
         "history": [serialize_leave(l, emp) for l in leaves]
-    }
+    }, headers=headers)
 
 # ✅ Update leave status (approve/reject)
 @router.put("/{user_id}/status", summary="Update latest pending leave status for user_id")
@@ -167,7 +151,7 @@ async def update_leave_status_by_user_id(
     # Find the latest pending leave for the given user_id
     leave = await db.leaves.find_one(
         {
-            "user_id": {"$regex": f"^{user_id}$", "$options": "i"},
+            "user_id": normalize_user_id(user_id),
             "status": "pending"
         },
         sort=[("applied_at", -1)]
@@ -176,48 +160,116 @@ async def update_leave_status_by_user_id(
     if not leave:
         raise HTTPException(status_code=404, detail="No pending leave found for this user_id")
 
-    await db.leaves.update_one(
-        {"_id": leave["_id"]},
+    # 📒 Book approved days against the yearly ledger (atomic quota check)
+    year = leave["applied_at"].year
+    days = leave.get("days_requested", 0)
+    if status == "approved" and not await consume_leave_days(leave["user_id"], year, days):
+        raise HTTPException(status_code=400, detail="Leave quota exceeded for this employee")
+
+    result = await db.leaves.update_one(
+        {"_id": leave["_id"], "status": "pending"},
         {"$set": {"status": status, "processed_at": datetime.utcnow()}}
     )
+    if result.matched_count == 0:
+        # Someone else processed this leave in the meantime
+        if status == "approved":
+            await release_leave_days(leave["user_id"], year, days)
+        raise HTTPException(status_code=409, detail="Leave was already processed")
+
+    calendar_cache.invalidate()
 
     return {
         "message": f"Leave {status}",
         "user_id": user_id,
         "leave_id": str(leave["_id"])
     }
-# 🗓 Calendar grouped by month
+# 🗓 Calendar grouped by month (a leave shows up in every month it covers)
 @router.get("/calendar", summary="Leave calendar grouped by month")
-async def leave_calendar(user=Depends(get_current_user)):
-    query = {"status": "approved"}
-    if user["role"] == "employee":
-        query["user_id"] = {"$regex": f"^{user['user_id']}$", "$options": "i"}
+async def leave_calendar(
+    from_date: str = Query(None, alias="from", description="YYYY-MM-DD (default: start of this month)"),
+    to_date: str = Query(None, alias="to", description="YYYY-MM-DD (default: end of next month)"),
+    user=Depends(get_current_user),
+    loader: EmployeeLoader = Depends(get_employee_loader)
+):
+    default_start, default_end = default_window(datetime.utcnow().date())
+    try:
+        start = parse_date(from_date) if from_date else default_start
+        end = parse_date(to_date) if to_date else default_end
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be in YYYY-MM-DD format")
+    if end < start:
+        raise HTTPException(status_code=400, detail="'to' must be after or equal to 'from'")
+    # Every approved leave in the window is loaded at once, so the window is capped
+    if len(list(months_between(start, end))) > CALENDAR_MAX_MONTHS:
+        raise HTTPException(status_code=400, detail=f"The calendar window can span at most {CALENDAR_MAX_MONTHS} months")
+
+    scope = normalize_user_id(user["user_id"]) if user["role"] == "employee" else None
+    cache_key = (scope, start, end)
+    cacheable = (start, end) == (default_start, default_end)
+    if cacheable:
+        cached = calendar_cache.get(cache_key)
+        if cached is not None:
+            return FastJSONResponse(cached)
+
+    # Overlap query served by the (status, from_date, to_date) index
+    query = {
+        "status": "approved",
+        "from_date": {"$lte": end.isoformat()},
+        "to_date": {"$gte": start.isoformat()}
+    }
+    if scope:
+        query["user_id"] = scope
 
-    leaves = await db.leaves.find(query).to_list(200)
-    calendar = defaultdict(list)
+    leaves = await db.leaves.find(query).sort("from_date", 1).to_list(length=None)
+    await loader.load_many(l["user_id"] for l in leaves)
 
+    months = {}
     for leave in leaves:
-        from_dt = parse_date(leave["from_date"])
-        month = from_dt.strftime("%B %Y")
-        emp = await db.employees.find_one({
-            "user_id": {"$regex": f"^{leave['user_id']}$", "$options": "i"}
-        })
-        calendar[month].append(serialize_leave(leave, emp))
+        item = serialize_leave(leave, loader.get(leave["user_id"]))
+        span_start = max(parse_date(leave["from_date"]), start)
+        span_end = min(parse_date(leave["to_date"]), end)
+        for month in months_between(span_start, span_end):
+            months.setdefault(month, []).append(item)
 
-    return dict(calendar)
+    calendar = {month.strftime("%B %Y"): months[month] for month in sorted(months)}
+    if cacheable:
+        calendar_cache.put(cache_key, calendar)
+    return FastJSONResponse(calendar)
 
 # 📊 View by status (approved / pending / rejected)
 @router.get("/status/{status}", summary="Get leaves filtered by status")
-async def leaves_by_status(status: str, user=Depends(get_current_user)):
+async def leaves_by_status(
+    status: str,
+    page: PageParams = Depends(),
+    user=Depends(get_current_user),
+    loader: EmployeeLoader = Depends(get_employee_loader)
+):
     if user["role"] not in ["admin", "hr"]:
         raise HTTPException(status_code=403, detail="Unauthorized")
 
-    leaves = await db.leaves.find({"status": status}).to_list(100)
-    result = []
-    for leave in leaves:
-        emp = await db.employees.find_one({
-            "user_id": {"$regex": f"^{leave['user_id']}$", "$options": "i"}
-        })
-        result.append(serialize_leave(leave, emp))
+    return await paginate(
+        db.leaves, {"status": status}, [("_id", 1)], page,
+        transform=lambda batch: serialize_leaves(batch, loader), default_limit=100,
+        projection=page.projection(required=["user_id"])
+    )
+
+# 📦 Admin/HR: every leave overlapping a date range, streamed as CSV/NDJSON
+@router.get("/export", summary="Admin/HR: Export leaves as CSV/NDJSON (gzip)")
+async def export_leaves(
+    params: ExportParams = Depends(),
+    status: str = Query(None, description="approved / pending / rejected"),
+    user=Depends(get_current_user)
+):
+    if user["role"] not in ["admin", "hr"]:
+        raise HTTPException(status_code=403, detail="Unauthorized")
 
-    return result
+    params.validate()
+    query = {"from_date": {"$lte": params.end}, "to_date": {"$gte": params.start}}
+    if status:
+        query["status"] = status
+    if params.department:
+        query["user_id"] = {"$in": await department_user_ids(params.department)}
+    return stream_export(
+        "leaves", db.leaves, query, [("from_date", 1)], EXPORT_COLUMNS, params,
+        transform=with_employee_columns
+    )
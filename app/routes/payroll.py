@@ -1,13 +1,25 @@
-from fastapi import APIRouter, HTTPException, Depends, Form
+from fastapi import APIRouter, HTTPException, Depends, Form, Query, Response
+from fastapi.responses import StreamingResponse
+import time
 from datetime import datetime
+from pymongo.errors import DuplicateKeyError
 from app.db.mongo import db
 from app.auth.dependencies import get_current_user
+from app.utils.normalize import normalize_user_id, filename_part
+from app.utils.employee_cache import employee_cache
+from app.utils.pagination import PageParams, paginate, iter_batches
+from app.utils.payroll_run import PERIOD_PATTERN, start_payroll_run, serialize_run
+from app.utils.payroll_rules import get_payroll_frame, simulate
+from app.models.payroll import PayrollScenario
+from app.utils.pdf_generator import payslip_renderer, payslip_filename, stream_payslip_zip
+from app.utils.export import ExportParams, stream_export
 
 router = APIRouter()
 
-def serialize_document(doc):
-    doc["_id"] = str(doc["_id"])
-    return doc
+EXPORT_COLUMNS = (
+    "period", "user_id", "employee_name", "department",
+    "base_salary", "bonus", "deductions", "total_salary", "run_id", "generated_at",
+)
 
 @router.post("/", summary="Generate payroll (form)")
 async def generate_salary(
@@ -20,20 +32,13 @@ async def generate_salary(
     if user["role"] not in ["admin", "hr"]:
         raise HTTPException(status_code=403, detail="Only HR/Admin can generate payroll")
 
+    user_id = normalize_user_id(user_id)
+
     # 🔍 Check if employee exists
-    employee = await db.employees.find_one({
-        "user_id": {"$regex": f"^{user_id}$", "$options": "i"}
-    })
+    employee = await employee_cache.get_by_user_id(user_id)
     if not employee:
         raise HTTPException(status_code=404, detail="Employee with given user_id not found")
 
-    # ❌ Prevent duplicate payroll entry
-    existing = await db.payrolls.find_one({
-        "user_id": {"$regex": f"^{user_id}$", "$options": "i"}
-    })
-    if existing:
-        raise HTTPException(status_code=400, detail="Payroll already exists for this employee. Use update.")
-
     total_salary = base_salary + bonus - deductions
 
     payroll_data = {
@@ -46,7 +51,12 @@ async def generate_salary(
         "generated_at": datetime.utcnow()
     }
 
-    result = await db.payrolls.insert_one(payroll_data)
+    # ❌ Duplicate payroll entries are rejected by the unique payrolls.user_id index
+    try:
+        await db.payrolls.insert_one(payroll_data)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Payroll already exists for this employee. Use update.")
+
     return {
         "message": "Payroll generated successfully",
         "employee": {
@@ -68,17 +78,17 @@ async def update_payroll(
     if user["role"] not in ["admin", "hr"]:
         raise HTTPException(status_code=403, detail="Only HR/Admin can update payroll")
 
+    user_id = normalize_user_id(user_id)
+
     # 🔍 Validate payroll exists
-    existing = await db.payrolls.find_one({
-        "user_id": {"$regex": f"^{user_id}$", "$options": "i"}
-    })
+    existing = await db.payrolls.find_one({"user_id": user_id})
     if not existing:
         raise HTTPException(status_code=404, detail="Payroll not found for this employee")
 
     total_salary = base_salary + bonus - deductions
 
     update_result = await db.payrolls.update_one(
-        {"user_id": {"$regex": f"^{user_id}$", "$options": "i"}},
+        {"user_id": user_id},
         {
             "$set": {
                 "base_salary": base_salary,
@@ -92,24 +102,123 @@ async def update_payroll(
 
     return {"message": "Payroll updated successfully", "total_salary": total_salary}
 
+# 🏃 Payroll run for a whole department (or the whole company) in the background
+@router.post("/runs", summary="Start a payroll run for a pay period", status_code=202)
+async def create_payroll_run(
+    period: str = Form(..., description="Pay period (YYYY-MM)"),
+    department: str = Form("", description="Leave empty for the whole company"),
+    user=Depends(get_current_user)
+):
+    if user["role"] not in ["admin", "hr"]:
+        raise HTTPException(status_code=403, detail="Only HR/Admin can run payroll")
+
+    if not PERIOD_PATTERN.match(period):
+        raise HTTPException(status_code=400, detail="Period must be in YYYY-MM format")
+
+    run, started = await start_payroll_run(period, department.strip() or None, user["user_id"])
+    return {
+        "message": "Payroll run started" if started else "Payroll run already in progress",
+        "run": serialize_run(run)
+    }
+
+@router.get("/runs/{run_id}", summary="Payroll run status and progress")
+async def get_payroll_run(run_id: str, user=Depends(get_current_user)):
+    if user["role"] not in ["admin", "hr"]:
+        raise HTTPException(status_code=403, detail="Unauthorized")
+
+    run = await db.payroll_runs.find_one({"_id": run_id})
+    if not run:
+        raise HTTPException(status_code=404, detail="Payroll run not found")
+    return serialize_run(run)
+
+# 🧮 What-if simulation over the whole workforce
+@router.post("/simulate", summary="Simulate raises, tax slabs and deduction policies")
+async def simulate_payroll(
+    scenario: PayrollScenario,
+    refresh: bool = Query(False, description="Reload the payroll snapshot first"),
+    user=Depends(get_current_user)
+):
+    if user["role"] not in ["admin", "hr"]:
+        raise HTTPException(status_code=403, detail="Unauthorized")
+
+    frame = await get_payroll_frame(refresh)
+    started = time.perf_counter()
+    result = simulate(frame, scenario)
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    return result
+
+# 📦 Admin/HR: payslips of a range of pay periods as CSV/NDJSON (gzip)
+@router.get("/export", summary="Admin/HR: Export payslips for a period range (YYYY-MM)")
+async def export_payslips(params: ExportParams = Depends(), user=Depends(get_current_user)):
+    if user["role"] not in ["admin", "hr"]:
+        raise HTTPException(status_code=403, detail="Unauthorized")
+
+    params.validate("%Y-%m", "YYYY-MM")
+    query = {"period": {"$gte": params.start, "$lte": params.end}}
+    if params.department:
+        query["department"] = params.department
+    return stream_export("payslips", db.payslips, query, [("period", 1)], EXPORT_COLUMNS, params)
+
+# 🧾 Payslips of a period as a ZIP, streamed while the PDFs are rendered
+@router.get("/payslips/{period}/archive", summary="Download a department's payslips as ZIP")
+async def download_payslip_archive(
+    period: str,
+    department: str = Query(None, description="Leave empty for the whole company"),
+    user=Depends(get_current_user)
+):
+    if user["role"] not in ["admin", "hr"]:
+        raise HTTPException(status_code=403, detail="Unauthorized")
+    if not PERIOD_PATTERN.match(period):
+        raise HTTPException(status_code=400, detail="Period must be in YYYY-MM format")
+
+    query = {"period": period}
+    if department:
+        query["department"] = department
+    if not await db.payslips.find_one(query, {"_id": 1}):
+        raise HTTPException(status_code=404, detail="No payslips found for this period")
+
+    batches = iter_batches(db.payslips, query, [("_id", 1)], payslip_renderer.workers * 4)
+    filename = f"payslips_{period}_{filename_part(department or 'all')}.zip"
+    return StreamingResponse(
+        stream_payslip_zip(batches),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.get("/payslips/{period}/{user_id}", summary="Download a payslip PDF")
+async def download_payslip(period: str, user_id: str, user=Depends(get_current_user)):
+    if user["role"] not in ["admin", "hr", "employee"]:
+        raise HTTPException(status_code=403, detail="Unauthorized")
+
+    if user["role"] == "employee" and user["user_id"].lower() != user_id.lower():
+        raise HTTPException(status_code=403, detail="Access denied")
+    if not PERIOD_PATTERN.match(period):
+        raise HTTPException(status_code=400, detail="Period must be in YYYY-MM format")
+
+    payslip = await db.payslips.find_one({"_id": f"{normalize_user_id(user_id)}:{period}"})
+    if not payslip:
+        raise HTTPException(status_code=404, detail="Payslip not found")
+
+    return Response(
+        content=await payslip_renderer.render(payslip),
+        media_type="application/pdf",
+        headers={"Content-Disposition": f'attachment; filename="{payslip_filename(payslip)}"'}
+    )
+
 @router.get("/", summary="List all payrolls")
-async def list_payrolls(user=Depends(get_current_user)):
+async def list_payrolls(page: PageParams = Depends(), user=Depends(get_current_user)):
     if user["role"] not in ["admin", "hr"]:
         raise HTTPException(status_code=403, detail="Unauthorized")
 
-    payrolls = await db.payrolls.find().to_list(length=100)
-    return [serialize_document(p) for p in payrolls]
+    return await paginate(db.payrolls, {}, [("_id", 1)], page, default_limit=100, projection=page.projection())
 
 @router.get("/employee/{user_id}", summary="View payrolls for an employee")
-async def employee_payrolls(user_id: str, user=Depends(get_current_user)):
+async def employee_payrolls(user_id: str, page: PageParams = Depends(), user=Depends(get_current_user)):
     if user["role"] not in ["admin", "hr", "employee"]:
         raise HTTPException(status_code=403, detail="Unauthorized")
 
     if user["role"] == "employee" and user["user_id"].lower() != user_id.lower():
         raise HTTPException(status_code=403, detail="Access denied")
 
-    payrolls = await db.payrolls.find({
-        "user_id": {"$regex": f"^{user_id}$", "$options": "i"}
-    }).to_list(length=100)
-
-    return [serialize_document(p) for p in payrolls]
+    query = {"user_id": normalize_user_id(user_id)}
+    return await paginate(db.payrolls, query, [("_id", 1)], page, default_limit=100, projection=page.projection())
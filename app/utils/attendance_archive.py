@@ -0,0 +1,350 @@
+import argparse
+import asyncio
+import gzip
+import itertools
+import os
+import time
+from collections import deque
+from contextlib import aclosing
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from bson import json_util
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+from app.db.mongo import db
+from app.core.config import ATTENDANCE_ARCHIVE_DIR, ATTENDANCE_ARCHIVE_TIER, ATTENDANCE_HOT_DAYS
+from app.utils.leave_calendar import month_start, next_month
+from app.utils.pagination import decode_cursor, encode_cursor, fetch_page, iter_batches
+from app.utils.serializers import project
+
+TIERS = ("collection", "file")
+STATE_ID = "attendance"
+STATE_CACHE_SECONDS = 30   # workers pick up a new cutoff within this long
+ARCHIVE_BATCH_SIZE = 5000
+HISTORY_SORT = [("date", -1), ("_id", -1)]
+
+def archive_collection(year: str):
+    return db[f"attendance_archive_{year}"]
+
+def _months(first: str, last: str):
+    month = month_start(date.fromisoformat(first))
+    while month.isoformat() <= last:
+        yield month.isoformat()[:7]
+        month = next_month(month)
+
+def _date_filter(start=None, end=None, before=None):
+    dates = {}
+    if start:
+        dates["$gte"] = start
+    if end:
+        dates["$lte"] = end
+    if before:
+        dates["$lt"] = before
+    return dates
+
+def _user_filter(user_ids):
+    user_ids = list(user_ids)
+    return user_ids[0] if len(user_ids) == 1 else {"$in": user_ids}
+
+
+# 🗄 Cold tier as gzipped NDJSON: one file per month, ordered by (date, user_id)
+# so late writes can be merged in with one streaming pass. Extended JSON keeps
+# ObjectIds and datetimes intact for the cursor.
+def _archive_root() -> Path:
+    if not ATTENDANCE_ARCHIVE_DIR or not os.path.isabs(ATTENDANCE_ARCHIVE_DIR):
+        raise ValueError("ATTENDANCE_ARCHIVE_DIR must be an absolute path to use the file tier")
+    return Path(ATTENDANCE_ARCHIVE_DIR)
+
+def _month_file(month: str) -> Path:
+    return _archive_root() / month[:4] / f"attendance_{month}.ndjson.gz"
+
+def _archived_months():
+    return sorted(
+        p.name[len("attendance_"):-len(".ndjson.gz")] for p in _archive_root().glob("*/attendance_*.ndjson.gz")
+    )
+
+def _file_key(doc):
+    return doc["date"], doc["user_id"]
+
+# user_ids=None means every employee; an empty list matches nobody
+def _month_docs(path: Path, user_ids=None, start=None, end=None):
+    if user_ids is not None and not user_ids:
+        return
+    wanted = set(user_ids) if user_ids is not None else None
+    # Cheap substring test before parsing when only a few employees are wanted
+    needles = [f'"user_id": "{u}"' for u in wanted] if wanted and len(wanted) <= 8 else None
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if needles and not any(n in line for n in needles):
+                continue
+            doc = json_util.loads(line)
+            if wanted is not None and doc.get("user_id") not in wanted:
+                continue
+            if (start and doc["date"] < start) or (end and doc["date"] > end):
+                continue
+            yield doc
+
+def _take(docs, size):
+    return list(itertools.islice(docs, size))
+
+def _append(f, docs):
+    f.writelines(json_util.dumps(doc).encode() + b"\n" for doc in docs)
+
+# Drive a blocking document generator from a worker thread, `size` at a time
+async def _chunks(docs, size):
+    try:
+        while True:
+            chunk = await asyncio.to_thread(_take, docs, size)
+            if not chunk:
+                return
+            yield chunk
+    finally:
+        docs.close()
+
+async def _recording(batches, ids):
+    async for batch in batches:
+        ids.extend(doc["_id"] for doc in batch)
+        yield batch
+
+# Merge two (date, user_id)-ordered batch streams; on equal keys the live record wins
+async def _merge(archived, live, batch_size):
+    a, b = deque(), deque()
+    a_done = b_done = False
+    out = []
+    while True:
+        if not a and not a_done:
+            batch = await anext(archived, None)
+            a_done = batch is None
+            a.extend(batch or [])
+            continue
+        if not b and not b_done:
+            batch = await anext(live, None)
+            b_done = batch is None
+            b.extend(batch or [])
+            continue
+        if not a and not b:
+            break
+        if not b or (a and _file_key(a[0]) < _file_key(b[0])):
+            out.append(a.popleft())
+        else:
+            if a and _file_key(a[0]) == _file_key(b[0]):
+                a.popleft()
+            out.append(b.popleft())
+        if len(out) >= batch_size:
+            yield out
+            out = []
+    if out:
+        yield out
+
+
+# 🧊 Hot/cold tiering for `attendance`. Whole months older than the hot window
+# move to attendance_archive_<year> collections (or monthly .ndjson.gz files);
+# the archive_state document records the cutoff date and the archived years.
+# Reads that stay at or after the cutoff only touch the live collection.
+class AttendanceArchive:
+    def __init__(self):
+        self._state = None
+        self._state_expires_at = 0.0
+
+    async def state(self, refresh: bool = False):
+        if refresh or self._state_expires_at <= time.monotonic():
+            self._state = await db.archive_state.find_one({"_id": STATE_ID})
+            self._state_expires_at = time.monotonic() + STATE_CACHE_SECONDS
+        return self._state
+
+    # Archived records all have date < cutoff
+    async def reaches_archive(self, start: str = None) -> bool:
+        state = await self.state()
+        return bool(state and state.get("cutoff")) and (not start or start < state["cutoff"])
+
+    # 🚚 Move every whole month before today - hot_days out of the live collection
+    async def archive(self, hot_days: int = ATTENDANCE_HOT_DAYS, tier: str = ATTENDANCE_ARCHIVE_TIER,
+                      batch_size: int = ARCHIVE_BATCH_SIZE, settle_seconds: float = STATE_CACHE_SECONDS):
+        if tier not in TIERS:
+            raise ValueError(f"Unknown archive tier '{tier}' (expected one of {', '.join(TIERS)})")
+        if tier == "file":
+            _archive_root()
+        state = await self.state(refresh=True) or {}
+        if state.get("tier") and state["tier"] != tier:
+            raise ValueError(f"Attendance is already archived to the '{state['tier']}' tier")
+
+        cutoff = month_start(datetime.utcnow().date() - timedelta(days=hot_days)).isoformat()
+        cutoff = max(cutoff, state.get("cutoff") or cutoff)
+        oldest = await db.attendance.find_one({"date": {"$lt": cutoff}}, {"date": 1}, sort=[("date", 1)])
+        if oldest is None:
+            return {"tier": tier, "cutoff": cutoff, "months": [], "moved": 0}
+
+        months = list(_months(oldest["date"], (date.fromisoformat(cutoff) - timedelta(days=1)).isoformat()))
+        await db.archive_state.update_one(
+            {"_id": STATE_ID},
+            {
+                "$set": {"tier": tier, "cutoff": cutoff, "updated_at": datetime.utcnow()},
+                "$addToSet": {"years": {"$each": sorted({m[:4] for m in months})}},
+            },
+            upsert=True
+        )
+        # Every worker must fan out to the archive before records leave the live collection
+        if cutoff != state.get("cutoff"):
+            await asyncio.sleep(settle_seconds)
+        await self.state(refresh=True)
+
+        moved = {}
+        for month in months:
+            first = f"{month}-01"
+            query = {"date": {"$gte": first, "$lt": next_month(date.fromisoformat(first)).isoformat()}}
+            if tier == "collection":
+                count = await self._to_collection(month, query, batch_size)
+            else:
+                count = await self._to_file(month, query, batch_size)
+            if count:
+                moved[month] = count
+        return {"tier": tier, "cutoff": cutoff, "months": moved, "moved": sum(moved.values())}
+
+    # Upsert on (user_id, date) so re-runs and late corrections replace the archived copy
+    async def _to_collection(self, month, query, batch_size):
+        target = archive_collection(month[:4])
+        await target.create_index([("user_id", ASCENDING), ("date", DESCENDING)], unique=True)
+        await target.create_index([("date", DESCENDING), ("_id", DESCENDING)])
+        moved = 0
+        async for batch in iter_batches(db.attendance, query, [("date", 1)], batch_size):
+            await target.bulk_write([
+                UpdateOne(
+                    {"user_id": doc["user_id"], "date": doc["date"]},
+                    {"$set": {k: v for k, v in doc.items() if k != "_id"}, "$setOnInsert": {"_id": doc["_id"]}},
+                    upsert=True
+                )
+                for doc in batch
+            ], ordered=False)
+            await db.attendance.delete_many({"_id": {"$in": [doc["_id"] for doc in batch]}})
+            moved += len(batch)
+        return moved
+
+    # Streamed batch by batch into a temp file that is renamed before anything is deleted
+    async def _to_file(self, month, query, batch_size):
+        path = _month_file(month)
+        ids = []
+        live = _recording(iter_batches(db.attendance, query, [("date", 1), ("user_id", 1)], batch_size), ids)
+        # Late writes to an archived month are merged in, replacing the archived copies
+        source = _merge(_chunks(_month_docs(path), batch_size), live, batch_size) if path.exists() else live
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with gzip.open(tmp, "wb") as f:
+            async for batch in source:
+                await asyncio.to_thread(_append, f, batch)
+        if not ids:
+            tmp.unlink()
+            return 0
+        os.replace(tmp, path)
+
+        for i in range(0, len(ids), batch_size):
+            await db.attendance.delete_many({"_id": {"$in": ids[i:i + batch_size]}})
+        return len(ids)
+
+    # One archived month in the requested order. Files are stored oldest first,
+    # so newest-first reads (an employee's history) buffer that month's matches.
+    async def _month_batches(self, month, user_ids, start, end, newest_first, batch_size):
+        chunks = _chunks(_month_docs(_month_file(month), user_ids, start, end), batch_size)
+        if not newest_first:
+            async for chunk in chunks:
+                yield chunk
+            return
+        matched = [doc async for chunk in chunks for doc in chunk]
+        matched.sort(key=lambda d: (d["date"], d["_id"]), reverse=True)
+        for i in range(0, len(matched), batch_size):
+            yield matched[i:i + batch_size]
+
+    # 🌊 Archived records in date order, one batch at a time
+    async def batches(self, start=None, end=None, user_ids=None, newest_first=True,
+                      batch_size=ARCHIVE_BATCH_SIZE, projection=None, after=None):
+        state = await self.state()
+        if not (state and state.get("cutoff")) or (start and start >= state["cutoff"]):
+            return
+        if user_ids is not None and not user_ids:
+            return
+        query = {"date": _date_filter(start, end, before=state["cutoff"])}
+        if user_ids is not None:
+            query["user_id"] = _user_filter(user_ids)
+        direction = -1 if newest_first else 1
+
+        if state["tier"] == "collection":
+            years = [y for y in state.get("years", []) if (not start or y >= start[:4]) and (not end or y <= end[:4])]
+            for year in sorted(years, reverse=newest_first):
+                async for batch in iter_batches(
+                    archive_collection(year), query, [("date", direction)], batch_size, after, projection=projection
+                ):
+                    yield batch
+            return
+
+        sort = [("date", direction), ("_id", direction)]
+        after_key = tuple(decode_cursor(after, sort)) if after else None
+        keep = {**projection, "date": 1, "_id": 1} if projection and any(projection.values()) else None
+        months = [m for m in _archived_months() if (not start or m >= start[:7]) and (not end or m <= end[:7])]
+        for month in sorted(months, reverse=newest_first):
+            async with aclosing(self._month_batches(month, user_ids, start, end, newest_first, batch_size)) as chunks:
+                async for docs in chunks:
+                    if after_key is not None and newest_first:
+                        docs = [d for d in docs if (d["date"], d["_id"]) < after_key]
+                    elif after_key is not None:
+                        docs = [d for d in docs if (d["date"], d["_id"]) > after_key]
+                    if docs:
+                        yield [project(d, keep) for d in docs]
+
+    # 📜 One page of an employee's history: the live collection first, and the
+    # archive only when the page runs past the cutoff
+    async def history(self, user_id: str, limit: int, after: str = None, projection=None, start=None, end=None):
+        query = {"user_id": user_id}
+        if start or end:
+            query["date"] = _date_filter(start, end)
+        docs, next_cursor = await fetch_page(db.attendance, query, HISTORY_SORT, limit, after, projection)
+        if not await self.reaches_archive(start):
+            return docs, next_cursor
+        # A full page that ends at or after the cutoff can't contain archived records
+        if len(docs) == limit and docs[-1]["date"] >= (await self.state())["cutoff"]:
+            return docs, next_cursor
+
+        archived = []
+        async with aclosing(self.batches(start, end, [user_id], True, limit, projection, after)) as batches:
+            async for batch in batches:
+                archived.extend(batch)
+                if len(archived) >= limit:
+                    break
+        # A record in both tiers (mid-move) is served from the live collection
+        live_dates = {doc["date"] for doc in docs}
+        merged = docs + [doc for doc in archived if doc["date"] not in live_dates]
+        merged.sort(key=lambda d: (d["date"], d["_id"]), reverse=True)
+        merged = merged[:limit]
+        next_cursor = encode_cursor(merged[-1], HISTORY_SORT) if len(merged) == limit else None
+        return merged, next_cursor
+
+    # Streaming counterpart of history(): live batches, then archived ones
+    async def history_batches(self, user_id: str, batch_size: int, after: str = None, limit: int = None,
+                              projection=None, start=None, end=None):
+        query = {"user_id": user_id}
+        if start or end:
+            query["date"] = _date_filter(start, end)
+        sources = [iter_batches(db.attendance, query, HISTORY_SORT, batch_size, after, projection=projection)]
+        if await self.reaches_archive(start):
+            sources.append(self.batches(start, end, [user_id], True, batch_size, projection, after))
+        remaining = limit
+        for source in sources:
+            async with aclosing(source) as batches:
+                async for batch in batches:
+                    if remaining is not None:
+                        batch = batch[:remaining]
+                        remaining -= len(batch)
+                    if batch:
+                        yield batch
+                    if remaining == 0:
+                        return
+
+
+attendance_archive = AttendanceArchive()
+
+# 🖥 Archive job: python -m app.utils.attendance_archive [--hot-days N] [--tier collection|file]
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move old attendance records to the archive tier")
+    parser.add_argument("--hot-days", type=int, default=ATTENDANCE_HOT_DAYS)
+    parser.add_argument("--tier", choices=TIERS, default=ATTENDANCE_ARCHIVE_TIER)
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    args = parser.parse_args()
+    print(asyncio.run(attendance_archive.archive(args.hot_days, args.tier, args.batch_size)))
@@ -0,0 +1,168 @@
+import codecs
+import csv
+import io
+import json
+from datetime import datetime
+from pydantic import ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from app.db.mongo import db
+from app.models.attendance import AttendanceEntry
+from app.utils.normalize import normalize_user_id
+from app.utils.attendance_rollups import apply_rollup_changes
+
+ATTENDANCE_STATUSES = {"present", "absent", "late", "leave"}
+BULK_CHUNK_SIZE = 5000
+
+# 📥 Parse a piece of an NDJSON or CSV body (whole lines only) into raw row
+# dicts; CSV pieces after the first reuse the header's fieldnames
+def parse_rows(text: str, fmt: str, fieldnames=None):
+    if fmt == "csv":
+        reader = csv.DictReader(io.StringIO(text), fieldnames=fieldnames)
+        return list(reader), reader.fieldnames
+
+    rows = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            rows.append(json.loads(line))
+        except json.JSONDecodeError as e:
+            rows.append(ValueError(f"Invalid JSON: {e.msg}"))
+    return rows, None
+
+# Length of the leading part of `text` made of complete records
+def _complete_length(text: str, fmt: str) -> int:
+    end = text.rfind("\n") + 1
+    # A newline inside a quoted CSV field does not end a record
+    while fmt == "csv" and end and text.count('"', 0, end) % 2:
+        end = text.rfind("\n", 0, end - 1) + 1
+    return end
+
+# 🌊 Parse a body as it arrives, yielding lists of at most `size` raw rows so
+# only one chunk (plus a partial line) is ever held in memory
+async def iter_row_chunks(stream, fmt: str, size: int = BULK_CHUNK_SIZE):
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    fieldnames = None
+    pending = []
+    async for data in stream:
+        buffer += decoder.decode(data)
+        end = _complete_length(buffer, fmt)
+        if not end:
+            continue
+        rows, fieldnames = parse_rows(buffer[:end], fmt, fieldnames)
+        buffer = buffer[end:]
+        pending.extend(rows)
+        while len(pending) >= size:
+            yield pending[:size]
+            pending = pending[size:]
+
+    rows, _ = parse_rows(buffer + decoder.decode(b"", final=True), fmt, fieldnames)
+    pending.extend(rows)
+    for start in range(0, len(pending), size):
+        yield pending[start:start + size]
+
+def _validate(row):
+    if isinstance(row, Exception):
+        return None, str(row)
+    if not isinstance(row, dict):
+        return None, "Row must be an object"
+    try:
+        entry = AttendanceEntry.model_validate({k: v for k, v in row.items() if v not in ("", None)})
+    except ValidationError as e:
+        return None, "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+    status = entry.status.strip().lower()
+    if status not in ATTENDANCE_STATUSES:
+        return None, f"Unknown status '{entry.status}'"
+    return {
+        "user_id": normalize_user_id(entry.employee_id),
+        "status": status,
+        "date": entry.date.strftime("%Y-%m-%d"),
+    }, None
+
+# 🚚 Validate one chunk of rows and upsert it keyed on (user_id, date);
+# `offset` is the position of the chunk's first row in the whole body
+async def _ingest_chunk(rows, offset: int, now: datetime):
+    results = [None] * len(rows)
+    valid = []  # (row index, record)
+    for i, row in enumerate(rows):
+        record, error = _validate(row)
+        if error:
+            results[i] = {"row": offset + i, "status": "invalid", "error": error}
+        else:
+            valid.append((i, record))
+
+    # One lookup for every distinct employee in the chunk
+    user_ids = list({record["user_id"] for _, record in valid})
+    known = set()
+    if user_ids:
+        async for emp in db.employees.find({"user_id": {"$in": user_ids}}, {"user_id": 1}):
+            known.add(emp["user_id"])
+
+    chunk = []
+    for i, record in valid:
+        if record["user_id"] in known:
+            chunk.append((i, record))
+        else:
+            results[i] = {"row": offset + i, "status": "invalid", "error": f"Unknown employee '{record['user_id']}'"}
+    if not chunk:
+        return results
+
+    # Previous statuses (one query) so the rollups can move counts
+    previous = {}
+    async for doc in db.attendance.find(
+        {
+            "user_id": {"$in": list({r["user_id"] for _, r in chunk})},
+            "date": {"$in": list({r["date"] for _, r in chunk})}
+        },
+        {"user_id": 1, "date": 1, "status": 1}
+    ):
+        previous[(doc["user_id"], doc["date"])] = doc["status"]
+
+    ops = [
+        UpdateOne(
+            {"user_id": record["user_id"], "date": record["date"]},
+            {
+                "$set": {"status": record["status"], "timestamp": now},
+                "$setOnInsert": {"source": "bulk"}
+            },
+            upsert=True
+        )
+        for _, record in chunk
+    ]
+    errors = {}
+    try:
+        result = await db.attendance.bulk_write(ops, ordered=False)
+        upserted = result.upserted_ids
+    except BulkWriteError as e:
+        upserted = {u["index"]: u["_id"] for u in e.details.get("upserted", [])}
+        errors = {err["index"]: err.get("errmsg", "Write failed") for err in e.details.get("writeErrors", [])}
+
+    changes = []
+    for op_index, (i, record) in enumerate(chunk):
+        if op_index in errors:
+            results[i] = {"row": offset + i, "status": "error", "error": errors[op_index]}
+            continue
+        if op_index in upserted:
+            results[i] = {"row": offset + i, "status": "inserted", "id": str(upserted[op_index])}
+        else:
+            results[i] = {"row": offset + i, "status": "updated"}
+        key = (record["user_id"], record["date"])
+        changes.append((*key, previous.get(key), record["status"]))
+        previous[key] = record["status"]
+    await apply_rollup_changes(changes)
+    return results
+
+# 📦 Ingest row chunks (see iter_row_chunks) one at a time, in body order
+async def ingest_attendance(chunks):
+    now = datetime.utcnow()
+    results = []
+    async for rows in chunks:
+        results.extend(await _ingest_chunk(rows, len(results), now))
+
+    summary = {"received": len(results), "inserted": 0, "updated": 0, "invalid": 0, "error": 0}
+    for r in results:
+        summary[r["status"]] += 1
+    return {**summary, "results": results}
@@ -0,0 +1,189 @@
+import asyncio
+import sys
+from collections import Counter
+from datetime import date, datetime, timedelta
+from pymongo import ReplaceOne, UpdateOne
+from app.db.mongo import db
+from app.utils.attendance_archive import attendance_archive
+from app.utils.pagination import fetch_page
+
+EMPLOYEE_PAGE_SIZE = 500
+
+# 📈 Attendance rollups, kept next to the raw `attendance` collection:
+#   attendance_daily   _id "<date>:<department>"  per-day counts by status
+#   attendance_monthly _id "<user_id>:<YYYY-MM>"  per-employee monthly counts
+# Writes apply $inc deltas as they land; rebuild_rollups recomputes a date
+# range from the raw records (catch-up job / drift repair).
+
+def _status_key(status) -> str:
+    return str(status or "unknown").strip().lower().replace(".", "_").replace("$", "_") or "unknown"
+
+async def _departments(user_ids):
+    departments = {}
+    async for emp in db.employees.find({"user_id": {"$in": list(user_ids)}}, {"user_id": 1, "department": 1}):
+        departments[emp["user_id"]] = emp.get("department") or ""
+    return departments
+
+# ➕ changes: iterable of (user_id, date, old_status or None, new_status)
+async def apply_rollup_changes(changes):
+    changes = [c for c in changes if c[2] is None or _status_key(c[2]) != _status_key(c[3])]
+    if not changes:
+        return
+    departments = await _departments({c[0] for c in changes})
+
+    daily = Counter()
+    monthly = Counter()
+    for user_id, day, old_status, new_status in changes:
+        department = departments.get(user_id, "")
+        month = day[:7]
+        daily[(day, department, _status_key(new_status))] += 1
+        monthly[(user_id, month, department, _status_key(new_status))] += 1
+        if old_status is None:
+            daily[(day, department, "__total")] += 1
+            monthly[(user_id, month, department, "__total")] += 1
+        else:
+            daily[(day, department, _status_key(old_status))] -= 1
+            monthly[(user_id, month, department, _status_key(old_status))] -= 1
+
+    daily_incs = {}
+    for (day, department, status), n in daily.items():
+        field = "total" if status == "__total" else f"counts.{status}"
+        daily_incs.setdefault((day, department), {})[field] = n
+    monthly_incs = {}
+    for (user_id, month, department, status), n in monthly.items():
+        field = "days" if status == "__total" else f"counts.{status}"
+        monthly_incs.setdefault((user_id, month, department), {})[field] = n
+
+    daily_ops = [
+        UpdateOne(
+            {"_id": f"{day}:{department}"},
+            {"$inc": incs, "$setOnInsert": {"date": day, "month": day[:7], "department": department}},
+            upsert=True
+        )
+        for (day, department), incs in daily_incs.items()
+    ]
+    monthly_ops = [
+        UpdateOne(
+            {"_id": f"{user_id}:{month}"},
+            {"$inc": incs, "$set": {"department": department}, "$setOnInsert": {"user_id": user_id, "month": month}},
+            upsert=True
+        )
+        for (user_id, month, department), incs in monthly_incs.items()
+    ]
+    await asyncio.gather(
+        db.attendance_daily.bulk_write(daily_ops, ordered=False),
+        db.attendance_monthly.bulk_write(monthly_ops, ordered=False)
+    )
+
+
+def _month_bounds(start: str, end: str):
+    first = start[:7] + "-01"
+    last_month = datetime.strptime(end[:7] + "-01", "%Y-%m-%d").date()
+    next_month = (last_month.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return first, (next_month - timedelta(days=1)).isoformat()
+
+_DEPARTMENT_LOOKUP = [
+    {"$lookup": {"from": "employees", "localField": "user_id", "foreignField": "user_id", "as": "employee"}},
+    {"$set": {"department": {"$ifNull": [{"$first": "$employee.department"}, ""]}}},
+]
+
+# 🔁 Recompute rollups for [start, end] (YYYY-MM-DD). Monthly summaries are
+# rebuilt for whole months, so the range is widened to month boundaries.
+async def rebuild_rollups(start: str, end: str):
+    start, end = _month_bounds(start, end)
+    # Archived months are gone from `attendance`; their rollups stay as they are
+    state = await attendance_archive.state(refresh=True)
+    if state and state.get("cutoff") and start < state["cutoff"]:
+        start = state["cutoff"]
+        if start > end:
+            return {"start": start, "end": end, "days": 0, "employee_months": 0, "skipped": "archived"}
+    match = {"$match": {"date": {"$gte": start, "$lte": end}}}
+
+    daily = {}
+    async for row in db.attendance.aggregate([
+        match, *_DEPARTMENT_LOOKUP,
+        {"$group": {"_id": {"date": "$date", "department": "$department", "status": {"$toLower": "$status"}}, "n": {"$sum": 1}}}
+    ], allowDiskUse=True):
+        key = (row["_id"]["date"], row["_id"]["department"])
+        doc = daily.setdefault(key, {"date": key[0], "month": key[0][:7], "department": key[1], "counts": {}, "total": 0})
+        doc["counts"][_status_key(row["_id"]["status"])] = row["n"]
+        doc["total"] += row["n"]
+
+    monthly = {}
+    async for row in db.attendance.aggregate([
+        match, *_DEPARTMENT_LOOKUP,
+        {"$group": {
+            "_id": {"user_id": "$user_id", "month": {"$substr": ["$date", 0, 7]}, "status": {"$toLower": "$status"}},
+            "department": {"$first": "$department"},
+            "n": {"$sum": 1}
+        }}
+    ], allowDiskUse=True):
+        key = (row["_id"]["user_id"], row["_id"]["month"])
+        doc = monthly.setdefault(key, {"user_id": key[0], "month": key[1], "department": row["department"], "counts": {}, "days": 0})
+        doc["counts"][_status_key(row["_id"]["status"])] = row["n"]
+        doc["days"] += row["n"]
+
+    daily_ids = [f"{d}:{dep}" for d, dep in daily]
+    monthly_ids = [f"{u}:{m}" for u, m in monthly]
+    if daily:
+        await db.attendance_daily.bulk_write(
+            [ReplaceOne({"_id": _id}, doc, upsert=True) for _id, doc in zip(daily_ids, daily.values())], ordered=False
+        )
+    if monthly:
+        await db.attendance_monthly.bulk_write(
+            [ReplaceOne({"_id": _id}, doc, upsert=True) for _id, doc in zip(monthly_ids, monthly.values())], ordered=False
+        )
+    await db.attendance_daily.delete_many({"date": {"$gte": start, "$lte": end}, "_id": {"$nin": daily_ids}})
+    await db.attendance_monthly.delete_many(
+        {"month": {"$gte": start[:7], "$lte": end[:7]}, "_id": {"$nin": monthly_ids}}
+    )
+    return {"start": start, "end": end, "days": len(daily), "employee_months": len(monthly)}
+
+
+# Counts moved by status changes can leave zeros behind
+def _nonzero(counts):
+    return {k: v for k, v in counts.items() if v}
+
+# 📊 Report straight from the rollups: O(days x departments), not O(records).
+# Per-employee summaries are employees x months, so they come one keyset page at a time.
+async def attendance_report(start: str, end: str, department: str = None, include_employees: bool = False,
+                            employees_limit: int = EMPLOYEE_PAGE_SIZE, employees_after: str = None):
+    query = {"date": {"$gte": start, "$lte": end}}
+    if department is not None:
+        query["department"] = department
+
+    days = {}
+    totals = Counter()
+    async for doc in db.attendance_daily.find(query, {"_id": 0}).sort("date", 1):
+        day = days.setdefault(doc["date"], {"date": doc["date"], "counts": Counter(), "total": 0})
+        day["counts"].update(doc.get("counts", {}))
+        day["total"] += doc.get("total", 0)
+        totals.update(doc.get("counts", {}))
+
+    report = {
+        "start": start,
+        "end": end,
+        "department": department,
+        "days": [{**d, "counts": _nonzero(d["counts"])} for d in days.values()],
+        "totals": _nonzero(totals),
+    }
+
+    if include_employees:
+        month_query = {"month": {"$gte": start[:7], "$lte": end[:7]}}
+        if department is not None:
+            month_query["department"] = department
+        employees, next_cursor = await fetch_page(
+            db.attendance_monthly, month_query, [("month", 1), ("user_id", 1)], employees_limit, employees_after
+        )
+        report["employees"] = [
+            {**{k: v for k, v in e.items() if k != "_id"}, "counts": _nonzero(e.get("counts", {}))} for e in employees
+        ]
+        report["employees_next_cursor"] = next_cursor
+    return report
+
+# 🖥 Catch-up job: python -m app.utils.attendance_rollups [START] [END]
+if __name__ == "__main__":
+    today = date.today().isoformat()
+    start = sys.argv[1] if len(sys.argv) > 1 else today
+    end = sys.argv[2] if len(sys.argv) > 2 else today
+    print(asyncio.run(rebuild_rollups(start, end)))
@@ -0,0 +1,141 @@
+import asyncio
+import time
+from datetime import datetime
+from app.db.mongo import db
+from app.core.config import DASHBOARD_CACHE_TTL
+from app.utils.attendance_rollups import attendance_report
+
+def _counts(rows) -> dict:
+    return {row["_id"] if row["_id"] is not None else "": row["n"] for row in rows}
+
+def _first(rows, default=0):
+    return rows[0]["n"] if rows else default
+
+
+# 👥 Headcount, by department and by role, in one pass over employees
+async def _headcount():
+    rows = await db.employees.aggregate([
+        {"$facet": {
+            "total": [{"$count": "n"}],
+            "by_department": [{"$group": {"_id": "$department", "n": {"$sum": 1}}}, {"$sort": {"_id": 1}}],
+            "by_role": [{"$group": {"_id": "$role", "n": {"$sum": 1}}}, {"$sort": {"_id": 1}}],
+        }}
+    ]).to_list(length=1)
+    facets = rows[0] if rows else {}
+    return {
+        "total": _first(facets.get("total")),
+        "by_department": _counts(facets.get("by_department", [])),
+        "by_role": _counts(facets.get("by_role", [])),
+    }
+
+# 🌴 Pending requests and who is away today, in one pass over the open leaves
+async def _leaves(today: str):
+    rows = await db.leaves.aggregate([
+        {"$match": {"$or": [
+            {"status": "pending"},
+            {"status": "approved", "from_date": {"$lte": today}, "to_date": {"$gte": today}},
+        ]}},
+        {"$facet": {
+            "pending": [{"$match": {"status": "pending"}}, {"$count": "n"}],
+            "on_leave_today": [
+                {"$match": {"status": "approved"}},
+                {"$group": {"_id": "$type", "n": {"$sum": 1}}},
+            ],
+        }}
+    ]).to_list(length=1)
+    facets = rows[0] if rows else {}
+    on_leave = _counts(facets.get("on_leave_today", []))
+    return {
+        "pending": _first(facets.get("pending")),
+        "on_leave_today": sum(on_leave.values()),
+        "on_leave_by_type": on_leave,
+    }
+
+# 💰 Payroll totals across every employee's current payroll
+async def _payroll():
+    rows = await db.payrolls.aggregate([
+        {"$group": {
+            "_id": None,
+            "employees": {"$sum": 1},
+            "base_salary": {"$sum": "$base_salary"},
+            "bonus": {"$sum": "$bonus"},
+            "deductions": {"$sum": "$deductions"},
+            "total_salary": {"$sum": "$total_salary"},
+        }}
+    ]).to_list(length=1)
+    totals = rows[0] if rows else {}
+    return {
+        key: totals.get(key, 0)
+        for key in ("employees", "base_salary", "bonus", "deductions", "total_salary")
+    }
+
+
+# 📊 Everything the HR home page shows, queried in parallel. Today's attendance
+# comes from the daily rollups; employees without a record count as absent.
+async def compute_dashboard():
+    today = datetime.utcnow().strftime("%Y-%m-%d")
+    headcount, attendance, leaves, payroll = await asyncio.gather(
+        _headcount(), attendance_report(today, today), _leaves(today), _payroll()
+    )
+    counts = attendance["totals"]
+    marked = sum(counts.values())
+    return {
+        "date": today,
+        "generated_at": datetime.utcnow(),
+        "headcount": headcount,
+        "attendance": {
+            "present": counts.get("present", 0),
+            "late": counts.get("late", 0),
+            "absent": counts.get("absent", 0) + max(headcount["total"] - marked, 0),
+            "not_marked": max(headcount["total"] - marked, 0),
+            "by_status": counts,
+        },
+        "leaves": leaves,
+        "payroll": payroll,
+    }
+
+
+# ⚡ Short-TTL cache with request coalescing: while a recomputation is running,
+# every other caller awaits the same task instead of starting its own.
+class DashboardCache:
+    def __init__(self, ttl: float = 30):
+        self.ttl = ttl
+        self._value = None
+        self._expires_at = 0.0
+        self._task = None
+        self.hits = 0
+        self.computations = 0
+
+    async def get(self, compute=compute_dashboard):
+        if self._value is not None and self._expires_at > time.monotonic():
+            self.hits += 1
+            return self._value
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh(compute))
+        # Shielded so one cancelled request doesn't cancel the shared computation
+        return await asyncio.shield(self._task)
+
+    async def _refresh(self, compute):
+        try:
+            self.computations += 1
+            value = await compute()
+            self._value = value
+            self._expires_at = time.monotonic() + self.ttl
+            return value
+        finally:
+            self._task = None
+
+    def invalidate(self):
+        self._value = None
+        self._expires_at = 0.0
+
+    def stats(self):
+        return {
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "computations": self.computations,
+            "fresh": self._value is not None and self._expires_at > time.monotonic(),
+        }
+
+
+dashboard_cache = DashboardCache(ttl=DASHBOARD_CACHE_TTL)
@@ -0,0 +1,208 @@
+import asyncio
+import logging
+import smtplib
+import time
+from datetime import datetime, timedelta
+from pymongo import ReturnDocument
+from app.db.mongo import db
+from app.core.config import (
+    EMAIL_OUTBOX_BATCH_SIZE, EMAIL_OUTBOX_MAX_ATTEMPTS,
+    EMAIL_OUTBOX_POLL_SECONDS, EMAIL_OUTBOX_BACKOFF_SECONDS
+)
+from app.utils.send_email import build_message, open_smtp_session, reset_email_body, RESET_SUBJECT
+
+logger = logging.getLogger(__name__)
+
+# A message still "sending" after this long belongs to a worker that died mid-batch
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+# 📬 Email outbox: handlers insert into `email_outbox` and return at once;
+# OutboxWorker delivers in the background over one reused SMTP session.
+# Delivery state per message: pending -> sending -> sent | failed.
+
+async def enqueue_email(to_email: str, subject: str, html: str):
+    now = datetime.utcnow()
+    result = await db.email_outbox.insert_one({
+        "to": to_email,
+        "subject": subject,
+        "html": html,
+        "status": "pending",
+        "attempts": 0,
+        "next_attempt_at": now,
+        "created_at": now
+    })
+    outbox_worker.notify()
+    return result.inserted_id
+
+async def enqueue_reset_email(to_email: str, reset_link: str):
+    return await enqueue_email(to_email, RESET_SUBJECT, reset_email_body(reset_link))
+
+
+# 🔌 Keeps one authenticated SMTP connection open between batches
+class SmtpSession:
+    def __init__(self, connect=open_smtp_session, idle_timeout: float = 60.0):
+        self._connect = connect
+        self._server = None
+        self._last_used = 0.0
+        self.idle_timeout = idle_timeout
+
+    # Only a connection that sat idle (and may have been dropped) is probed
+    def _ensure(self):
+        if self._server is not None and time.monotonic() - self._last_used > self.idle_timeout:
+            try:
+                if self._server.noop()[0] == 250:
+                    return self._server
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.close()
+        if self._server is None:
+            self._server = self._connect()
+        return self._server
+
+    def _send(self, message):
+        try:
+            self._ensure().send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            # Dropped since the last message: reconnect once and resend
+            self.close()
+            self._ensure().send_message(message)
+        self._last_used = time.monotonic()
+
+    # Runs in a worker thread; returns one error string (or None) per message
+    def send_batch(self, messages):
+        results = []
+        for message in messages:
+            try:
+                self._send(message)
+                results.append(None)
+            except (smtplib.SMTPException, OSError) as e:
+                self.close()
+                results.append(str(e))
+        return results
+
+    def close_if_idle(self):
+        if self._server is not None and time.monotonic() - self._last_used > self.idle_timeout:
+            self.close()
+
+    def close(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._server = None
+
+
+class OutboxWorker:
+    def __init__(self, batch_size=20, max_attempts=5, poll_seconds=5.0, backoff_seconds=30.0, session=None):
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.poll_seconds = poll_seconds
+        self.backoff_seconds = backoff_seconds
+        self.session = session or SmtpSession()
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    def notify(self):
+        self._wakeup.set()
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self.session.close)
+
+    # ♻️ A claim that went stale (the claiming worker died mid-send) counts as a
+    # failed attempt, so a message that crashes the worker every time still ends up failed
+    async def _release_stale_claims(self, now):
+        stale = {"status": "sending", "claimed_at": {"$lt": now - CLAIM_TIMEOUT}}
+        await db.email_outbox.update_many(
+            {**stale, "attempts": {"$gte": self.max_attempts - 1}},
+            {"$set": {"status": "failed", "last_error": "Worker stopped while sending"}, "$inc": {"attempts": 1}}
+        )
+        await db.email_outbox.update_many(
+            stale,
+            {"$set": {"status": "pending", "next_attempt_at": now}, "$inc": {"attempts": 1}}
+        )
+
+    async def _claim_batch(self):
+        now = datetime.utcnow()
+        await self._release_stale_claims(now)
+        batch = []
+        for _ in range(self.batch_size):
+            doc = await db.email_outbox.find_one_and_update(
+                {"status": "pending", "next_attempt_at": {"$lte": now}},
+                {"$set": {"status": "sending", "claimed_at": now}},
+                sort=[("next_attempt_at", 1)],
+                return_document=ReturnDocument.AFTER
+            )
+            if doc is None:
+                break
+            batch.append(doc)
+        return batch
+
+    async def _record(self, doc, error):
+        now = datetime.utcnow()
+        if error is None:
+            update = {"$set": {"status": "sent", "sent_at": now}, "$inc": {"attempts": 1}}
+        else:
+            attempts = doc["attempts"] + 1
+            if attempts >= self.max_attempts:
+                update = {"$set": {"status": "failed", "last_error": error}, "$inc": {"attempts": 1}}
+            else:
+                delay = self.backoff_seconds * (2 ** (attempts - 1))
+                update = {
+                    "$set": {
+                        "status": "pending",
+                        "last_error": error,
+                        "next_attempt_at": now + timedelta(seconds=delay)
+                    },
+                    "$inc": {"attempts": 1}
+                }
+        await db.email_outbox.update_one({"_id": doc["_id"]}, update)
+
+    async def process_once(self) -> int:
+        batch = await self._claim_batch()
+        if not batch:
+            return 0
+        messages = [build_message(d["to"], d["subject"], d["html"]) for d in batch]
+        errors = await asyncio.to_thread(self.session.send_batch, messages)
+        for doc, error in zip(batch, errors):
+            if error:
+                logger.warning("Email to %s failed (attempt %s): %s", doc["to"], doc["attempts"] + 1, error)
+            await self._record(doc, error)
+        return len(batch)
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            try:
+                sent = await self.process_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Email outbox iteration failed")
+                sent = 0
+            if sent:
+                continue
+            await asyncio.to_thread(self.session.close_if_idle)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+
+outbox_worker = OutboxWorker(
+    batch_size=EMAIL_OUTBOX_BATCH_SIZE,
+    max_attempts=EMAIL_OUTBOX_MAX_ATTEMPTS,
+    poll_seconds=EMAIL_OUTBOX_POLL_SECONDS,
+    backoff_seconds=EMAIL_OUTBOX_BACKOFF_SECONDS,
+)
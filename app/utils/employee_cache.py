@@ -0,0 +1,140 @@
+import time
+from collections import OrderedDict
+from app.db.mongo import db
+from app.core.config import EMPLOYEE_CACHE_SIZE, EMPLOYEE_CACHE_TTL
+from app.utils.normalize import normalize_email, normalize_user_id
+from app.utils.pubsub import invalidation_bus
+
+CHANNEL = "employees"
+KEYS_PER_MESSAGE = 1000  # keeps bulk invalidations well inside the capped channel
+
+# 👥 Read-through cache of employee documents keyed by normalized user_id,
+# with a secondary email index. LRU-bounded, TTL-expired, and invalidated
+# explicitly by the employee write paths (and by other workers via the bus).
+class EmployeeCache:
+    def __init__(self, max_size: int = 10000, ttl: float = 300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # user_id -> (expires_at, doc)
+        self._emails = {}              # email -> user_id
+        self.hits = 0
+        self.misses = 0
+        self._listeners = []
+
+    # Other in-process views of the directory (e.g. the search index) follow invalidations
+    def on_invalidate(self, listener):
+        self._listeners.append(listener)
+
+    def _lookup(self, user_id: str):
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            self._drop(user_id)
+            return None
+        self._entries.move_to_end(user_id)
+        return entry[1]
+
+    def _store(self, doc):
+        user_id = doc["user_id"]
+        self._drop(user_id)
+        self._entries[user_id] = (time.monotonic() + self.ttl, doc)
+        if doc.get("email"):
+            self._emails[doc["email"]] = user_id
+        while len(self._entries) > self.max_size:
+            oldest, _ = next(iter(self._entries.items()))
+            self._drop(oldest)
+
+    def _drop(self, user_id: str):
+        entry = self._entries.pop(user_id, None)
+        if entry and entry[1].get("email"):
+            self._emails.pop(entry[1]["email"], None)
+
+    async def get_by_user_id(self, user_id: str):
+        user_id = normalize_user_id(user_id)
+        doc = self._lookup(user_id)
+        if doc is not None:
+            self.hits += 1
+            return dict(doc)
+        self.misses += 1
+        doc = await db.employees.find_one({"user_id": user_id})
+        if doc:
+            self._store(doc)
+            return dict(doc)
+        return None
+
+    async def get_by_email(self, email: str):
+        email = normalize_email(email)
+        user_id = self._emails.get(email)
+        doc = self._lookup(user_id) if user_id else None
+        if doc is not None:
+            self.hits += 1
+            return dict(doc)
+        self.misses += 1
+        doc = await db.employees.find_one({"email": email})
+        if doc:
+            self._store(doc)
+            return dict(doc)
+        return None
+
+    # Cached docs for many ids; the misses are fetched with one $in query
+    async def get_many(self, user_ids):
+        found = {}
+        missing = []
+        for user_id in {normalize_user_id(u) for u in user_ids if u}:
+            doc = self._lookup(user_id)
+            if doc is not None:
+                self.hits += 1
+                found[user_id] = dict(doc)
+            else:
+                self.misses += 1
+                missing.append(user_id)
+        if missing:
+            async for doc in db.employees.find({"user_id": {"$in": missing}}):
+                self._store(doc)
+                found[doc["user_id"]] = dict(doc)
+        return found
+
+    def invalidate_local(self, user_id: str = None, email: str = None):
+        if email:
+            user_id = user_id or self._emails.get(normalize_email(email))
+        if user_id:
+            self._drop(normalize_user_id(user_id))
+        for listener in self._listeners:
+            listener(user_id=user_id, email=email)
+
+    # ✂️ Called by every employee write path
+    async def invalidate(self, user_id: str = None, email: str = None):
+        self.invalidate_local(user_id, email)
+        await invalidation_bus.publish(CHANNEL, {"user_id": user_id, "email": email})
+
+    # ✂️ Bulk write paths: (user_id, email) pairs, published as a few batched messages
+    async def invalidate_many(self, keys):
+        keys = [{"user_id": user_id, "email": email} for user_id, email in keys]
+        for key in keys:
+            self.invalidate_local(**key)
+        for i in range(0, len(keys), KEYS_PER_MESSAGE):
+            await invalidation_bus.publish(CHANNEL, {"keys": keys[i:i + KEYS_PER_MESSAGE]})
+
+    def handle_message(self, message: dict):
+        for key in message.get("keys") or [message]:
+            self.invalidate_local(key.get("user_id"), key.get("email"))
+
+    def clear(self):
+        self._entries.clear()
+        self._emails.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+employee_cache = EmployeeCache(max_size=EMPLOYEE_CACHE_SIZE, ttl=EMPLOYEE_CACHE_TTL)
+invalidation_bus.subscribe(CHANNEL, employee_cache.handle_message)
@@ -1,5 +1,8 @@
 from app.db.mongo import db  # use the shared Motor client from your database config
 
+def format_employee_id(seq: int) -> str:
+    return f"EMP{seq:03d}"  # EMP001, EMP002, etc.
+
 async def get_next_employee_id():
     result = await db.counters.find_one_and_update(
         {"_id": "employeeId"},
@@ -7,4 +10,17 @@ async def get_next_employee_id():
         upsert=True,
         return_document=True
     )
-    return f"EMP{result['seq']:03d}"  # EMP001, EMP002, etc.
+    return format_employee_id(result["seq"])
+
+# 🆔 Reserve a contiguous block of IDs with a single $inc
+async def reserve_employee_ids(count: int):
+    if count <= 0:
+        return []
+    result = await db.counters.find_one_and_update(
+        {"_id": "employeeId"},
+        {"$inc": {"seq": count}},
+        upsert=True,
+        return_document=True
+    )
+    last = result["seq"]
+    return [format_employee_id(seq) for seq in range(last - count + 1, last + 1)]
@@ -0,0 +1,37 @@
+from app.utils.employee_cache import employee_cache
+from app.utils.normalize import normalize_user_id
+
+# 📦 Request-scoped batch loader for employee documents (DataLoader style).
+# Collects the distinct user_ids on a page, fetches them with one $in query
+# and remembers the result (including misses) for the rest of the request.
+# Lookups go through the shared employee cache first.
+class EmployeeLoader:
+    def __init__(self):
+        self._cache = {}
+
+    async def load_many(self, user_ids):
+        wanted = {normalize_user_id(uid) for uid in user_ids if uid}
+
+        missing = [uid for uid in wanted if uid not in self._cache]
+        if missing:
+            self._cache.update(await employee_cache.get_many(missing))
+            for uid in missing:
+                self._cache.setdefault(uid, None)
+
+        return {uid: self._cache[uid] for uid in wanted}
+
+    async def load(self, user_id: str):
+        if not user_id:
+            return None
+        found = await self.load_many([user_id])
+        return found[normalize_user_id(user_id)]
+
+    def get(self, user_id: str):
+        if not user_id:
+            return None
+        return self._cache.get(normalize_user_id(user_id))
+
+
+# 🔌 FastAPI dependency: a fresh loader per request
+def get_employee_loader() -> EmployeeLoader:
+    return EmployeeLoader()
@@ -0,0 +1,249 @@
+import asyncio
+import re
+import time
+from collections import OrderedDict
+from bisect import bisect_left, insort
+from app.db.mongo import db
+from app.core.config import EMPLOYEE_SEARCH_REFRESH_SECONDS
+from app.utils.normalize import normalize_user_id
+from app.utils.employee_cache import employee_cache
+
+# How much a match in each field counts (the first word of the name counts most)
+FIRST_NAME_WEIGHT = 5
+FIELD_WEIGHTS = {"name": 4, "user_id": 3, "email": 2, "department": 1, "role": 1}
+EXACT_BONUS = 2          # the term is a whole word, not just a prefix of one
+MAX_SCORED_TERMS = 4     # later terms still filter, they just don't add to the score
+CACHE_SIZE = 512         # memoized term matches / ranked pages (typeahead repeats the same prefixes)
+MIN_CACHED_RESULTS = 100
+PROJECTION = {"_id": 0, "user_id": 1, "name": 1, "email": 1, "department": 1, "role": 1}
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+def tokenize(text) -> list:
+    return _WORD.findall(str(text or "").lower())
+
+def _remember(cache, key, value):
+    cache[key] = value
+    if len(cache) > CACHE_SIZE:
+        cache.popitem(last=False)
+
+def _sort_key(doc):
+    return (str(doc.get("name") or "").lower(), doc["user_id"])
+
+
+# 🔎 In-process prefix index over the employee directory.
+# Every word of name/email/department/role/user_id is a token. A sorted token
+# list answers prefix lookups with a binary search; each token maps
+# weight -> set(user_id), so scoring and filtering are set unions/intersections.
+# Employee writes mark ids dirty through the employee cache invalidation hook
+# and they are re-read (one $in query) before the next search.
+class EmployeeSearchIndex:
+    def __init__(self, refresh_seconds: float = 600):
+        self.refresh_seconds = refresh_seconds
+        self._reset()
+        self._dirty = set()
+        self._loaded_at = None
+        self._lock = asyncio.Lock()
+
+    def _reset(self):
+        self._records = {}     # user_id -> summary doc
+        self._postings = {}    # token -> {weight: set(user_id)}
+        self._tokens = []      # sorted distinct tokens
+        self._facets = {}      # ("department"|"role", lower value) -> set(user_id)
+        self._sort_keys = {}   # user_id -> (lower-cased name, user_id)
+        self._by_name = []     # every sort key, sorted
+        self._ranks = None     # user_id -> index in _by_name
+        self._term_cache = OrderedDict()
+        self._result_cache = OrderedDict()
+
+    def _doc_tokens(self, doc):
+        weights = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for n, token in enumerate(tokenize(doc.get(field))):
+                w = FIRST_NAME_WEIGHT if field == "name" and n == 0 else weight
+                weights[token] = max(weights.get(token, 0), w)
+        return weights
+
+    def _facet_keys(self, doc):
+        return [(field, str(doc.get(field) or "").lower()) for field in ("department", "role")]
+
+    def _changed(self):
+        self._ranks = None
+        self._term_cache.clear()
+        self._result_cache.clear()
+
+    def _add(self, doc, keep_sorted=True):
+        self._changed()
+        user_id = doc["user_id"]
+        self._records[user_id] = doc
+        for token, weight in self._doc_tokens(doc).items():
+            posting = self._postings.get(token)
+            if posting is None:
+                posting = self._postings[token] = {}
+                if keep_sorted:
+                    insort(self._tokens, token)
+            posting.setdefault(weight, set()).add(user_id)
+        for key in self._facet_keys(doc):
+            self._facets.setdefault(key, set()).add(user_id)
+        sort_key = self._sort_keys[user_id] = _sort_key(doc)
+        if keep_sorted:
+            insort(self._by_name, sort_key)
+
+    def _remove(self, user_id):
+        doc = self._records.pop(user_id, None)
+        if doc is None:
+            return
+        self._changed()
+        for token, weight in self._doc_tokens(doc).items():
+            posting = self._postings.get(token)
+            if posting is None:
+                continue
+            posting.get(weight, set()).discard(user_id)
+            if not posting.get(weight, True):
+                del posting[weight]
+            if not posting:
+                del self._postings[token]
+                i = bisect_left(self._tokens, token)
+                if i < len(self._tokens) and self._tokens[i] == token:
+                    del self._tokens[i]
+        for key in self._facet_keys(doc):
+            self._facets.get(key, set()).discard(user_id)
+        sort_key = self._sort_keys.pop(user_id)
+        i = bisect_left(self._by_name, sort_key)
+        if i < len(self._by_name) and self._by_name[i] == sort_key:
+            del self._by_name[i]
+
+    async def load(self):
+        # Ids written while the scan runs stay dirty and are re-read afterwards
+        seen_dirty = set(self._dirty)
+        docs = [doc async for doc in db.employees.find({}, PROJECTION) if doc.get("user_id")]
+        self._reset()
+        for doc in docs:
+            self._add(doc, keep_sorted=False)
+        self._tokens = sorted(self._postings)
+        self._by_name = sorted(self._sort_keys.values())
+        self._dirty -= seen_dirty
+        self._loaded_at = time.monotonic()
+
+    # ✂️ Hooked into employee cache invalidation (local writes and the pub/sub bus)
+    def mark_dirty(self, user_id: str = None, email: str = None):
+        if user_id:
+            self._dirty.add(normalize_user_id(user_id))
+
+    async def _sync(self):
+        stale = self._loaded_at is None or time.monotonic() - self._loaded_at > self.refresh_seconds
+        if not stale and not self._dirty:
+            return
+        async with self._lock:
+            if self._loaded_at is None or time.monotonic() - self._loaded_at > self.refresh_seconds:
+                await self.load()
+                return
+            dirty, self._dirty = self._dirty, set()
+            if not dirty:
+                return
+            fresh = {doc["user_id"]: doc async for doc in db.employees.find({"user_id": {"$in": list(dirty)}}, PROJECTION)}
+            for user_id in dirty:
+                self._remove(user_id)
+                if user_id in fresh:
+                    self._add(fresh[user_id])
+
+    # Best score per user for one term, as {score: set(user_id)} with disjoint sets
+    def _term_levels(self, term):
+        cached = self._term_cache.get(term)
+        if cached is not None:
+            self._term_cache.move_to_end(term)
+            return cached
+        levels = {}
+        i = bisect_left(self._tokens, term)
+        while i < len(self._tokens) and self._tokens[i].startswith(term):
+            token = self._tokens[i]
+            bonus = EXACT_BONUS if token == term else 0
+            for weight, user_ids in self._postings[token].items():
+                levels.setdefault(weight + bonus, set()).update(user_ids)
+            i += 1
+        seen = set()
+        for score in sorted(levels, reverse=True):
+            levels[score] -= seen
+            seen |= levels[score]
+        levels = {score: ids for score, ids in levels.items() if ids}
+        _remember(self._term_cache, term, levels)
+        return levels
+
+    # Sum each allowed user's best score per term, grouped as {total score: set(user_id)}.
+    # Levels of one term are disjoint, so every user gets exactly one score per term.
+    def _combine(self, term_levels, allowed):
+        if len(term_levels) == 1:
+            totals = {score: ids & allowed for score, ids in term_levels[0].items()}
+            return {score: ids for score, ids in totals.items() if ids}
+        scores = dict.fromkeys(allowed, 0)
+        for levels in term_levels:
+            for score, ids in levels.items():
+                for user_id in ids & allowed:
+                    scores[user_id] += score
+        totals = {}
+        for user_id, score in scores.items():
+            totals.setdefault(score, set()).add(user_id)
+        return totals
+
+    # Position of every user in name order, rebuilt lazily after writes
+    def _name_ranks(self):
+        if self._ranks is None:
+            self._ranks = {user_id: n for n, (_, user_id) in enumerate(self._by_name)}
+        return self._ranks
+
+    # First `count` ids by name: sorting small ints in C beats comparing names
+    def _in_name_order(self, ids, count):
+        ranks = sorted(map(self._name_ranks().__getitem__, ids))[:count]
+        return [self._by_name[n][1] for n in ranks]
+
+    def _rank(self, terms, department, role, wanted):
+        term_levels = sorted((self._term_levels(t) for t in terms), key=lambda lv: sum(map(len, lv.values())))
+        allowed = set.intersection(*(set().union(*levels.values()) for levels in term_levels))
+        if department:
+            allowed &= self._facets.get(("department", department.lower()), set())
+        if role:
+            allowed &= self._facets.get(("role", role.lower()), set())
+        if not allowed:
+            return 0, []
+
+        totals = self._combine(term_levels[:MAX_SCORED_TERMS], allowed)
+        ranked = []
+        for score in sorted(totals, reverse=True):
+            ranked.extend((score, uid) for uid in self._in_name_order(totals[score], wanted - len(ranked)))
+            if len(ranked) >= wanted:
+                break
+        return len(allowed), ranked
+
+    # 🏅 Every term must prefix-match some word (AND); ranked by score, then name
+    async def search(self, query: str, department: str = None, role: str = None, limit: int = 20, offset: int = 0):
+        await self._sync()
+        terms = tuple(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return {"total": 0, "results": []}
+
+        wanted = offset + limit
+        key = (terms, (department or "").lower(), (role or "").lower())
+        cached = self._result_cache.get(key)
+        if cached is not None and (len(cached[1]) >= wanted or len(cached[1]) == cached[0]):
+            self._result_cache.move_to_end(key)
+            total, ranked = cached
+        else:
+            total, ranked = self._rank(terms, department, role, max(wanted, MIN_CACHED_RESULTS))
+            _remember(self._result_cache, key, (total, ranked))
+
+        return {
+            "total": total,
+            "results": [{**self._records[uid], "score": score} for score, uid in ranked[offset:wanted]],
+        }
+
+    def stats(self):
+        return {
+            "employees": len(self._records),
+            "tokens": len(self._tokens),
+            "dirty": len(self._dirty),
+            "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at else None,
+        }
+
+
+employee_search = EmployeeSearchIndex(refresh_seconds=EMPLOYEE_SEARCH_REFRESH_SECONDS)
+employee_cache.on_invalidate(employee_search.mark_dirty)
@@ -0,0 +1,133 @@
+import csv
+import io
+import zlib
+from datetime import date, datetime
+from typing import Literal
+from bson import Decimal128, ObjectId
+from fastapi import HTTPException, Query
+from fastapi.responses import StreamingResponse
+from app.db.mongo import db
+from app.utils.employee_cache import employee_cache
+from app.utils.normalize import filename_part
+from app.utils.pagination import iter_batches
+from app.utils.serializers import dumps
+
+DEFAULT_EXPORT_BATCH_SIZE = 5000
+MAX_EXPORT_BATCH_SIZE = 50000
+GZIP_LEVEL = 6
+EMPLOYEE_COLUMNS = ("employee_name", "department")
+
+# 📦 Query parameters shared by every export endpoint
+class ExportParams:
+    def __init__(
+        self,
+        start: str = Query(..., description="First day (YYYY-MM-DD) or pay period (YYYY-MM), inclusive"),
+        end: str = Query(..., description="Last day (YYYY-MM-DD) or pay period (YYYY-MM), inclusive"),
+        department: str = Query(None, description="Only employees of this department"),
+        format: Literal["csv", "ndjson"] = Query("csv"),
+        compress: bool = Query(True, description="gzip the file (.gz)"),
+        batch_size: int = Query(DEFAULT_EXPORT_BATCH_SIZE, ge=100, le=MAX_EXPORT_BATCH_SIZE, description="Cursor batch size"),
+    ):
+        self.start = start
+        self.end = end
+        self.department = department
+        self.format = format
+        self.compress = compress
+        self.batch_size = batch_size
+
+    def validate(self, date_format="%Y-%m-%d", label="YYYY-MM-DD"):
+        try:
+            start = datetime.strptime(self.start, date_format)
+            end = datetime.strptime(self.end, date_format)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"start and end must be {label}")
+        if end < start:
+            raise HTTPException(status_code=400, detail="end must be after or equal to start")
+        # Stored dates are zero-padded strings: compare against the canonical form (2024-1-5 -> 2024-01-05)
+        self.start = start.strftime(date_format)
+        self.end = end.strftime(date_format)
+
+
+# Collections without a department field are filtered by the department's user_ids
+async def department_user_ids(department: str):
+    return await db.employees.distinct("user_id", {"department": department})
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (ObjectId, Decimal128)):
+        return str(value)
+    return value
+
+def _encode(rows, columns, fmt, header):
+    if fmt == "ndjson":
+        return b"".join(dumps(row) + b"\n" for row in rows)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(columns)
+    writer.writerows([_csv_value(row.get(c)) for c in columns] for row in rows)
+    return buffer.getvalue().encode()
+
+# Adds employee_name/department to records that only carry a user_id
+async def with_employee_columns(docs):
+    employees = await employee_cache.get_many(doc.get("user_id") for doc in docs)
+    for doc in docs:
+        employee = employees.get(doc.get("user_id")) or {}
+        doc["employee_name"] = employee.get("name")
+        doc["department"] = employee.get("department")
+    return docs
+
+def _filename(name, params: ExportParams):
+    parts = [name, params.start, params.end]
+    if params.department:
+        parts.append(filename_part(params.department))
+    return "_".join(parts) + "." + params.format + (".gz" if params.compress else "")
+
+
+# 🚚 Stream `query` as CSV/NDJSON, one cursor batch at a time: each batch is
+# read, enriched, encoded and (optionally) fed through one gzip stream before
+# the next is fetched, so memory stays at a single batch whatever the size.
+# `archived(projection)` optionally yields older batches (cold tier) first.
+def stream_export(name, collection, query, sort, columns, params: ExportParams, transform=None, archived=None):
+    stored = [c for c in columns if transform is None or c not in EMPLOYEE_COLUMNS]
+    projection = {"_id": 0, **{c: 1 for c in stored}}
+
+    async def batches():
+        if archived is not None:
+            async for batch in archived(projection):
+                yield batch
+        async for batch in iter_batches(collection, query, sort, params.batch_size, projection=projection):
+            yield batch
+
+    async def body():
+        gzip = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31) if params.compress else None
+        header = True
+        async for batch in batches():
+            if transform is not None:
+                batch = await transform(batch)
+            rows = [{c: doc.get(c) for c in columns} for doc in batch]
+            chunk = _encode(rows, columns, params.format, header)
+            header = False
+            if gzip is not None:
+                chunk = gzip.compress(chunk)
+            if chunk:
+                yield chunk
+        if header and params.format == "csv":
+            chunk = _encode([], columns, "csv", True)
+            yield gzip.compress(chunk) if gzip is not None else chunk
+        if gzip is not None:
+            yield gzip.flush()
+
+    if params.compress:
+        media_type = "application/gzip"
+    else:
+        media_type = "text/csv" if params.format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{_filename(name, params)}"'}
+    )
@@ -0,0 +1,52 @@
+import time
+from datetime import date, timedelta
+
+CALENDAR_CACHE_TTL = 60
+CALENDAR_CACHE_MAX_ENTRIES = 1000
+CALENDAR_MAX_MONTHS = 12  # widest window one request may load
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+def next_month(day: date) -> date:
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+# 🗓 Default window: the current and the next month
+def default_window(today: date):
+    start = month_start(today)
+    end = next_month(next_month(start)) - timedelta(days=1)
+    return start, end
+
+# Every month (first day) a span touches
+def months_between(start: date, end: date):
+    month = month_start(start)
+    while month <= end:
+        yield month
+        month = next_month(month)
+
+
+# ⚡ In-process cache for the default calendar window. Any leave status
+# change clears it; the TTL bounds staleness across workers.
+class CalendarCache:
+    def __init__(self, ttl: float = CALENDAR_CACHE_TTL, max_entries: int = CALENDAR_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        self._entries.pop(key, None)
+        return None
+
+    def put(self, key, value):
+        if len(self._entries) >= self.max_entries:
+            self._entries.clear()
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def invalidate(self):
+        self._entries.clear()
+
+
+calendar_cache = CalendarCache()
@@ -0,0 +1,88 @@
+import asyncio
+from datetime import datetime
+from pymongo import ReplaceOne
+from pymongo.errors import DuplicateKeyError
+from app.db.mongo import db
+
+MAX_ANNUAL_LEAVES = 20
+
+# 📒 Materialized leave balances: one document per employee per year in
+# `leave_balances`, holding the approved days taken so far.
+def balance_id(user_id: str, year: int) -> str:
+    return f"{user_id}:{year}"
+
+async def get_taken_days(user_id: str, year: int) -> int:
+    doc = await db.leave_balances.find_one({"_id": balance_id(user_id, year)}, {"taken_days": 1})
+    return doc["taken_days"] if doc else 0
+
+# ✅ Atomically book approved days against the quota. The filter only matches
+# while enough days are left; when it doesn't, the upsert collides with the
+# existing _id and we know the quota would be exceeded.
+async def consume_leave_days(user_id: str, year: int, days: int) -> bool:
+    if days > MAX_ANNUAL_LEAVES:
+        return False
+    try:
+        await db.leave_balances.update_one(
+            {"_id": balance_id(user_id, year), "taken_days": {"$lte": MAX_ANNUAL_LEAVES - days}},
+            {
+                "$inc": {"taken_days": days},
+                "$set": {"updated_at": datetime.utcnow()},
+                "$setOnInsert": {"user_id": user_id, "year": year}
+            },
+            upsert=True
+        )
+    except DuplicateKeyError:
+        return False
+    return True
+
+# ↩️ Give days back (e.g. when the leave update lost a race)
+async def release_leave_days(user_id: str, year: int, days: int):
+    await db.leave_balances.update_one(
+        {"_id": balance_id(user_id, year)},
+        {"$inc": {"taken_days": -days}, "$set": {"updated_at": datetime.utcnow()}}
+    )
+
+# 🔁 Recompute every ledger from the approved leaves history
+async def rebuild_leave_balances():
+    groups = db.leaves.aggregate([
+        {"$match": {"status": "approved"}},
+        {
+            "$group": {
+                "_id": {"user_id": "$user_id", "year": {"$year": "$applied_at"}},
+                "taken_days": {"$sum": "$days_requested"}
+            }
+        }
+    ])
+
+    now = datetime.utcnow()
+    seen = []
+    ops = []
+    async for g in groups:
+        key = balance_id(g["_id"]["user_id"], g["_id"]["year"])
+        seen.append(key)
+        ops.append(ReplaceOne(
+            {"_id": key},
+            {
+                "user_id": g["_id"]["user_id"],
+                "year": g["_id"]["year"],
+                "taken_days": g["taken_days"],
+                "updated_at": now
+            },
+            upsert=True
+        ))
+
+    if ops:
+        await db.leave_balances.bulk_write(ops, ordered=False)
+    await db.leave_balances.delete_many({"_id": {"$nin": seen}})
+    return len(seen)
+
+# 🚀 On startup: a fresh deployment has no ledgers yet, so seed them from the
+# leaves history instead of letting every quota start again at zero
+async def ensure_leave_balances():
+    if await db.leave_balances.find_one({}, {"_id": 1}) is not None:
+        return 0
+    return await rebuild_leave_balances()
+
+if __name__ == "__main__":
+    count = asyncio.run(rebuild_leave_balances())
+    print(f"Rebuilt {count} leave balance ledgers")
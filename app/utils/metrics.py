@@ -0,0 +1,249 @@
+import re
+import threading
+from contextvars import ContextVar
+from bson.regex import Regex
+from pymongo import monitoring
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Driver housekeeping that says nothing about the routes
+IGNORED_COMMANDS = {"ping", "hello", "ismaster", "isMaster", "endSessions", "buildInfo", "saslStart", "saslContinue"}
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names, values, extra=None) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+# 🔢 Minimal Prometheus counter/histogram (text exposition format 0.0.4)
+class Counter:
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.label_names, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = labels
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, (counts, total, count) in sorted(self._series.items()):
+                for bound, n in zip(self.buckets, counts):
+                    le = 'le="%s"' % bound
+                    lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {n}")
+                le = 'le="+Inf"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {count}")
+                lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {total}")
+                lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {count}")
+        return lines
+
+
+http_requests = Counter(
+    "talenttrack_http_requests_total", "HTTP requests by route and status", ("method", "route", "status"))
+http_latency = Histogram(
+    "talenttrack_http_request_duration_seconds", "Time until the response headers were sent", ("method", "route"))
+http_queries = Histogram(
+    "talenttrack_http_request_queries", "Mongo commands issued per request", ("method", "route"), QUERY_COUNT_BUCKETS)
+mongo_latency = Histogram(
+    "talenttrack_mongo_command_duration_seconds", "Mongo command round-trip time", ("collection", "command"))
+mongo_route_commands = Counter(
+    "talenttrack_mongo_route_commands_total", "Mongo commands attributed to the route that issued them",
+    ("route", "collection", "command"))
+mongo_documents = Counter(
+    "talenttrack_mongo_documents_returned_total", "Documents returned in cursor batches", ("route", "collection"))
+mongo_failures = Counter(
+    "talenttrack_mongo_command_failures_total", "Failed Mongo commands", ("collection", "command"))
+mongo_scan_hints = Counter(
+    "talenttrack_mongo_scan_hints_total", "Commands whose shape usually means a collection/index scan",
+    ("route", "collection", "hint"))
+
+REGISTRY = [
+    http_requests, http_latency, http_queries,
+    mongo_latency, mongo_route_commands, mongo_documents, mongo_failures, mongo_scan_hints,
+]
+
+def render_metrics() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# 🧵 Per-request accumulator; Motor copies the context into its executor threads,
+# so commands issued while serving a request land on that request's stats.
+class RequestStats:
+    def __init__(self, scope):
+        self._scope = scope
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.documents = 0
+        self._lock = threading.Lock()
+
+    def add(self, seconds, documents):
+        with self._lock:
+            self.queries += 1
+            self.query_seconds += seconds
+            self.documents += documents
+
+    # Route template once the router has matched (e.g. /employees/{user_id})
+    @property
+    def route(self):
+        route = self._scope.get("route")
+        return getattr(route, "path", None) or "unmatched"
+
+
+current_request: ContextVar = ContextVar("current_request", default=None)
+
+
+def _is_unanchored(pattern) -> bool:
+    if isinstance(pattern, (Regex, re.Pattern)):
+        pattern = pattern.pattern
+    return isinstance(pattern, str) and not pattern.startswith("^")
+
+# Walk a filter looking for shapes that can't use an index efficiently
+def scan_hints(filter_doc):
+    hints = set()
+
+    def walk(value):
+        if isinstance(value, dict):
+            for key, item in value.items():
+                if key == "$regex" and _is_unanchored(item):
+                    hints.add("unanchored_regex")
+                elif key == "$where":
+                    hints.add("where")
+                elif key == "$nin" or key == "$ne":
+                    hints.add("negation")
+                walk(item)
+        elif isinstance(value, list):
+            for item in value:
+                walk(item)
+        elif isinstance(value, (Regex, re.Pattern)) and _is_unanchored(value):
+            hints.add("unanchored_regex")
+
+    walk(filter_doc)
+    return hints
+
+
+def _command_filter(name, command):
+    if name in ("find", "count", "distinct"):
+        return command.get("filter") or command.get("query") or {}
+    if name == "aggregate":
+        pipeline = command.get("pipeline") or []
+        if pipeline and "$match" in pipeline[0]:
+            return pipeline[0]["$match"]
+        return {}
+    return None
+
+def _documents_returned(reply):
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        return len(cursor.get("firstBatch") or cursor.get("nextBatch") or [])
+    if "values" in reply:
+        return len(reply["values"])
+    return 0
+
+
+# 🔭 Attributes every driver command to the current request (or "-" for background work)
+class QueryListener(monitoring.CommandListener):
+    def __init__(self):
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        if event.command_name in IGNORED_COMMANDS:
+            return
+        name = event.command_name
+        collection = event.command.get(name) if name != "getMore" else event.command.get("collection")
+        collection = collection if isinstance(collection, str) else "-"
+        stats = current_request.get()
+        route = stats.route if stats else "-"
+
+        hints = set()
+        filter_doc = _command_filter(name, event.command)
+        if filter_doc is not None:
+            hints = scan_hints(filter_doc)
+            if name == "find" and not filter_doc and not event.command.get("limit"):
+                hints.add("unbounded_find")
+        for hint in hints:
+            mongo_scan_hints.inc(route, collection, hint)
+
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (name, collection, stats, route)
+
+    def _finish(self, event):
+        with self._lock:
+            return self._pending.pop((event.connection_id, event.request_id), None)
+
+    def succeeded(self, event):
+        pending = self._finish(event)
+        if pending is None:
+            return
+        name, collection, stats, route = pending
+        seconds = event.duration_micros / 1e6
+        documents = _documents_returned(event.reply)
+
+        mongo_latency.observe(seconds, collection, name)
+        mongo_route_commands.inc(route, collection, name)
+        if documents:
+            mongo_documents.inc(route, collection, amount=documents)
+        if stats is not None:
+            stats.add(seconds, documents)
+
+    def failed(self, event):
+        pending = self._finish(event)
+        if pending is None:
+            return
+        name, collection, stats, route = pending
+        mongo_failures.inc(collection, name)
+        mongo_route_commands.inc(route, collection, name)
+        if stats is not None:
+            stats.add(event.duration_micros / 1e6, 0)
+
+
+query_listener = QueryListener()
+
+
+# ⏱ Called by the HTTP middleware once the response headers are ready
+def record_request(method, status, seconds, stats: RequestStats):
+    route = stats.route
+    http_requests.inc(method, route, str(status))
+    http_latency.observe(seconds, method, route)
+    http_queries.observe(stats.queries, method, route)
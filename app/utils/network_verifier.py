@@ -0,0 +1,173 @@
+import hashlib
+import hmac
+import ipaddress
+import subprocess
+import time
+from abc import ABC, abstractmethod
+from typing import Optional
+from fastapi import Request
+from app.core.config import (
+    ATTENDANCE_VERIFIER, ATTENDANCE_ALLOWED_CIDRS, ATTENDANCE_TRUST_FORWARDED,
+    ATTENDANCE_VERIFIER_CACHE_SECONDS, AUTHORIZED_SSID, KIOSK_TOKEN_SECRET
+)
+
+# 📍 Pluggable checks that an attendance request comes from the office.
+# Each backend derives a cache key from the request; results are cached
+# for a TTL so the hot path is a dict lookup.
+
+def client_ip(request: Request) -> str:
+    if ATTENDANCE_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else ""
+
+
+class NetworkVerifier(ABC):
+    name = "base"
+
+    def cache_key(self, request: Request) -> Optional[str]:
+        return None
+
+    # Wall-clock time after which a passing result must not be reused (None: TTL only)
+    def expires_at(self, request: Request) -> Optional[float]:
+        return None
+
+    @abstractmethod
+    def verify(self, request: Request) -> bool:
+        ...
+
+
+# 🛠 Legacy: Wi-Fi SSID the *server* is connected to (Windows only)
+def get_connected_ssid() -> Optional[str]:
+    try:
+        result = subprocess.check_output(["netsh", "wlan", "show", "interfaces"])
+        output = result.decode("utf-8")
+        for line in output.splitlines():
+            if "SSID" in line and "BSSID" not in line:
+                return line.split(":", 1)[1].strip()
+    except Exception:
+        return None
+    return None
+
+class SsidVerifier(NetworkVerifier):
+    name = "ssid"
+
+    def __init__(self, ssid: str):
+        self.ssid = ssid
+
+    def cache_key(self, request):
+        return "server"
+
+    def verify(self, request):
+        return get_connected_ssid() == self.ssid
+
+
+# 🌐 Client IP must fall inside one of the allowed networks
+class CidrAllowListVerifier(NetworkVerifier):
+    name = "cidr"
+
+    def __init__(self, cidrs):
+        self.networks = [ipaddress.ip_network(c.strip(), strict=False) for c in cidrs if c.strip()]
+
+    def cache_key(self, request):
+        return client_ip(request)
+
+    def verify(self, request):
+        try:
+            ip = ipaddress.ip_address(client_ip(request))
+        except ValueError:
+            return False
+        return any(ip in net for net in self.networks)
+
+
+# 🖥 Office kiosks send a signed token: "<kiosk_id>.<expires_ts>.<hmac_sha256>"
+def sign_kiosk_token(kiosk_id: str, expires_at: int, secret: str = KIOSK_TOKEN_SECRET) -> str:
+    body = f"{kiosk_id}.{expires_at}"
+    signature = hmac.new(secret.encode(), body.encode(), hashlib.sha256).hexdigest()
+    return f"{body}.{signature}"
+
+class KioskTokenVerifier(NetworkVerifier):
+    name = "kiosk"
+    header = "x-kiosk-token"
+
+    def __init__(self, secret: str):
+        self.secret = secret
+
+    def cache_key(self, request):
+        return request.headers.get(self.header)
+
+    @staticmethod
+    def _parse(token):
+        try:
+            kiosk_id, expires_at, signature = token.rsplit(".", 2)
+            return kiosk_id, int(expires_at)
+        except (AttributeError, ValueError):
+            return None
+
+    def expires_at(self, request):
+        parsed = self._parse(request.headers.get(self.header))
+        return parsed[1] if parsed else None
+
+    def verify(self, request):
+        token = request.headers.get(self.header)
+        parsed = self._parse(token)
+        if parsed is None or not self.secret:
+            return False
+        kiosk_id, expires_at = parsed
+        if expires_at < time.time():
+            return False
+        expected = sign_kiosk_token(kiosk_id, expires_at, self.secret)
+        return hmac.compare_digest(expected, token)
+
+
+# ⏱ TTL cache in front of any set of backends (passes if any backend passes)
+class CachedVerifier:
+    def __init__(self, backends, ttl: float = 60.0, max_entries: int = 10000):
+        self.backends = backends
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._cache = {}
+
+    def check(self, request: Request) -> bool:
+        now = time.monotonic()
+        for backend in self.backends:
+            key = backend.cache_key(request)
+            if key is None:
+                continue
+            cached = self._cache.get((backend.name, key))
+            if cached and cached[0] > now:
+                ok = cached[1]
+            else:
+                ok = backend.verify(request)
+                until = now + self.ttl
+                # Never reuse a result past the credential's own expiry (e.g. a kiosk token)
+                expires_at = backend.expires_at(request)
+                if expires_at is not None:
+                    until = min(until, now + expires_at - time.time())
+                if len(self._cache) >= self.max_entries:
+                    self._cache.clear()
+                self._cache[(backend.name, key)] = (until, ok)
+            if ok:
+                return True
+        return False
+
+    def clear(self):
+        self._cache.clear()
+
+
+def build_verifier(kinds: str) -> CachedVerifier:
+    backends = []
+    for kind in (k.strip().lower() for k in kinds.split(",")):
+        if kind == "ssid":
+            backends.append(SsidVerifier(AUTHORIZED_SSID))
+        elif kind == "cidr":
+            backends.append(CidrAllowListVerifier(ATTENDANCE_ALLOWED_CIDRS.split(",")))
+        elif kind == "kiosk":
+            backends.append(KioskTokenVerifier(KIOSK_TOKEN_SECRET))
+        elif kind:
+            raise ValueError(f"Unknown attendance verifier: {kind}")
+    return CachedVerifier(backends, ttl=ATTENDANCE_VERIFIER_CACHE_SECONDS)
+
+
+network_verifier = build_verifier(ATTENDANCE_VERIFIER)
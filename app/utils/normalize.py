@@ -0,0 +1,14 @@
+import re
+
+# 🔑 Canonical forms for lookup keys. Every write stores these and every
+# query matches on them with plain equality, so the indexes can be used.
+
+def normalize_user_id(user_id: str) -> str:
+    return (user_id or "").strip().upper()
+
+def normalize_email(email: str) -> str:
+    return (email or "").strip().lower()
+
+# Safe piece of a Content-Disposition filename: anything but letters, digits, _ and - becomes '-'
+def filename_part(value) -> str:
+    return re.sub(r"[^A-Za-z0-9_-]+", "-", str(value))
@@ -0,0 +1,129 @@
+import asyncio
+import csv
+import io
+import json
+import sys
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+from app.db.mongo import db
+from app.models.employee import EmployeeImport
+from app.auth.passwords import password_hasher
+from app.utils.employee_id import reserve_employee_ids
+from app.utils.normalize import normalize_email
+from app.utils.employee_cache import employee_cache
+
+DEFAULT_PASSWORD = "12345"
+
+# 📥 Parse a CSV file or a JSON array / NDJSON body into row dicts
+def parse_employee_rows(body: bytes, fmt: str):
+    text = body.decode("utf-8-sig")
+    if fmt == "csv":
+        return list(csv.DictReader(io.StringIO(text)))
+    text = text.strip()
+    if text.startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+def _validate(row):
+    if not isinstance(row, dict):
+        return None, "Row must be an object"
+    cleaned = {k: v.strip() if isinstance(v, str) else v for k, v in row.items() if v is not None}
+    try:
+        entry = EmployeeImport.model_validate(cleaned)
+    except ValidationError as e:
+        return None, "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+    email = normalize_email(entry.email)
+    if not entry.name or "@" not in email:
+        return None, "name and a valid email are required"
+    return {**entry.model_dump(), "email": email}, None
+
+# 👥 Onboard a cohort: one $in duplicate check, one ID block reservation,
+# parallel password hashing and two insert_many calls. Problems are
+# reported per row instead of aborting the batch.
+async def onboard_employees(rows):
+    results = [None] * len(rows)
+    candidates = []  # (row index, employee data)
+    seen = {}
+    for i, row in enumerate(rows):
+        data, error = _validate(row)
+        if error:
+            results[i] = {"row": i, "status": "invalid", "error": error}
+        elif data["email"] in seen:
+            results[i] = {"row": i, "status": "duplicate", "error": f"Email '{data['email']}' repeated (row {seen[data['email']]})"}
+        else:
+            seen[data["email"]] = i
+            candidates.append((i, data))
+
+    existing = set()
+    if candidates:
+        emails = [data["email"] for _, data in candidates]
+        async for u in db.users.find({"email": {"$in": emails}}, {"email": 1}):
+            existing.add(u["email"])
+
+    accepted = []
+    for i, data in candidates:
+        if data["email"] in existing:
+            results[i] = {"row": i, "status": "duplicate", "error": f"User with email '{data['email']}' already exists."}
+        else:
+            accepted.append((i, data))
+
+    if accepted:
+        employee_ids = await reserve_employee_ids(len(accepted))
+        hashes = await asyncio.gather(*(password_hasher.hash(DEFAULT_PASSWORD) for _ in accepted))
+
+        users = [
+            {"email": data["email"], "password": hashed, "role": data["role"], "is_active": True}
+            for (_, data), hashed in zip(accepted, hashes)
+        ]
+        # Users first: the unique email index catches concurrent imports
+        failed = {}
+        try:
+            await db.users.insert_many(users, ordered=False)
+        except BulkWriteError as e:
+            failed = {err["index"]: err.get("errmsg", "Write failed") for err in e.details.get("writeErrors", [])}
+
+        employees = []
+        rows_of = []  # row index of each employees[] entry
+        for n, ((i, data), employee_id) in enumerate(zip(accepted, employee_ids)):
+            if n in failed:
+                results[i] = {"row": i, "status": "duplicate", "error": f"User with email '{data['email']}' already exists."}
+                continue
+            employees.append({**data, "user_id": employee_id})
+            rows_of.append(i)
+            results[i] = {"row": i, "status": "created", "employee_id": employee_id}
+        if employees:
+            # Employee rows that fail take their freshly created logins with them
+            try:
+                await db.employees.insert_many(employees, ordered=False)
+            except BulkWriteError as e:
+                errors = {err["index"]: err.get("errmsg", "Write failed") for err in e.details.get("writeErrors", [])}
+                for n, message in errors.items():
+                    results[rows_of[n]] = {"row": rows_of[n], "status": "error", "error": message}
+                await db.users.delete_many({"email": {"$in": [employees[n]["email"] for n in errors]}})
+                employees = [employee for n, employee in enumerate(employees) if n not in errors]
+            await employee_cache.invalidate_many((e["user_id"], e["email"]) for e in employees)
+
+    summary = {"received": len(rows), "created": 0, "duplicate": 0, "invalid": 0, "error": 0}
+    for r in results:
+        summary[r["status"]] += 1
+    return {**summary, "results": results}
+
+# 🖥 CLI: python -m app.utils.onboarding employees.csv
+async def _main(path: str):
+    fmt = "csv" if path.lower().endswith(".csv") else "json"
+    with open(path, "rb") as f:
+        rows = parse_employee_rows(f.read(), fmt)
+    report = await onboard_employees(rows)
+    password_hasher.shutdown()
+    for r in report["results"]:
+        if r["status"] != "created":
+            print(f"row {r['row']}: {r['status']} - {r['error']}")
+    print(
+        f"{report['created']} created, {report['duplicate']} duplicate, "
+        f"{report['invalid']} invalid, {report['error']} failed"
+    )
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("usage: python -m app.utils.onboarding <employees.csv|employees.json>")
+    asyncio.run(_main(sys.argv[1]))
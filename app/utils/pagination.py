@@ -0,0 +1,128 @@
+import base64
+from typing import Literal, Optional
+from bson import json_util
+from fastapi import HTTPException, Query
+from fastapi.responses import StreamingResponse
+from app.utils.serializers import FastJSONResponse, dumps, parse_fields
+
+MAX_PAGE_SIZE = 1000
+DEFAULT_BATCH_SIZE = 500
+
+# 📄 Query parameters shared by every list endpoint
+class PageParams:
+    def __init__(
+        self,
+        limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+        after: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header"),
+        stream: Optional[Literal["json", "ndjson"]] = Query(None, description="Stream every matching document"),
+        batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=1, le=10000, description="Cursor batch size when streaming"),
+        fields: Optional[str] = Query(None, description="Comma separated fields to return, e.g. name,email"),
+    ):
+        self.limit = limit
+        self.after = after
+        self.stream = stream
+        self.batch_size = batch_size
+        self.fields = fields
+
+    # Projection for ?fields=, always keeping what the route itself needs
+    def projection(self, required=()):
+        return parse_fields(self.fields, required)
+
+
+# 🔖 Opaque keyset cursor: the sort key values of the last document served
+def encode_cursor(doc, sort) -> str:
+    values = [doc.get(field) for field, _ in sort]
+    return base64.urlsafe_b64encode(json_util.dumps(values).encode()).decode()
+
+def decode_cursor(token: str, sort):
+    try:
+        values = json_util.loads(base64.urlsafe_b64decode(token.encode()))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    if not isinstance(values, list) or len(values) != len(sort):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    return values
+
+# Documents strictly after `values` in the given sort order (last key is the tie-breaker)
+def keyset_filter(sort, values):
+    clauses = []
+    for n, (field, direction) in enumerate(sort):
+        clause = {f: v for (f, _), v in zip(sort[:n], values[:n])}
+        clause[field] = {"$gt" if direction > 0 else "$lt": values[n]}
+        clauses.append(clause)
+    return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+def _with_sort(sort):
+    sort = list(sort)
+    if sort[-1][0] != "_id":
+        sort.append(("_id", sort[-1][1]))
+    return sort
+
+# Keyset cursors need the sort keys, so inclusion projections always carry them
+def _projection(projection, sort):
+    if not projection or not any(projection.values()):
+        return projection
+    return {**projection, **{field: 1 for field, _ in sort}}
+
+def _query(query, sort, after):
+    if not after:
+        return query
+    after_filter = keyset_filter(sort, decode_cursor(after, sort))
+    return {"$and": [query, after_filter]} if query else after_filter
+
+async def _default_transform(docs):
+    return docs
+
+
+async def fetch_page(collection, query, sort, limit, after, projection=None):
+    sort = _with_sort(sort)
+    docs = await collection.find(_query(query, sort, after), _projection(projection, sort)).sort(sort).limit(limit).to_list(length=limit)
+    next_cursor = encode_cursor(docs[-1], sort) if len(docs) == limit else None
+    return docs, next_cursor
+
+# 🌊 Yield documents from the cursor one batch at a time (memory stays flat)
+async def iter_batches(collection, query, sort, batch_size, after=None, limit=None, projection=None):
+    sort = _with_sort(sort)
+    cursor = collection.find(_query(query, sort, after), _projection(projection, sort)).sort(sort).batch_size(batch_size)
+    if limit:
+        cursor = cursor.limit(limit)
+    batch = []
+    async for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def stream_documents(batches, transform, fmt):
+    async def body():
+        first = True
+        if fmt == "json":
+            yield b"["
+        async for batch in batches:
+            items = await transform(batch)
+            if fmt == "ndjson":
+                yield b"".join(dumps(item) + b"\n" for item in items)
+            else:
+                chunk = b",".join(dumps(item) for item in items)
+                if chunk:
+                    yield chunk if first else b"," + chunk
+                    first = False
+        if fmt == "json":
+            yield b"]"
+
+    media_type = "application/x-ndjson" if fmt == "ndjson" else "application/json"
+    return StreamingResponse(body(), media_type=media_type)
+
+# 📚 Keyset-paginated list response, or a streamed one when ?stream= is set.
+# The body stays a plain JSON array; the next cursor goes in X-Next-Cursor.
+async def paginate(collection, query, sort, page: PageParams, transform=None, default_limit=100, projection=None):
+    transform = transform or _default_transform
+    if page.stream:
+        batches = iter_batches(collection, query, sort, page.batch_size, page.after, page.limit, projection)
+        return stream_documents(batches, transform, page.stream)
+
+    docs, next_cursor = await fetch_page(collection, query, sort, page.limit or default_limit, page.after, projection)
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    return FastJSONResponse(await transform(docs), headers=headers)
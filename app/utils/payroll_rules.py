@@ -0,0 +1,139 @@
+import asyncio
+import time
+import numpy as np
+from app.db.mongo import db
+from app.models.payroll import PayrollScenario
+
+FRAME_TTL_SECONDS = 300
+
+# 📊 Columnar snapshot of the `payrolls` collection (one row per employee)
+class PayrollFrame:
+    def __init__(self, user_ids, names, departments, dept_codes, base, bonus, deductions):
+        self.user_ids = user_ids          # object array
+        self.names = names                # object array
+        self.departments = departments    # list of department names, indexed by code
+        self.dept_codes = dept_codes      # int array
+        self.base = base                  # float arrays
+        self.bonus = bonus
+        self.deductions = deductions
+        self.loaded_at = time.monotonic()
+
+    def __len__(self):
+        return len(self.user_ids)
+
+async def load_payroll_frame() -> PayrollFrame:
+    rows = await db.payrolls.aggregate([
+        {"$lookup": {"from": "employees", "localField": "user_id", "foreignField": "user_id", "as": "employee"}},
+        {
+            "$project": {
+                "_id": 0,
+                "user_id": 1,
+                "employee_name": 1,
+                "base_salary": 1,
+                "bonus": 1,
+                "deductions": 1,
+                "department": {"$ifNull": [{"$first": "$employee.department"}, ""]}
+            }
+        }
+    ]).to_list(length=None)
+
+    departments, dept_codes = np.unique(np.array([r["department"] for r in rows], dtype=object).astype(str), return_inverse=True)
+    return PayrollFrame(
+        user_ids=np.array([r["user_id"] for r in rows], dtype=object),
+        names=np.array([r.get("employee_name") for r in rows], dtype=object),
+        departments=list(departments),
+        dept_codes=dept_codes.astype(np.int64),
+        base=np.array([r.get("base_salary") or 0 for r in rows], dtype=np.float64),
+        bonus=np.array([r.get("bonus") or 0 for r in rows], dtype=np.float64),
+        deductions=np.array([r.get("deductions") or 0 for r in rows], dtype=np.float64),
+    )
+
+# ⏱ Keep one snapshot in memory so interactive what-ifs skip the reload
+_frame = None
+_frame_lock = asyncio.Lock()
+
+async def get_payroll_frame(refresh: bool = False) -> PayrollFrame:
+    global _frame
+    async with _frame_lock:
+        if refresh or _frame is None or time.monotonic() - _frame.loaded_at > FRAME_TTL_SECONDS:
+            _frame = await load_payroll_frame()
+        return _frame
+
+def progressive_tax(gross, slabs):
+    tax = np.zeros_like(gross)
+    lower = 0.0
+    for slab in sorted(slabs, key=lambda s: np.inf if s.up_to is None else s.up_to):
+        upper = np.inf if slab.up_to is None else slab.up_to
+        tax += np.clip(gross - lower, 0, upper - lower) * (slab.rate / 100)
+        lower = upper
+    return tax
+
+# 🧮 Apply a scenario to every employee at once (loops only over rules and
+# slabs, never over employees)
+def simulate(frame: PayrollFrame, scenario: PayrollScenario):
+    current_net = frame.base + frame.bonus - frame.deductions
+
+    multiplier = np.ones_like(frame.base)
+    for rule in scenario.raises:
+        factor = 1 + rule.percent / 100
+        if rule.departments is None:
+            multiplier *= factor
+        else:
+            codes = [frame.departments.index(d) for d in rule.departments if d in frame.departments]
+            multiplier = np.where(np.isin(frame.dept_codes, codes), multiplier * factor, multiplier)
+    base = frame.base * multiplier
+
+    bonus = frame.bonus if scenario.bonus_cap is None else np.minimum(frame.bonus, scenario.bonus_cap)
+
+    deductions = frame.deductions
+    if scenario.deduction_policy is not None:
+        deductions = base * (scenario.deduction_policy.percent / 100)
+        if scenario.deduction_policy.cap is not None:
+            deductions = np.minimum(deductions, scenario.deduction_policy.cap)
+
+    gross = base + bonus
+    tax = progressive_tax(gross, scenario.tax_slabs)
+    net = gross - deductions - tax
+    delta = net - current_net
+
+    n_depts = len(frame.departments)
+    def by_dept(values):
+        return np.bincount(frame.dept_codes, weights=values, minlength=n_depts)
+
+    headcount = np.bincount(frame.dept_codes, minlength=n_depts)
+    totals = {
+        "current_net": by_dept(current_net),
+        "gross": by_dept(gross),
+        "tax": by_dept(tax),
+        "deductions": by_dept(deductions),
+        "net": by_dept(net),
+        "delta": by_dept(delta),
+    }
+    departments = [
+        {"department": name, "headcount": int(headcount[i]), **{k: round(float(v[i]), 2) for k, v in totals.items()}}
+        for i, name in enumerate(frame.departments)
+    ]
+
+    if scenario.top_deltas and scenario.top_deltas < len(frame):
+        idx = np.argpartition(-np.abs(delta), scenario.top_deltas)[:scenario.top_deltas]
+    else:
+        idx = np.arange(len(frame))
+    idx = idx[np.argsort(-np.abs(delta[idx]), kind="stable")]
+    employees = [
+        {
+            "user_id": frame.user_ids[i],
+            "name": frame.names[i],
+            "department": frame.departments[frame.dept_codes[i]],
+            "current_net": round(float(current_net[i]), 2),
+            "net": round(float(net[i]), 2),
+            "delta": round(float(delta[i]), 2),
+        }
+        for i in idx.tolist()
+    ]
+
+    return {
+        "employees_simulated": len(frame),
+        "totals": {k: round(float(v.sum()), 2) for k, v in totals.items()},
+        "departments": departments,
+        "employee_deltas": employees,
+    }
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import re
+import uuid
+from datetime import datetime, timedelta
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from app.db.mongo import db
+from app.utils.pagination import iter_batches
+
+logger = logging.getLogger(__name__)
+
+RUN_BATCH_SIZE = 500
+STALE_AFTER = timedelta(minutes=5)
+PERIOD_PATTERN = re.compile(r"^\d{4}-(0[1-9]|1[0-2])$")
+
+# 🏃 Payroll runs: one job per (pay period, department) in `payroll_runs`.
+# A job streams the employees, reads their salary structure from `payrolls`
+# and upserts one slip per employee into `payslips` (_id "<user_id>:<period>"),
+# so re-running a period overwrites instead of duplicating.
+_tasks = set()
+
+# Raised inside a run whose job was taken over by a newer start
+class RunTakenOver(Exception):
+    pass
+
+def payroll_run_id(period: str, department: str = None) -> str:
+    return f"{period}:{department or 'ALL'}"
+
+def serialize_run(run):
+    run = dict(run)
+    run.pop("owner", None)
+    total = run.get("total") or 0
+    run["progress"] = round(run.get("processed", 0) / total, 4) if total else (1.0 if run.get("status") == "completed" else 0.0)
+    return run
+
+async def start_payroll_run(period: str, department: str = None, started_by: str = None):
+    run_id = payroll_run_id(period, department)
+    # Every write of this job is conditional on still owning the run document
+    owner = uuid.uuid4().hex
+    now = datetime.utcnow()
+    try:
+        run = await db.payroll_runs.find_one_and_update(
+            {
+                "_id": run_id,
+                "$or": [{"status": {"$ne": "running"}}, {"heartbeat_at": {"$lt": now - STALE_AFTER}}]
+            },
+            {
+                "$set": {
+                    "period": period,
+                    "department": department,
+                    "status": "running",
+                    "owner": owner,
+                    "total": None,
+                    "processed": 0,
+                    "written": 0,
+                    "skipped": 0,
+                    "error": None,
+                    "started_by": started_by,
+                    "started_at": now,
+                    "heartbeat_at": now,
+                    "finished_at": None
+                }
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        # Same period/department is already running: hand back that job
+        return await db.payroll_runs.find_one({"_id": run_id}), False
+
+    task = asyncio.create_task(_execute(run_id, owner, period, department))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return run, True
+
+def _payslip_op(employee, salary, period, run_id, now):
+    total_salary = salary.get("base_salary", 0) + salary.get("bonus", 0) - salary.get("deductions", 0)
+    return UpdateOne(
+        {"_id": f"{employee['user_id']}:{period}"},
+        {
+            "$set": {
+                "user_id": employee["user_id"],
+                "employee_name": employee.get("name"),
+                "department": employee.get("department"),
+                "period": period,
+                "base_salary": salary.get("base_salary", 0),
+                "bonus": salary.get("bonus", 0),
+                "deductions": salary.get("deductions", 0),
+                "total_salary": total_salary,
+                "run_id": run_id,
+                "generated_at": now
+            }
+        },
+        upsert=True
+    )
+
+async def _update_run(run_id: str, owner: str, update: dict):
+    result = await db.payroll_runs.update_one({"_id": run_id, "owner": owner}, update)
+    if result.matched_count == 0:
+        raise RunTakenOver(run_id)
+
+async def _execute(run_id: str, owner: str, period: str, department: str = None):
+    emp_query = {"department": department} if department else {}
+    try:
+        total = await db.employees.count_documents(emp_query)
+        await _update_run(run_id, owner, {"$set": {"total": total}})
+
+        projection = {"user_id": 1, "name": 1, "department": 1}
+        async for employees in iter_batches(db.employees, emp_query, [("_id", 1)], RUN_BATCH_SIZE, projection=projection):
+            user_ids = [e["user_id"] for e in employees]
+            salaries = {}
+            async for p in db.payrolls.find({"user_id": {"$in": user_ids}}):
+                salaries[p["user_id"]] = p
+
+            now = datetime.utcnow()
+            ops = [
+                _payslip_op(e, salaries[e["user_id"]], period, run_id, now)
+                for e in employees if e["user_id"] in salaries
+            ]
+            if ops:
+                await db.payslips.bulk_write(ops, ordered=False)
+
+            await _update_run(
+                run_id, owner,
+                {
+                    "$inc": {"processed": len(employees), "written": len(ops), "skipped": len(employees) - len(ops)},
+                    "$set": {"heartbeat_at": now}
+                }
+            )
+
+        await _update_run(run_id, owner, {"$set": {"status": "completed", "finished_at": datetime.utcnow()}})
+    except RunTakenOver:
+        # A newer start owns the run now: stop without touching its counters or status
+        logger.info("Payroll run %s was taken over; stopping the old job", run_id)
+    except asyncio.CancelledError:
+        await db.payroll_runs.update_one(
+            {"_id": run_id, "owner": owner},
+            {"$set": {"status": "interrupted", "finished_at": datetime.utcnow()}}
+        )
+        raise
+    except Exception as e:
+        logger.exception("Payroll run %s failed", run_id)
+        await db.payroll_runs.update_one(
+            {"_id": run_id, "owner": owner},
+            {"$set": {"status": "failed", "error": str(e), "finished_at": datetime.utcnow()}}
+        )
+
+# 🛑 Called on shutdown: interrupted runs can simply be started again
+async def cancel_payroll_runs():
+    for task in list(_tasks):
+        task.cancel()
+    if _tasks:
+        await asyncio.gather(*_tasks, return_exceptions=True)
@@ -0,0 +1,169 @@
+import asyncio
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from fpdf import FPDF
+from app.utils.normalize import filename_part
+from app.core.config import PAYSLIP_CACHE_DIR, PAYSLIP_CACHE_MAX_AGE_DAYS, PAYSLIP_RENDER_WORKERS
+
+# 🧾 Fields printed on a payslip; the cache key is a hash of exactly these
+PAYSLIP_FIELDS = (
+    "user_id", "employee_name", "department", "period",
+    "base_salary", "bonus", "deductions", "total_salary",
+)
+
+def payslip_digest(payslip: dict) -> str:
+    content = {field: payslip.get(field) for field in PAYSLIP_FIELDS}
+    return hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()
+
+def _text(value) -> str:
+    # The core FPDF fonts are latin-1 only
+    return str("" if value is None else value).encode("latin-1", "replace").decode("latin-1")
+
+def _money(value) -> str:
+    return f"{float(value or 0):,.2f}"
+
+# 🖨 Runs inside the process pool (module level so it can be pickled)
+def render_payslip(payslip: dict) -> bytes:
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", "B", 16)
+    pdf.cell(0, 10, "TalentTrack - Payslip", ln=1, align="C")
+    pdf.set_font("Arial", "", 11)
+    pdf.cell(0, 8, _text(f"Pay period: {payslip.get('period', '')}"), ln=1, align="C")
+    pdf.ln(6)
+
+    for label, key in (("Employee ID", "user_id"), ("Name", "employee_name"), ("Department", "department")):
+        pdf.cell(50, 8, label, border=1)
+        pdf.cell(0, 8, _text(payslip.get(key)), border=1, ln=1)
+    pdf.ln(6)
+
+    pdf.set_font("Arial", "B", 11)
+    pdf.cell(100, 8, "Component", border=1)
+    pdf.cell(0, 8, "Amount", border=1, ln=1, align="R")
+    pdf.set_font("Arial", "", 11)
+    for label, key in (("Base salary", "base_salary"), ("Bonus", "bonus"), ("Deductions", "deductions")):
+        pdf.cell(100, 8, label, border=1)
+        pdf.cell(0, 8, _money(payslip.get(key)), border=1, ln=1, align="R")
+    pdf.set_font("Arial", "B", 11)
+    pdf.cell(100, 8, "Net pay", border=1)
+    pdf.cell(0, 8, _money(payslip.get("total_salary")), border=1, ln=1, align="R")
+
+    return pdf.output(dest="S").encode("latin-1")
+
+
+# How often render() sweeps the disk cache for expired PDFs
+PRUNE_INTERVAL_SECONDS = 3600
+
+# 🏭 Renders in a process pool, caching PDFs on disk by content hash. A cache
+# hit refreshes the file's mtime; files unused for max_age_days are pruned.
+class PayslipRenderer:
+    def __init__(self, cache_dir: str, workers: int, max_age_days: float = 30):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.workers = workers
+        self.max_age_seconds = max_age_days * 86400
+        self._executor = None
+        self._next_prune = 0.0
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}.pdf")
+
+    def _read_cached(self, path: str):
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+            return data
+        except FileNotFoundError:
+            return None
+
+    def _write_cached(self, path: str, data: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    # Deletes cached PDFs (and leftover .tmp files) not used within max_age
+    def prune(self) -> int:
+        cutoff = time.time() - self.max_age_seconds
+        removed = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        removed += 1
+                except FileNotFoundError:
+                    pass
+        return removed
+
+    async def render(self, payslip: dict) -> bytes:
+        if time.monotonic() >= self._next_prune:
+            self._next_prune = time.monotonic() + PRUNE_INTERVAL_SECONDS
+            asyncio.get_running_loop().run_in_executor(None, self.prune)
+        path = self._path(payslip_digest(payslip))
+        data = await asyncio.to_thread(self._read_cached, path)
+        if data is None:
+            loop = asyncio.get_running_loop()
+            content = {field: payslip.get(field) for field in PAYSLIP_FIELDS}
+            data = await loop.run_in_executor(self._get_executor(), render_payslip, content)
+            await asyncio.to_thread(self._write_cached, path, data)
+        return data
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+payslip_renderer = PayslipRenderer(PAYSLIP_CACHE_DIR, PAYSLIP_RENDER_WORKERS, PAYSLIP_CACHE_MAX_AGE_DAYS)
+
+def payslip_filename(payslip: dict) -> str:
+    return f"payslip_{filename_part(payslip['user_id'])}_{filename_part(payslip['period'])}.pdf"
+
+
+# 📦 ZIP writer target that hands out bytes as they are written
+class _ZipSink(io.RawIOBase):
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+# 🌊 Stream a ZIP of rendered payslips; each entry is emitted as soon as its
+# PDF is ready, and only one batch of PDFs is held at a time.
+async def stream_payslip_zip(batches, renderer: PayslipRenderer = payslip_renderer):
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as archive:
+        async for batch in batches:
+            async def render_one(payslip):
+                return payslip_filename(payslip), await renderer.render(payslip)
+            for finished in asyncio.as_completed([render_one(p) for p in batch]):
+                name, data = await finished
+                archive.writestr(name, data)
+                yield sink.drain()
+    yield sink.drain()
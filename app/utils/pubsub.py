@@ -0,0 +1,96 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid, PyMongoError
+from app.db.mongo import db
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_COLLECTION = "cache_invalidations"
+CHANNEL_SIZE_BYTES = 1024 * 1024
+
+# 📡 Lightweight cross-worker pub/sub over a capped Mongo collection.
+# Every worker tails the collection and hands messages published by other
+# workers to the handlers subscribed to that channel.
+class InvalidationBus:
+    def __init__(self):
+        self.origin = uuid.uuid4().hex
+        self.enabled = False
+        self._handlers = {}
+        self._task = None
+
+    def subscribe(self, channel: str, handler):
+        self._handlers.setdefault(channel, []).append(handler)
+
+    async def publish(self, channel: str, message: dict):
+        if not self.enabled:
+            return
+        try:
+            await db[CHANNEL_COLLECTION].insert_one({
+                "channel": channel,
+                "origin": self.origin,
+                "message": message,
+                "published_at": datetime.utcnow()
+            })
+        except PyMongoError as e:
+            logger.warning("Could not publish %s invalidation: %s", channel, e)
+
+    async def start(self):
+        try:
+            await db.create_collection(CHANNEL_COLLECTION, capped=True, size=CHANNEL_SIZE_BYTES)
+        except CollectionInvalid:
+            pass
+        self.enabled = True
+        self._task = asyncio.create_task(self._tail())
+
+    async def stop(self):
+        self.enabled = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # ObjectIds come from each worker's own clock, so they are not ordered
+    # across processes: resume by position ($natural order), skipping up to
+    # and including the last message seen, never by comparing _ids.
+    async def _tail(self):
+        collection = db[CHANNEL_COLLECTION]
+        last = await collection.find_one(sort=[("$natural", -1)])
+        last_id = last["_id"] if last else None
+        while True:
+            try:
+                if last_id is not None and await collection.find_one({"_id": last_id}, {"_id": 1}) is None:
+                    # Rolled out of the capped collection: replay all of it (extra invalidations are harmless)
+                    logger.warning("Invalidation bus fell behind the capped collection; replaying it")
+                    last_id = None
+                skipping = last_id is not None
+                cursor = collection.find({}, cursor_type=CursorType.TAILABLE_AWAIT)
+                while cursor.alive:
+                    async for doc in cursor:
+                        if skipping:
+                            skipping = doc["_id"] != last_id
+                            continue
+                        last_id = doc["_id"]
+                        if doc.get("origin") != self.origin:
+                            self._dispatch(doc.get("channel"), doc.get("message") or {})
+                    await asyncio.sleep(0.1)
+            except asyncio.CancelledError:
+                raise
+            except PyMongoError as e:
+                logger.warning("Invalidation bus interrupted: %s", e)
+            await asyncio.sleep(1)
+
+    def _dispatch(self, channel, message):
+        for handler in self._handlers.get(channel, []):
+            try:
+                handler(message)
+            except Exception:
+                logger.exception("Invalidation handler for %s failed", channel)
+
+
+invalidation_bus = InvalidationBus()
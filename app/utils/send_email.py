@@ -1,35 +1,43 @@
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-import os
-from dotenv import load_dotenv
+from app.core.config import EMAIL_HOST, EMAIL_PORT, EMAIL_USE_TLS, EMAIL_ADDRESS, EMAIL_PASSWORD
 
-load_dotenv()
+RESET_SUBJECT = "Reset Your TalentTrack Password"
 
-EMAIL_ADDRESS = os.getenv("EMAIL_ADDRESS")
-EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD")
+def build_message(to_email: str, subject: str, html: str) -> MIMEMultipart:
+    message = MIMEMultipart()
+    message["From"] = EMAIL_ADDRESS
+    message["To"] = to_email
+    message["Subject"] = subject
+    message.attach(MIMEText(html, "html"))
+    return message
 
-def send_reset_email(to_email: str, reset_link: str):
-    if not EMAIL_ADDRESS or not EMAIL_PASSWORD:
-        raise Exception("EMAIL_ADDRESS or EMAIL_PASSWORD not set in .env")
-
-    try:
-        message = MIMEMultipart()
-        message["From"] = EMAIL_ADDRESS
-        message["To"] = to_email
-        message["Subject"] = "Reset Your TalentTrack Password"
-
-        body = f"""
+def reset_email_body(reset_link: str) -> str:
+    return f"""
         <p>Hello,</p>
         <p>You requested a password reset. Click the link below to reset it:</p>
         <a href="{reset_link}">{reset_link}</a>
         <p>This link will expire in 1 hour.</p>
         """
-        message.attach(MIMEText(body, "html"))
 
-        with smtplib.SMTP("smtp.gmail.com", 587) as server:
-            server.starttls()
-            server.login(EMAIL_ADDRESS, EMAIL_PASSWORD)
+# 🔌 Open an authenticated SMTP session (reused by the outbox worker)
+def open_smtp_session() -> smtplib.SMTP:
+    server = smtplib.SMTP(EMAIL_HOST, EMAIL_PORT, timeout=30)
+    if EMAIL_USE_TLS:
+        server.starttls()
+    if EMAIL_ADDRESS and EMAIL_PASSWORD:
+        server.login(EMAIL_ADDRESS, EMAIL_PASSWORD)
+    return server
+
+# ✉️ Send immediately (blocking); request handlers use the outbox instead
+def send_reset_email(to_email: str, reset_link: str):
+    if not EMAIL_ADDRESS or not EMAIL_PASSWORD:
+        raise Exception("EMAIL_ADDRESS or EMAIL_PASSWORD not set in .env")
+
+    try:
+        message = build_message(to_email, RESET_SUBJECT, reset_email_body(reset_link))
+        with open_smtp_session() as server:
             server.send_message(message)
 
     except Exception as e:
@@ -0,0 +1,76 @@
+import json
+import re
+from datetime import date, datetime
+from typing import Optional
+from bson import Decimal128, ObjectId
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib encoder
+    orjson = None
+
+MAX_FIELDS = 30
+FIELD_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*$")
+
+
+# 🔄 One pass over a Mongo document: ObjectId/Decimal128 -> str, dates -> ISO
+def to_jsonable(value):
+    if isinstance(value, dict):
+        return {k: to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(v) for v in value]
+    if isinstance(value, (ObjectId, Decimal128)):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _default(value):
+    if isinstance(value, (ObjectId, Decimal128)):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+# ⚡ Encode straight to bytes; orjson handles datetimes natively and only
+# calls back into Python for ObjectIds
+def dumps(value) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(to_jsonable(value), separators=(",", ":")).encode()
+
+
+# 📤 Response class that skips jsonable_encoder; routes return it directly
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+# 🎯 ?fields=name,email -> Mongo projection (None means the whole document)
+def parse_fields(fields: Optional[str], required=()):
+    if not fields:
+        return None
+    names = [f.strip() for f in fields.split(",") if f.strip()]
+    if len(names) > MAX_FIELDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_FIELDS} fields can be requested")
+    invalid = [f for f in names if not FIELD_PATTERN.match(f)]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid field names: {', '.join(invalid)}")
+
+    projection = {name: 1 for name in names}
+    for name in required:
+        projection[name] = 1
+    return projection
+
+
+# ✂️ Apply a projection to a document that is already in memory (cache hits)
+def project(doc, projection):
+    if not projection:
+        return doc
+    return {
+        k: v for k, v in doc.items()
+        if k == "_id" or any(p == k or p.startswith(k + ".") for p in projection)
+    }
+
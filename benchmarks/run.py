@@ -0,0 +1,303 @@
+# 🏁 Endpoint benchmark suite
+#
+#   pip install -r requirements.txt -r benchmarks/requirements.txt
+#   python -m benchmarks.run                        # in-memory Mongo stand-in
+#   python -m benchmarks.run --mongo-uri mongodb://localhost:27017
+#   python -m benchmarks.run --record               # store the current numbers as the baseline
+#
+# Boots the app in-process, seeds synthetic data, drives every router through an
+# ASGI client and reports p50/p95/p99 latency and throughput per endpoint.
+# Exits with status 1 when an endpoint regresses past benchmarks/baseline.json,
+# or when there is no baseline to compare against (record one on the CI runner).
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+# Settings must be in place before the app reads its config
+os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+os.environ.setdefault("MONGO_DB_NAME", "talenttrack_bench")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")  # measure the route, not the bcrypt cost factor
+os.environ.setdefault("ATTENDANCE_VERIFIER", "cidr")
+os.environ.setdefault("ATTENDANCE_ALLOWED_CIDRS", "127.0.0.0/8")
+os.environ.setdefault("MONGO_WARMUP_CONNECTIONS", "1")
+
+import httpx
+from app.main import app
+from app.db import mongo
+from app.auth.jwt_handler import create_jwt_token
+from app.auth.passwords import password_hasher
+from app.utils.attendance_rollups import rebuild_rollups
+from benchmarks.seed import seed
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+BENCH_PASSWORD = "bench-password"
+
+
+# 📋 Endpoint scenarios: name -> factory(ctx, n) returning (method, url, kwargs)
+def build_scenarios(ctx):
+    admin = {"Authorization": f"Bearer {ctx['admin_token']}"}
+    users = ctx["user_ids"]
+    first_day, last_day = ctx["attendance_range"]
+
+    def employee_headers(n):
+        uid = users[n % len(users)]
+        return uid, {"Authorization": f"Bearer {ctx['tokens'][uid]}"}
+
+    def mark_attendance(ctx, n):
+        # Every request marks a different employee; today has no seeded records
+        ctx["mark_next"] += 1
+        _, headers = employee_headers(ctx["mark_next"])
+        return "POST", "/attendance/", {"headers": headers, "data": {"status": "present"}}
+
+    def bulk_attendance(ctx, n):
+        # One NDJSON row per employee for a day nobody has a record for yet
+        ctx["bulk_next"] += 1
+        day = (date(2100, 1, 1) + timedelta(days=ctx["bulk_next"])).isoformat()
+        rows = (users[i % len(users)] for i in range(ctx["bulk_rows"]))
+        body = "".join(json.dumps({"employee_id": uid, "date": day, "status": "present"}) + "\n" for uid in rows)
+        return "POST", "/attendance/bulk", {"headers": {**admin, "Content-Type": "application/x-ndjson"},
+                                            "content": body.encode()}
+
+    scenarios = {
+        "auth.login": lambda ctx, n: ("POST", "/auth/login", {"data": {
+            "email": f"{users[n % len(users)].lower()}@talenttrack.test", "password": BENCH_PASSWORD}}),
+        "employees.list": lambda ctx, n: ("GET", "/employees/?limit=100", {"headers": admin}),
+        "employees.list_fields": lambda ctx, n: ("GET", "/employees/?limit=500&fields=name,email", {"headers": admin}),
+        "employees.search": lambda ctx, n: ("GET", f"/employees/search?q=employee+{n % 50}", {"headers": admin}),
+        "employees.get": lambda ctx, n: ("GET", f"/employees/{users[n % len(users)]}", {"headers": admin}),
+        "payroll.list": lambda ctx, n: ("GET", "/payroll/?limit=100", {"headers": admin}),
+        "payroll.employee": lambda ctx, n: ("GET", f"/payroll/employee/{users[n % len(users)]}", {"headers": admin}),
+        "payroll.simulate": lambda ctx, n: ("POST", "/payroll/simulate", {"headers": admin, "json": {
+            "raises": [{"percent": 5}], "tax_slabs": [{"up_to": 50000, "rate": 5}, {"rate": 20}], "top_deltas": 10}}),
+        "attendance.mark": mark_attendance,
+        "attendance.bulk": bulk_attendance,
+        "attendance.list": lambda ctx, n: ("GET", "/attendance/?limit=100", {"headers": admin}),
+        "attendance.me": lambda ctx, n: ("GET", "/attendance/me", {"headers": employee_headers(n)[1]}),
+        "attendance.employee": lambda ctx, n: ("GET", f"/attendance/{users[n % len(users)]}", {"headers": admin}),
+        "attendance.report": lambda ctx, n: (
+            "GET", f"/attendance/report?start={first_day}&end={last_day}", {"headers": admin}),
+        "leaves.list": lambda ctx, n: ("GET", "/leaves/?limit=100", {"headers": admin}),
+        "leaves.me": lambda ctx, n: ("GET", "/leaves/me", {"headers": employee_headers(n)[1]}),
+        "leaves.pending": lambda ctx, n: ("GET", "/leaves/status/pending?limit=100", {"headers": admin}),
+        "leaves.calendar": lambda ctx, n: ("GET", "/leaves/calendar", {"headers": admin}),
+        "dashboard": lambda ctx, n: ("GET", "/dashboard/", {"headers": admin}),
+    }
+    return scenarios
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies, errors, elapsed):
+    values = sorted(latencies)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "rps": round(len(values) / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+async def _send(client, factory, ctx, n):
+    method, url, kwargs = factory(ctx, n)
+    started = time.perf_counter()
+    response = await client.request(method, url, **kwargs)
+    await response.aread()
+    return time.perf_counter() - started, response.status_code
+
+
+# 🔁 `requests` calls spread over `concurrency` workers; a few warm-up calls first
+async def run_endpoint(client, factory, ctx, requests, concurrency, warmup):
+    for n in range(warmup):
+        await _send(client, factory, ctx, n)
+
+    counter = iter(range(requests))
+    latencies, errors = [], 0
+
+    async def worker():
+        nonlocal errors
+        for n in counter:
+            seconds, status = await _send(client, factory, ctx, n)
+            latencies.append(seconds)
+            if status >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return summarize(latencies, errors, elapsed)
+
+
+# 🔀 All scenarios interleaved at once (exercises every router concurrently)
+async def run_mixed(client, scenarios, ctx, requests, concurrency):
+    jobs = [(name, n) for name in scenarios for n in range(requests)]
+    random.Random(1).shuffle(jobs)
+    queue = iter(jobs)
+    latencies = {name: [] for name in scenarios}
+    errors = {name: 0 for name in scenarios}
+
+    async def worker():
+        for name, n in queue:
+            seconds, status = await _send(client, scenarios[name], ctx, n)
+            latencies[name].append(seconds)
+            if status >= 400:
+                errors[name] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {name: summarize(latencies[name], errors[name], elapsed) for name in scenarios}, len(jobs) / elapsed
+
+
+def print_report(title, results):
+    print(f"\n{title}")
+    print(f"{'endpoint':<24}{'reqs':>7}{'errs':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}")
+    for name, r in results.items():
+        print(f"{name:<24}{r['requests']:>7}{r['errors']:>6}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}{r['rps']:>10}")
+
+
+# 📏 Regression: p95 slower or throughput lower than the baseline by more than `tolerance`
+def compare(results, baseline, tolerance):
+    failures = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if r["errors"] > base.get("errors", 0):
+            failures.append(f"{name}: {r['errors']} errors (baseline {base.get('errors', 0)})")
+        if r["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            failures.append(f"{name}: p95 {r['p95_ms']} ms vs baseline {base['p95_ms']} ms")
+        if r["rps"] < base["rps"] * (1 - tolerance):
+            failures.append(f"{name}: {r['rps']} req/s vs baseline {base['rps']} req/s")
+    return failures
+
+
+# mongomock's bulk builder predates the `sort` argument pymongo >= 4.11 passes
+# for UpdateOne/ReplaceOne; drop it so bulk_write works on the stand-in.
+def _in_memory_client():
+    import mongomock.collection
+    from mongomock_motor import AsyncMongoMockClient
+
+    builder = mongomock.collection.BulkOperationBuilder
+    for name in ("add_update", "add_replace", "add_delete"):
+        method = getattr(builder, name)
+        if getattr(method, "_drops_sort", False):
+            continue
+
+        def without_sort(self, *args, _method=method, sort=None, **kwargs):
+            return _method(self, *args, **kwargs)
+        without_sort._drops_sort = True
+        setattr(builder, name, without_sort)
+    return AsyncMongoMockClient()
+
+
+async def main(args):
+    if args.mongo_uri:
+        mongo.set_client(mongo.create_client(args.mongo_uri))
+    else:
+        mongo.set_client(_in_memory_client())
+
+    async with app.router.lifespan_context(app):
+        password_hash = await password_hasher.hash(BENCH_PASSWORD)
+        seeded = await seed(mongo.db, args.employees, args.attendance, args.leaves, password_hash)
+        await rebuild_rollups(*seeded["attendance_range"])
+
+        admin = seeded["admin"]
+        ctx = {
+            "user_ids": seeded["user_ids"],
+            "attendance_range": seeded["attendance_range"],
+            "admin_token": create_jwt_token(admin["user_id"], admin["role"]),
+            "tokens": {uid: create_jwt_token(uid, "employee") for uid in seeded["user_ids"]},
+            "mark_next": 0,  # index 0 is the admin
+            "bulk_next": 0,
+            "bulk_rows": args.bulk_rows,
+        }
+        scenarios = build_scenarios(ctx)
+        if args.only:
+            scenarios = {k: v for k, v in scenarios.items() if any(k.startswith(p) for p in args.only)}
+
+        transport = httpx.ASGITransport(app=app)
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", limits=limits) as client:
+            results = {}
+            for name, factory in scenarios.items():
+                results[name] = await run_endpoint(
+                    client, factory, ctx, args.requests, args.concurrency, args.warmup)
+            mixed, mixed_rps = await run_mixed(client, scenarios, ctx, args.mixed_requests, args.concurrency)
+
+    config = {k: getattr(args, k) for k in ("employees", "attendance", "leaves", "bulk_rows", "requests", "concurrency")}
+    config["database"] = "mongodb" if args.mongo_uri else "in-memory"
+    print(f"Benchmark config: {json.dumps(config)}")
+    print_report("Per endpoint", results)
+    print_report(f"Mixed load ({mixed_rps:.1f} req/s overall)", mixed)
+
+    report = {"config": config, "endpoints": results, "mixed": mixed, "mixed_rps": round(mixed_rps, 1)}
+    if args.json_out:
+        Path(args.json_out).write_text(json.dumps(report, indent=2))
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"\n❌ No baseline at {args.baseline}; record one with --record")
+        return 1
+
+    baseline = json.loads(args.baseline.read_text())
+    if baseline.get("config") != config:
+        print(f"\n⚠️  Baseline was recorded with a different config: {json.dumps(baseline.get('config'))}")
+    failures = compare(results, baseline.get("endpoints", {}), args.tolerance)
+    if failures:
+        print("\n❌ Regressions:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print(f"\n✅ Within {args.tolerance:.0%} of the baseline")
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="TalentTrack endpoint benchmarks")
+    parser.add_argument("--mongo-uri", help="Real MongoDB to benchmark against (default: in-memory stand-in)")
+    parser.add_argument("--employees", type=int, default=500)
+    parser.add_argument("--attendance", type=int, default=20000)
+    parser.add_argument("--leaves", type=int, default=2000)
+    parser.add_argument("--bulk-rows", type=int, default=1000, help="Rows per attendance.bulk request")
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per endpoint")
+    parser.add_argument("--mixed-requests", type=int, default=50, help="Requests per endpoint in the mixed phase")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--only", nargs="*", help="Endpoint name prefixes to run, e.g. payroll leaves.me")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before failing (0.25 = 25%%)")
+    parser.add_argument("--record", "--update-baseline", dest="update_baseline", action="store_true",
+                        help="Write the results as the new baseline instead of comparing")
+    parser.add_argument("--json-out", help="Also write the full report to this file")
+    args = parser.parse_args(argv)
+    if args.mongo_uri is None and os.getenv("BENCH_MONGO_URI"):
+        args.mongo_uri = os.getenv("BENCH_MONGO_URI")
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    # mark_attendance needs a fresh employee per request
+    needed = args.warmup + args.requests + args.mixed_requests + 1
+    if args.employees < needed:
+        print(f"--employees must be at least {needed} so attendance.mark never repeats an employee", file=sys.stderr)
+        sys.exit(2)
+    sys.exit(asyncio.run(main(args)))
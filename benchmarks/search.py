@@ -0,0 +1,96 @@
+# 🔎 Employee search benchmark
+#
+#   python -m benchmarks.search                     # 50k employees, in-memory Mongo stand-in
+#   python -m benchmarks.search --employees 100000 --repeat 50
+#
+# Seeds a directory with realistic, overlapping names, loads the search index
+# and times each query cold (term and result caches cleared) and warm.
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+os.environ.setdefault("MONGO_DB_NAME", "talenttrack_bench")
+
+from app.db import mongo
+from app.utils.employee_id import format_employee_id
+from app.utils.employee_search import EmployeeSearchIndex
+from benchmarks.run import _in_memory_client, percentile
+from benchmarks.seed import DEPARTMENTS, ROLES, _insert
+
+FIRST_NAMES = [
+    "james", "john", "joan", "joanna", "jose", "mary", "maria", "mark", "sam", "samuel",
+    "sara", "alex", "alexander", "ali", "anna", "priya", "ravi", "rahul", "li", "wei",
+]
+LAST_NAMES = ["smith", "smart", "jones", "johnson", "sharma", "singh", "garcia", "lee", "brown", "kumar"]
+
+# Broad prefixes, multi-term AND queries, exact ids and a facet filter
+QUERIES = [
+    ("one letter", "j", None),
+    ("prefix", "jo", None),
+    ("first + last", "jo sm", None),
+    ("three terms", "sam sharma eng", None),
+    ("email word", "talenttrack", None),
+    ("user id prefix", "emp4200", None),
+    ("with department", "ra", "Engineering"),
+    ("no match", "zzz", None),
+]
+
+
+def people(count: int, rng):
+    for n in range(1, count + 1):
+        uid = format_employee_id(n)
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        yield {
+            "user_id": uid,
+            "name": f"{first.title()} {last.title()}",
+            "email": f"{first}.{last}.{n}@talenttrack.test",
+            "department": DEPARTMENTS[n % len(DEPARTMENTS)],
+            "role": rng.choice(ROLES),
+        }
+
+
+async def _time(index, query, department, repeat, cold):
+    latencies = []
+    for _ in range(repeat):
+        if cold:
+            index._changed()
+        started = time.perf_counter()
+        await index.search(query, department=department, limit=20)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return sorted(latencies)
+
+
+async def main(args):
+    mongo.set_client(_in_memory_client())
+    await mongo.db.employees.delete_many({})
+    await _insert(mongo.db.employees, list(people(args.employees, random.Random(args.seed))))
+    index = EmployeeSearchIndex(refresh_seconds=float("inf"))
+    started = time.perf_counter()
+    await index.load()
+    load_seconds = time.perf_counter() - started
+
+    print(f"Index: {index.stats()} loaded in {load_seconds:.2f}s")
+    print(f"{'query':<18}{'text':<18}{'matches':>9}{'cold p50':>11}{'cold p95':>11}{'warm p50':>11}")
+    for label, query, department in QUERIES:
+        total = (await index.search(query, department=department))["total"]
+        cold = await _time(index, query, department, args.repeat, cold=True)
+        warm = await _time(index, query, department, args.repeat, cold=False)
+        print(f"{label:<18}{query:<18}{total:>9}{percentile(cold, 50):>10.2f}ms"
+              f"{percentile(cold, 95):>10.2f}ms{percentile(warm, 50):>10.2f}ms")
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="TalentTrack employee search benchmark")
+    parser.add_argument("--employees", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per query (cold and warm)")
+    parser.add_argument("--seed", type=int, default=7)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
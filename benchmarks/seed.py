@@ -0,0 +1,96 @@
+import random
+from datetime import datetime, timedelta
+from app.utils.employee_id import format_employee_id
+
+DEPARTMENTS = ["Engineering", "Sales", "HR", "Finance", "Support", "Operations"]
+ROLES = ["employee"] * 8 + ["hr"]
+ATTENDANCE_STATUSES = ["present"] * 8 + ["late", "absent"]
+LEAVE_TYPES = ["leave", "work from home", "floater leave"]
+LEAVE_STATUSES = ["approved", "approved", "pending", "rejected"]
+CHUNK = 5000
+
+COLLECTIONS = [
+    "users", "employees", "payrolls", "attendance", "leaves", "leave_balances",
+    "attendance_daily", "attendance_monthly", "counters", "payslips", "payroll_runs", "email_outbox",
+]
+
+
+async def _insert(collection, docs):
+    for i in range(0, len(docs), CHUNK):
+        await collection.insert_many(docs[i:i + CHUNK], ordered=False)
+
+
+# 🌱 Synthetic tenant: `employees` people (EMP001 is the admin), one payroll each,
+# `attendance` records spread over the most recent days and `leaves` around today.
+# Every user shares one precomputed password hash so seeding stays fast.
+async def seed(db, employees: int, attendance: int, leaves: int, password_hash: str, random_seed: int = 7):
+    rng = random.Random(random_seed)
+    today = datetime.utcnow().date()
+
+    for name in COLLECTIONS:
+        await db[name].delete_many({})
+
+    user_ids = [format_employee_id(i) for i in range(1, employees + 1)]
+    people = []
+    for n, uid in enumerate(user_ids):
+        role = "admin" if n == 0 else rng.choice(ROLES)
+        people.append({
+            "user_id": uid,
+            "name": f"Employee {n + 1}",
+            "email": f"{uid.lower()}@talenttrack.test",
+            "department": DEPARTMENTS[n % len(DEPARTMENTS)],
+            "role": role,
+            "joining_date": (today - timedelta(days=rng.randint(30, 3000))).isoformat(),
+        })
+    await _insert(db.employees, people)
+    await _insert(db.users, [
+        {"email": p["email"], "password": password_hash, "role": p["role"], "is_active": True} for p in people
+    ])
+    await db.counters.update_one({"_id": "employeeId"}, {"$set": {"seq": employees}}, upsert=True)
+
+    payrolls = []
+    for p in people:
+        base = float(rng.randrange(30000, 200000, 500))
+        bonus = float(rng.randrange(0, 20000, 500))
+        deductions = round(base * 0.1, 2)
+        payrolls.append({
+            "user_id": p["user_id"], "employee_name": p["name"],
+            "base_salary": base, "bonus": bonus, "deductions": deductions,
+            "total_salary": base + bonus - deductions, "generated_at": datetime.utcnow(),
+        })
+    await _insert(db.payrolls, payrolls)
+
+    # One record per (employee, day), walking back from yesterday
+    records = []
+    for i in range(attendance):
+        day = today - timedelta(days=1 + i // employees)
+        records.append({
+            "user_id": user_ids[i % employees],
+            "date": day.isoformat(),
+            "status": rng.choice(ATTENDANCE_STATUSES),
+            "timestamp": datetime.combine(day, datetime.min.time()) + timedelta(hours=9),
+        })
+    await _insert(db.attendance, records)
+    first_day = (today - timedelta(days=1 + max(attendance - 1, 0) // employees)).isoformat()
+
+    requests = []
+    for i in range(leaves):
+        start = today + timedelta(days=rng.randint(-60, 60))
+        days = rng.randint(1, 5)
+        requests.append({
+            "user_id": rng.choice(user_ids),
+            "type": rng.choice(LEAVE_TYPES),
+            "from_date": start.isoformat(),
+            "to_date": (start + timedelta(days=days - 1)).isoformat(),
+            "reason": "benchmark",
+            "status": rng.choice(LEAVE_STATUSES),
+            "days_requested": days,
+            "applied_at": datetime.utcnow() - timedelta(days=rng.randint(0, 90)),
+        })
+    await _insert(db.leaves, requests)
+
+    return {
+        "user_ids": user_ids,
+        "admin": people[0],
+        "attendance_range": (first_day, (today - timedelta(days=1)).isoformat()),
+    }
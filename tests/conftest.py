@@ -0,0 +1,60 @@
+# 🧪 Test setup: every test gets a fresh in-memory Mongo stand-in
+#
+#   pip install -r requirements.txt -r tests/requirements.txt
+#   python -m pytest -q
+import os
+
+# Settings must be in place before the app reads its config
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ.setdefault("MONGO_DB_NAME", "talenttrack_test")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+import httpx
+import mongomock.collection
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from app.main import app
+from app.db import mongo
+from app.auth.jwt_handler import create_jwt_token
+from app.utils.attendance_archive import attendance_archive
+from app.utils.employee_cache import employee_cache
+
+# pymongo 4.13 passes `sort` to bulk update/replace/delete; mongomock predates it
+def _drop_bulk_sort():
+    builder = mongomock.collection.BulkOperationBuilder
+    for name in ("add_update", "add_replace", "add_delete"):
+        method = getattr(builder, name)
+        if getattr(method, "_drops_sort", False):
+            continue
+
+        def without_sort(self, *args, _method=method, sort=None, **kwargs):
+            return _method(self, *args, **kwargs)
+        without_sort._drops_sort = True
+        setattr(builder, name, without_sort)
+
+_drop_bulk_sort()
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture(autouse=True)
+def db():
+    mongo.set_client(AsyncMongoMockClient())
+    employee_cache.clear()
+    attendance_archive._state_expires_at = 0.0
+    yield mongo.db
+    mongo.set_client(None)
+
+# ASGI client without the lifespan (no background workers, no real Mongo)
+@pytest.fixture
+async def client():
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as c:
+        yield c
+
+@pytest.fixture
+def auth():
+    def headers(user_id="EMP001", role="admin"):
+        return {"Authorization": f"Bearer {create_jwt_token(user_id, role)}"}
+    return headers
@@ -0,0 +1,133 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+import pytest
+from app.utils import attendance_archive as archive_module
+from app.utils.attendance_archive import AttendanceArchive, archive_collection
+from app.utils.attendance_rollups import rebuild_rollups
+
+pytestmark = pytest.mark.anyio
+
+HOT_DAYS = 365
+USER = "EMP002"
+
+
+@pytest.fixture(params=["collection", "file"])
+def tier(request, monkeypatch, tmp_path):
+    if request.param == "file":
+        monkeypatch.setattr(archive_module, "ATTENDANCE_ARCHIVE_DIR", str(tmp_path))
+    return request.param
+
+# Two years of records, every third day up to yesterday, for two employees
+async def _seed(db):
+    today = datetime.utcnow().date()
+    records = [
+        {"user_id": user_id, "date": (today - timedelta(days=day)).isoformat(), "status": "present" if day % 2 else "late"}
+        for day in range(1, 730, 3)
+        for user_id in (USER, "EMP003")
+    ]
+    await db.attendance.insert_many(records)
+    return records
+
+async def _walk(archive, user_id, limit=7):
+    docs, after = [], None
+    while True:
+        page, after = await archive.history(user_id, limit, after)
+        docs.extend(page)
+        if after is None:
+            return docs
+
+def _keys(docs):
+    return [(doc["date"], doc["_id"], doc["status"]) for doc in docs]
+
+
+async def test_history_pages_across_the_cutoff(db, tier):
+    await _seed(db)
+    archive = AttendanceArchive()
+    before = await _walk(archive, USER)
+
+    result = await archive.archive(HOT_DAYS, tier, batch_size=50, settle_seconds=0)
+    assert result["moved"] > 0
+    assert await db.attendance.count_documents({"date": {"$lt": result["cutoff"]}}) == 0
+
+    after = await _walk(archive, USER)
+    assert _keys(after) == _keys(before)
+    assert len({doc["_id"] for doc in after}) == len(after)
+
+async def test_hot_range_skips_the_archive(db, tier):
+    await _seed(db)
+    archive = AttendanceArchive()
+    result = await archive.archive(HOT_DAYS, tier, settle_seconds=0)
+
+    assert not await archive.reaches_archive(result["cutoff"])
+    docs, _ = await archive.history(USER, 1000, start=result["cutoff"])
+    assert docs and all(doc["date"] >= result["cutoff"] for doc in docs)
+
+async def test_record_in_both_tiers_is_served_once(db, tier):
+    await _seed(db)
+    archive = AttendanceArchive()
+    before = await _walk(archive, USER)
+    result = await archive.archive(HOT_DAYS, tier, settle_seconds=0)
+
+    # Copied to the archive but not yet deleted from the live collection
+    moved = next(doc for doc in before if doc["date"] < result["cutoff"])
+    await db.attendance.insert_one(moved)
+    assert _keys(await _walk(archive, USER)) == _keys(before)
+
+async def test_late_write_to_an_archived_month_replaces_the_archived_copy(db, tier):
+    await _seed(db)
+    archive = AttendanceArchive()
+    result = await archive.archive(HOT_DAYS, tier, settle_seconds=0)
+
+    old = next(doc for doc in await _walk(archive, USER) if doc["date"] < result["cutoff"])
+    await db.attendance.insert_one({"user_id": USER, "date": old["date"], "status": "absent"})
+    matches = [doc for doc in await _walk(archive, USER) if doc["date"] == old["date"]]
+    assert [doc["status"] for doc in matches] == ["absent"]
+
+    rerun = await archive.archive(HOT_DAYS, tier, settle_seconds=0)
+    assert rerun["moved"] == 1
+    matches = [doc for doc in await _walk(archive, USER) if doc["date"] == old["date"]]
+    assert [doc["status"] for doc in matches] == ["absent"]
+    if tier == "collection":
+        assert await archive_collection(old["date"][:4]).count_documents({"user_id": USER, "date": old["date"]}) == 1
+
+async def test_cutoff_is_published_before_records_move(db, tier):
+    records = await _seed(db)
+    archive = AttendanceArchive()
+    other_worker = AttendanceArchive()
+    before = await _walk(other_worker, USER)
+
+    task = asyncio.create_task(archive.archive(HOT_DAYS, tier, settle_seconds=0.5))
+    while await db.archive_state.find_one({"_id": "attendance"}) is None:
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.1)
+
+    # During the settle window the cutoff is visible but nothing has left the live collection
+    assert await db.attendance.count_documents({}) == len(records)
+    await other_worker.state(refresh=True)
+    assert await other_worker.reaches_archive()
+    assert _keys(await _walk(other_worker, USER)) == _keys(before)
+
+    await task
+    assert _keys(await _walk(other_worker, USER)) == _keys(before)
+
+    # Same cutoff again: nothing for other workers to pick up, so no wait
+    started = time.monotonic()
+    await archive.archive(HOT_DAYS, tier, settle_seconds=5)
+    assert time.monotonic() - started < 5
+
+async def test_rebuild_rollups_stops_at_the_cutoff(db, tier):
+    records = await _seed(db)
+    first = min(doc["date"] for doc in records)
+    last = max(doc["date"] for doc in records)
+    await rebuild_rollups(first, last)
+    result = await AttendanceArchive().archive(HOT_DAYS, tier, settle_seconds=0)
+    archived_days = await db.attendance_daily.count_documents({"date": {"$lt": result["cutoff"]}})
+
+    rebuilt = await rebuild_rollups(first, last)
+    assert rebuilt["start"] == result["cutoff"]
+    # Rollups of archived months are left as they were, not wiped for lack of live records
+    assert await db.attendance_daily.count_documents({"date": {"$lt": result["cutoff"]}}) == archived_days > 0
+
+    skipped = await rebuild_rollups(first, first)
+    assert skipped["skipped"] == "archived"
@@ -0,0 +1,58 @@
+import pytest
+from app.auth.passwords import password_hasher
+from app.db.indexes import ensure_indexes
+from app.utils.network_verifier import network_verifier
+
+pytestmark = pytest.mark.anyio
+
+EMPLOYEE = {"name": "Jane", "email": "jane@talenttrack.test", "department": "Engineering", "role": "employee",
+            "joining_date": "2024-01-01"}
+
+
+# The unique indexes are what turns concurrent duplicates into DuplicateKeyError
+@pytest.fixture(autouse=True)
+async def indexes(db):
+    await ensure_indexes()
+
+
+async def test_duplicate_email_maps_to_400(db, client, auth):
+    assert (await client.post("/employees/", data=EMPLOYEE, headers=auth())).status_code == 200
+
+    response = await client.post("/employees/", data={**EMPLOYEE, "email": " Jane@TalentTrack.test "}, headers=auth())
+    assert response.status_code == 400
+    assert "already exists" in response.json()["detail"]
+    assert await db.users.count_documents({}) == 1
+    assert await db.employees.count_documents({}) == 1
+
+async def test_email_taken_mid_request_maps_to_400_and_leaves_no_employee(db, client, auth, monkeypatch):
+    hash_password = password_hasher.hash
+
+    # Another request registers the same email while this one is hashing
+    async def racing_hash(password):
+        await db.users.insert_one({"email": EMPLOYEE["email"], "password": "x", "role": "employee"})
+        return await hash_password(password)
+    monkeypatch.setattr(password_hasher, "hash", racing_hash)
+
+    response = await client.post("/employees/", data=EMPLOYEE, headers=auth())
+    assert response.status_code == 400
+    assert await db.users.count_documents({}) == 1
+    assert await db.employees.count_documents({}) == 0
+
+async def test_second_attendance_mark_of_the_day_is_rejected(db, client, auth, monkeypatch):
+    monkeypatch.setattr(network_verifier, "check", lambda request: True)
+    headers = auth("EMP002", "employee")
+
+    assert (await client.post("/attendance/", data={"status": "present"}, headers=headers)).status_code == 200
+    response = await client.post("/attendance/", data={"status": "late"}, headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Attendance already marked for today"
+    assert [doc["status"] async for doc in db.attendance.find({"user_id": "EMP002"})] == ["present"]
+
+async def test_second_payroll_for_an_employee_is_rejected(db, client, auth):
+    await db.employees.insert_one({**EMPLOYEE, "user_id": "EMP002"})
+    form = {"user_id": "emp002", "base_salary": 1000, "bonus": 0, "deductions": 100}
+
+    assert (await client.post("/payroll/", data=form, headers=auth())).status_code == 200
+    response = await client.post("/payroll/", data=form, headers=auth())
+    assert response.status_code == 400
+    assert await db.payrolls.count_documents({"user_id": "EMP002"}) == 1
@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+import pytest
+from app.utils.email_outbox import CLAIM_TIMEOUT, OutboxWorker
+
+pytestmark = pytest.mark.anyio
+
+MAX_ATTEMPTS = 3
+
+
+class FakeSession:
+    def __init__(self):
+        self.sent = []
+
+    def send_batch(self, messages):
+        self.sent.extend(messages)
+        return [None] * len(messages)
+
+    def close_if_idle(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def _worker():
+    return OutboxWorker(max_attempts=MAX_ATTEMPTS, session=FakeSession())
+
+async def _insert_stale(db, attempts):
+    claimed_at = datetime.utcnow() - CLAIM_TIMEOUT - timedelta(minutes=1)
+    result = await db.email_outbox.insert_one({
+        "to": "someone@example.com", "subject": "Hi", "html": "<p>Hi</p>",
+        "status": "sending", "attempts": attempts,
+        "next_attempt_at": claimed_at, "claimed_at": claimed_at, "created_at": claimed_at
+    })
+    return result.inserted_id
+
+
+async def test_stale_claim_is_retried_as_another_attempt(db):
+    _id = await _insert_stale(db, attempts=0)
+    worker = _worker()
+
+    assert await worker.process_once() == 1
+    doc = await db.email_outbox.find_one({"_id": _id})
+    assert doc["status"] == "sent"
+    # The crashed send and the successful one
+    assert doc["attempts"] == 2
+    assert len(worker.session.sent) == 1
+
+async def test_message_that_keeps_crashing_the_worker_ends_up_failed(db):
+    _id = await _insert_stale(db, attempts=0)
+    worker = _worker()
+
+    for _ in range(MAX_ATTEMPTS - 1):
+        # Claim it, then let the claim go stale as if the worker died mid-send
+        await worker._claim_batch()
+        await db.email_outbox.update_one(
+            {"_id": _id}, {"$set": {"claimed_at": datetime.utcnow() - CLAIM_TIMEOUT - timedelta(minutes=1)}}
+        )
+
+    assert await worker.process_once() == 0
+    doc = await db.email_outbox.find_one({"_id": _id})
+    assert doc["status"] == "failed"
+    assert doc["attempts"] == MAX_ATTEMPTS
+    assert worker.session.sent == []
@@ -0,0 +1,100 @@
+import asyncio
+from datetime import datetime
+import pytest
+from app.db.migrations import migrate
+from app.utils.leave_ledger import (
+    MAX_ANNUAL_LEAVES, balance_id, consume_leave_days, ensure_leave_balances, get_taken_days,
+    rebuild_leave_balances, release_leave_days
+)
+
+pytestmark = pytest.mark.anyio
+
+USER = "EMP002"
+YEAR = 2024
+
+
+async def test_consume_stops_at_the_quota(db):
+    assert await consume_leave_days(USER, YEAR, 15)
+    assert not await consume_leave_days(USER, YEAR, MAX_ANNUAL_LEAVES - 14)
+    assert await consume_leave_days(USER, YEAR, MAX_ANNUAL_LEAVES - 15)
+    assert not await consume_leave_days(USER, YEAR, 1)
+    assert await get_taken_days(USER, YEAR) == MAX_ANNUAL_LEAVES
+
+async def test_request_larger_than_the_quota_books_nothing(db):
+    assert not await consume_leave_days(USER, YEAR, MAX_ANNUAL_LEAVES + 1)
+    assert await db.leave_balances.find_one({"_id": balance_id(USER, YEAR)}) is None
+
+async def test_concurrent_approvals_never_overbook(db):
+    results = await asyncio.gather(*(consume_leave_days(USER, YEAR, 3) for _ in range(10)))
+    assert results.count(True) == MAX_ANNUAL_LEAVES // 3
+    assert await get_taken_days(USER, YEAR) == 3 * (MAX_ANNUAL_LEAVES // 3)
+
+async def test_release_gives_days_back(db):
+    assert await consume_leave_days(USER, YEAR, MAX_ANNUAL_LEAVES)
+    await release_leave_days(USER, YEAR, 5)
+    assert await get_taken_days(USER, YEAR) == MAX_ANNUAL_LEAVES - 5
+    assert await consume_leave_days(USER, YEAR, 5)
+
+async def test_years_and_employees_are_separate_ledgers(db):
+    assert await consume_leave_days(USER, YEAR, MAX_ANNUAL_LEAVES)
+    assert await consume_leave_days(USER, YEAR + 1, 1)
+    assert await consume_leave_days("EMP003", YEAR, 1)
+    assert await get_taken_days("EMP004", YEAR) == 0
+
+async def test_rebuild_recomputes_from_approved_leaves(db):
+    await db.leaves.insert_many([
+        {"user_id": USER, "status": "approved", "days_requested": 3, "applied_at": datetime(YEAR, 2, 1)},
+        {"user_id": USER, "status": "approved", "days_requested": 2, "applied_at": datetime(YEAR, 6, 1)},
+        {"user_id": USER, "status": "pending", "days_requested": 4, "applied_at": datetime(YEAR, 7, 1)},
+        {"user_id": USER, "status": "approved", "days_requested": 1, "applied_at": datetime(YEAR + 1, 1, 5)},
+    ])
+    await consume_leave_days("EMP009", YEAR, 7)  # no approved leaves behind it
+
+    assert await rebuild_leave_balances() == 2
+    assert await get_taken_days(USER, YEAR) == 5
+    assert await get_taken_days(USER, YEAR + 1) == 1
+    assert await get_taken_days("EMP009", YEAR) == 0
+
+async def test_approving_past_the_quota_is_rejected(db, client, auth):
+    applied = datetime.utcnow()
+    await consume_leave_days(USER, applied.year, MAX_ANNUAL_LEAVES - 2)
+    await db.leaves.insert_one({"user_id": USER, "status": "pending", "days_requested": 3, "applied_at": applied})
+
+    response = await client.put(f"/leaves/{USER}/status", data={"status": "approved"}, headers=auth())
+    assert response.status_code == 400
+    assert (await db.leaves.find_one({"user_id": USER}))["status"] == "pending"
+    assert await get_taken_days(USER, applied.year) == MAX_ANNUAL_LEAVES - 2
+
+async def test_approval_books_the_days(db, client, auth):
+    applied = datetime.utcnow()
+    await db.leaves.insert_one({"user_id": USER, "status": "pending", "days_requested": 3, "applied_at": applied})
+
+    response = await client.put(f"/leaves/{USER}/status", data={"status": "approved"}, headers=auth())
+    assert response.status_code == 200
+    assert await get_taken_days(USER, applied.year) == 3
+
+async def test_first_startup_seeds_ledgers_from_history(db, client, auth):
+    applied = datetime.utcnow()
+    await db.leaves.insert_many([
+        {"user_id": USER, "status": "approved", "days_requested": 18, "applied_at": applied},
+        {"user_id": USER, "status": "pending", "days_requested": 3, "applied_at": applied},
+    ])
+    assert await ensure_leave_balances() == 1
+    assert await get_taken_days(USER, applied.year) == 18
+
+    # Already seeded: later startups leave the ledgers alone
+    await consume_leave_days(USER, applied.year, 1)
+    assert await ensure_leave_balances() == 0
+    assert await get_taken_days(USER, applied.year) == 19
+
+    # The history now counts against the quota
+    response = await client.put(f"/leaves/{USER}/status", data={"status": "approved"}, headers=auth())
+    assert response.status_code == 400
+
+async def test_migration_rebuilds_ledgers(db, monkeypatch):
+    async def normalize_keys():  # mongomock has no $trim
+        pass
+    monkeypatch.setattr("app.db.migrations.normalize_keys", normalize_keys)
+    await db.leaves.insert_one({"user_id": USER, "status": "approved", "days_requested": 4, "applied_at": datetime(YEAR, 3, 1)})
+    await migrate()
+    assert await get_taken_days(USER, YEAR) == 4
@@ -0,0 +1,43 @@
+import time
+import pytest
+from app.utils.network_verifier import CachedVerifier, KioskTokenVerifier, NetworkVerifier, sign_kiosk_token
+
+SECRET = "kiosk-secret"
+
+
+class FakeRequest:
+    def __init__(self, token):
+        self.headers = {KioskTokenVerifier.header: token}
+        self.client = None
+
+
+def test_kiosk_result_is_not_cached_past_the_token_expiry():
+    backend = KioskTokenVerifier(SECRET)
+    verifier = CachedVerifier([backend], ttl=60)
+    request = FakeRequest(sign_kiosk_token("lobby", int(time.time()) + 1, SECRET))
+
+    assert verifier.check(request)
+    time.sleep(1.1)
+    assert not backend.verify(request)
+    assert not verifier.check(request)
+
+def test_kiosk_result_is_cached_within_the_ttl():
+    backend = KioskTokenVerifier(SECRET)
+    verifier = CachedVerifier([backend], ttl=60)
+    request = FakeRequest(sign_kiosk_token("lobby", int(time.time()) + 3600, SECRET))
+
+    assert verifier.check(request)
+    backend.secret = "rotated"  # a cache hit does not call the backend again
+    assert verifier.check(request)
+
+def test_forged_kiosk_token_is_rejected():
+    token = sign_kiosk_token("lobby", int(time.time()) + 3600, "other-secret")
+    assert not CachedVerifier([KioskTokenVerifier(SECRET)]).check(FakeRequest(token))
+    assert not CachedVerifier([KioskTokenVerifier(SECRET)]).check(FakeRequest("garbage"))
+
+def test_backends_must_implement_verify():
+    class Incomplete(NetworkVerifier):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,93 @@
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from app.utils import payroll_run
+from app.utils.payroll_run import STALE_AFTER, payroll_run_id, start_payroll_run
+
+pytestmark = pytest.mark.anyio
+
+PERIOD = "2024-05"
+
+
+async def _seed(db, employees=3):
+    await db.employees.insert_many([
+        {"user_id": f"EMP{n:03d}", "name": f"Employee {n}", "department": "Engineering"} for n in range(1, employees + 1)
+    ])
+    await db.payrolls.insert_many([
+        {"user_id": f"EMP{n:03d}", "base_salary": 1000.0, "bonus": 100.0, "deductions": 50.0}
+        for n in range(1, employees)  # the last employee has no salary structure
+    ])
+
+async def _finish():
+    await asyncio.gather(*payroll_run._tasks)
+
+async def _mark_running(db, heartbeat_at):
+    await db.payroll_runs.update_one(
+        {"_id": payroll_run_id(PERIOD)},
+        {"$set": {"status": "running", "heartbeat_at": heartbeat_at}},
+        upsert=True
+    )
+
+
+async def test_run_writes_one_payslip_per_salaried_employee(db):
+    await _seed(db)
+    run, started = await start_payroll_run(PERIOD, started_by="EMP001")
+    assert started and run["status"] == "running"
+    await _finish()
+
+    run = await db.payroll_runs.find_one({"_id": payroll_run_id(PERIOD)})
+    assert (run["status"], run["total"], run["processed"], run["written"], run["skipped"]) == ("completed", 3, 3, 2, 1)
+    slip = await db.payslips.find_one({"_id": f"EMP001:{PERIOD}"})
+    assert slip["total_salary"] == 1050.0
+
+async def test_live_run_is_not_started_twice(db):
+    await _mark_running(db, datetime.utcnow())
+
+    run, started = await start_payroll_run(PERIOD)
+    assert not started
+    assert run["_id"] == payroll_run_id(PERIOD)
+    assert not payroll_run._tasks
+
+async def test_stale_run_is_taken_over(db):
+    await _seed(db)
+    await _mark_running(db, datetime.utcnow() - STALE_AFTER - timedelta(seconds=1))
+
+    run, started = await start_payroll_run(PERIOD, started_by="EMP001")
+    assert started and run["started_by"] == "EMP001"
+    await _finish()
+    assert (await db.payroll_runs.find_one({"_id": payroll_run_id(PERIOD)}))["status"] == "completed"
+
+async def test_rerun_overwrites_payslips(db):
+    await _seed(db)
+    await start_payroll_run(PERIOD)
+    await _finish()
+    await db.payrolls.update_one({"user_id": "EMP001"}, {"$set": {"bonus": 500.0}})
+
+    _, started = await start_payroll_run(PERIOD)
+    assert started
+    await _finish()
+    assert await db.payslips.count_documents({"period": PERIOD}) == 2
+    assert (await db.payslips.find_one({"_id": f"EMP001:{PERIOD}"}))["total_salary"] == 1450.0
+
+async def test_department_runs_are_separate_jobs(db):
+    await _seed(db)
+    await _mark_running(db, datetime.utcnow())
+
+    run, started = await start_payroll_run(PERIOD, "Engineering")
+    assert started and run["_id"] == payroll_run_id(PERIOD, "Engineering")
+    await _finish()
+
+async def test_taken_over_job_stops_writing_to_the_run(db, monkeypatch):
+    await _seed(db, employees=6)
+    monkeypatch.setattr(payroll_run, "RUN_BATCH_SIZE", 1)
+    first, _ = await start_payroll_run(PERIOD)
+
+    # The first job looks dead (its task has not even run yet) and is taken over
+    await _mark_running(db, datetime.utcnow() - STALE_AFTER - timedelta(seconds=1))
+    second, started = await start_payroll_run(PERIOD)
+    assert started and second["owner"] != first["owner"]
+    await _finish()
+
+    run = await db.payroll_runs.find_one({"_id": payroll_run_id(PERIOD)})
+    assert (run["status"], run["owner"]) == ("completed", second["owner"])
+    assert (run["total"], run["processed"], run["written"], run["skipped"]) == (6, 6, 5, 1)
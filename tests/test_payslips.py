@@ -0,0 +1,32 @@
+import pytest
+from app.utils.pdf_generator import payslip_renderer
+
+pytestmark = pytest.mark.anyio
+
+PAYSLIP = {"_id": "EMP002:2024-05", "user_id": "EMP002", "employee_name": "Jane", "department": "Engineering",
+           "period": "2024-05", "base_salary": 1000.0, "bonus": 0.0, "deductions": 100.0, "total_salary": 900.0}
+
+
+@pytest.fixture
+async def payslip(db):
+    await db.payslips.insert_one(dict(PAYSLIP))
+
+
+@pytest.mark.parametrize("caller, role", [("EMP003", "employee"), ("EMP003", "developer"), ("EMP003", "")])
+async def test_other_callers_cannot_download_a_payslip(payslip, client, auth, caller, role):
+    response = await client.get("/payroll/payslips/2024-05/EMP002", headers=auth(caller, role))
+    assert response.status_code == 403
+
+async def test_bad_period_is_rejected(payslip, client, auth):
+    response = await client.get("/payroll/payslips/2024-5/EMP002", headers=auth())
+    assert response.status_code == 400
+
+@pytest.mark.parametrize("caller, role", [("EMP002", "employee"), ("EMP001", "hr"), ("EMP001", "admin")])
+async def test_owner_and_hr_can_download_a_payslip(payslip, client, auth, monkeypatch, caller, role):
+    async def render(doc):
+        return b"%PDF-1.3"
+    monkeypatch.setattr(payslip_renderer, "render", render)
+
+    response = await client.get("/payroll/payslips/2024-05/EMP002", headers=auth(caller, role))
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/pdf"
@@ -0,0 +1,65 @@
+import time
+from datetime import datetime, timedelta
+import pytest
+from jose import jwt
+from app.auth.jwt_handler import SECRET, create_jwt_token
+from app.auth.passwords import password_hasher
+from app.auth.revocation import load_revocations
+from app.auth.token_cache import token_cache
+from app.routes.auth import RESET_SECRET
+
+pytestmark = pytest.mark.anyio
+
+EMAIL = "jane@talenttrack.test"
+USER = "EMP002"
+
+
+@pytest.fixture(autouse=True)
+async def jane(db):
+    token_cache.clear()
+    await db.users.insert_one({"email": EMAIL, "password": await password_hasher.hash("old"), "role": "employee"})
+    await db.employees.insert_one({"user_id": USER, "email": EMAIL, "name": "Jane", "department": "Engineering"})
+    yield
+    token_cache.clear()
+
+def _bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+# Issued some minutes before the reset
+def _old_token(minutes=1):
+    return jwt.encode({"user_id": USER, "role": "employee", "exp": datetime.utcnow() + timedelta(hours=1),
+                       "iat": datetime.utcnow() - timedelta(minutes=minutes)}, SECRET, algorithm="HS256")
+
+async def _reset(client):
+    token = jwt.encode({"email": EMAIL, "exp": datetime.utcnow() + timedelta(hours=1)}, RESET_SECRET, algorithm="HS256")
+    response = await client.post("/auth/reset-password", data={"token": token, "new_password": "new"})
+    assert response.status_code == 200
+
+
+async def test_password_reset_revokes_cached_and_uncached_tokens(db, client):
+    cached, uncached = _old_token(1), _old_token(2)
+    assert (await client.get("/attendance/me", headers=_bearer(cached))).status_code == 200
+
+    await _reset(client)
+    assert (await client.get("/attendance/me", headers=_bearer(cached))).status_code == 403
+    assert (await client.get("/attendance/me", headers=_bearer(uncached))).status_code == 403
+    assert (await db.users.find_one({"email": EMAIL}))["tokens_valid_after"] <= time.time()
+
+async def test_tokens_issued_after_the_reset_still_work(client):
+    await _reset(client)
+    fresh = create_jwt_token(USER, "employee")
+    assert (await client.get("/attendance/me", headers=_bearer(fresh))).status_code == 200
+
+async def test_revocation_can_be_turned_off(client, monkeypatch):
+    monkeypatch.setattr("app.routes.auth.REVOKE_SESSIONS_ON_PASSWORD_RESET", False)
+    token = _old_token()
+    await _reset(client)
+    assert (await client.get("/attendance/me", headers=_bearer(token))).status_code == 200
+
+async def test_startup_loads_recent_revocations(db):
+    await db.users.update_one({"email": EMAIL}, {"$set": {"tokens_valid_after": int(time.time())}})
+    assert not token_cache.is_revoked({"user_id": USER, "iat": int(time.time()) - 60})
+
+    assert await load_revocations() == 1
+    assert token_cache.is_revoked({"user_id": USER, "iat": int(time.time()) - 60})
+    assert not token_cache.is_revoked({"user_id": "EMP003", "iat": int(time.time()) - 60})